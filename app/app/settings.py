@@ -31,8 +31,10 @@ ALLOWED_HOSTS = []
 
 # Application definition
 
+# Workers dédiés à l'API : ADMIN_ENABLED=0 évite le chargement de l'admin au démarrage
+ADMIN_ENABLED = os.environ.get('ADMIN_ENABLED', '1').lower() not in ('0', 'false', 'no')
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -44,19 +46,48 @@ INSTALLED_APPS = [
     'drf_spectacular',
     'user',
 ]
+if ADMIN_ENABLED:
+    INSTALLED_APPS.insert(0, 'django.contrib.admin')
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'edcp_apirest.middleware.PerformanceMiddleware',
+    'edcp_apirest.db.routers.ReplicaPinningMiddleware',
+    # Variantes des middlewares Django ignorées pour API_FAST_PATH_PREFIXES
+    'edcp_apirest.middleware.APISessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'edcp_apirest.middleware.APICsrfViewMiddleware',
+    'edcp_apirest.middleware.APIAuthenticationMiddleware',
+    'edcp_apirest.middleware.APIMessageMiddleware',
+    'edcp_apirest.middleware.APIXFrameOptionsMiddleware',
+]
+
+# Routes servies sans session, CSRF, authentification Django, messages ni X-Frame-Options
+# (authentification par jeton uniquement) ; vide pour garder la pile complète partout.
+# Mesure du gain : python manage.py benchmark_middleware
+API_FAST_PATH_PREFIXES = [
+    prefix for prefix in os.environ.get('API_FAST_PATH_PREFIXES', '/api/user/').split(',') if prefix
+]
+
+# Mesure des performances (PerformanceMiddleware) : namespaces d'URL instrumentés
+# et fraction des requêtes échantillonnées (0 à 1)
+PERF_INSTRUMENTED_NAMESPACES = [
+    namespace for namespace in os.environ.get('PERF_INSTRUMENTED_NAMESPACES', 'user').split(',') if namespace
+]
+PERF_SAMPLE_RATE = float(os.environ.get('PERF_SAMPLE_RATE', 1))
+# Accès de Prometheus à /api/internal/metrics/, sans authentification Django :
+# jeton envoyé en « Authorization: Bearer <jeton> » et/ou adresses IP autorisées
+# (REMOTE_ADDR). Sans l'un ni l'autre, l'export est refusé.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [
+    ip for ip in os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if ip
 ]
 
 ROOT_URLCONF = 'app.urls'
 
+# Runner de tests : fait respecter les budgets de requêtes SQL déclarés par les vues
+TEST_RUNNER = 'edcp_apirest.testing.QueryBudgetRunner'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -75,6 +106,11 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'app.wsgi.application'
 
+# Utiliser les vues asynchrones de l'API utilisateur (à servir avec app.asgi)
+USER_API_ASYNC = os.environ.get('USER_API_ASYNC', '').lower() in ('1', 'true', 'yes')
+# Threads par processus pour l'ORM et le hachage des vues asynchrones (une connexion à la base par thread)
+USER_API_ASYNC_THREADS = int(os.environ.get('USER_API_ASYNC_THREADS', 8))
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
@@ -93,10 +129,49 @@ DATABASES = {
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
-        'PASSWORD': os.environ.get('DB_PASS')
+        'PASSWORD': os.environ.get('DB_PASS'),
+        # Durée de vie des connexions persistantes en secondes (0 = une connexion par requête)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+# Pool de connexions PostgreSQL partagé par les threads de chaque processus
+if os.environ.get('DB_POOL', '').lower() in ('1', 'true', 'yes'):
+    DATABASES['default'].update({
+        'ENGINE': 'edcp_apirest.db.backends.postgresql_pool',
+        # Chaque requête rend sa connexion au pool à la fin
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            # Attente maximale d'une connexion libre (secondes)
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            # Fermeture des connexions inactives au-delà de MIN_SIZE
+            'MAX_IDLE': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+            # Renouvellement des connexions plus anciennes
+            'MAX_LIFETIME': float(os.environ.get('DB_POOL_MAX_LIFETIME', 3600)),
+            # Vérification (SELECT 1) des connexions inactives depuis plus longtemps
+            'CHECK_INTERVAL': float(os.environ.get('DB_POOL_CHECK_INTERVAL', 30)),
+        },
+    })
+
+# Réplicas en lecture seule (hôtes séparés par des virgules dans DB_REPLICA_HOSTS)
+DATABASE_REPLICAS = []
+for _index, _host in enumerate(h.strip() for h in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if h.strip()):
+    DATABASES[f'replica_{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        # Les tests utilisent la base principale à la place des réplicas
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{_index}')
+
+# Lectures sur les réplicas, écritures et lectures après écriture sur la base principale
+DATABASE_ROUTERS = ['edcp_apirest.db.routers.PrimaryReplicaRouter']
+
+# Durée pendant laquelle un client qui vient d'écrire lit sur la base principale (retard de réplication)
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -116,6 +191,40 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Politique de hachage des mots de passe
+# Algorithme préféré : argon2, bcrypt_sha256 ou pbkdf2_sha256.
+# Les mots de passe hachés avec un autre algorithme (ou d'autres paramètres)
+# sont re-hachés de façon transparente à la connexion suivante.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'argon2')
+
+# Facteurs de travail, à ajuster avec `python manage.py benchmark_hashers`
+PASSWORD_HASHING = {
+    'ARGON2_TIME_COST': int(os.environ.get('ARGON2_TIME_COST', 2)),
+    'ARGON2_MEMORY_COST': int(os.environ.get('ARGON2_MEMORY_COST', 19456)),  # en Kio
+    'ARGON2_PARALLELISM': int(os.environ.get('ARGON2_PARALLELISM', 1)),
+    'BCRYPT_ROUNDS': int(os.environ.get('BCRYPT_ROUNDS', 12)),
+    'PBKDF2_ITERATIONS': int(os.environ.get('PBKDF2_ITERATIONS', 260000)),
+}
+
+_PASSWORD_HASHER_CLASSES = {
+    'argon2': 'edcp_apirest.hashers.TunedArgon2PasswordHasher',
+    'bcrypt_sha256': 'edcp_apirest.hashers.TunedBCryptSHA256PasswordHasher',
+    'pbkdf2_sha256': 'edcp_apirest.hashers.TunedPBKDF2PasswordHasher',
+}
+
+# Le premier hacheur est utilisé pour les nouveaux mots de passe
+PASSWORD_HASHERS = [_PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+
+# Pool de processus pour le hachage des mots de passe (0 = hachage dans le thread de la requête)
+PASSWORD_HASHING_POOL_SIZE = int(os.environ.get('PASSWORD_HASHING_POOL_SIZE', 0))
+# Nombre de hachages pouvant attendre un processus libre avant de répondre 503
+PASSWORD_HASHING_POOL_QUEUE_DEPTH = int(os.environ.get('PASSWORD_HASHING_POOL_QUEUE_DEPTH', 16))
+# Délai maximal d'attente d'un hachage en secondes
+PASSWORD_HASHING_POOL_TIMEOUT = float(os.environ.get('PASSWORD_HASHING_POOL_TIMEOUT', 10))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -146,7 +255,92 @@ Cela signifie que vous avez un modèle d'utilisateur personnalisé nommé User s
 """
 AUTH_USER_MODEL = 'edcp_apirest.User'
 
+# Authentification par email insensible à la casse (index unique sur LOWER(email))
+AUTHENTICATION_BACKENDS = ['edcp_apirest.backends.EmailBackend']
+
+# Au-delà de ce nombre de lignes, l'admin affiche un nombre estimé au lieu d'un COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', 10000))
+# Ancres de la pagination par clé de l'admin (dernière ligne de chaque page servie) :
+# alias du cache Django et durée de vie en secondes. Une ancre absente ramène à l'OFFSET.
+ADMIN_KEYSET_CACHE_ALIAS = os.environ.get('ADMIN_KEYSET_CACHE_ALIAS', 'default')
+ADMIN_KEYSET_ANCHOR_TTL = int(os.environ.get('ADMIN_KEYSET_ANCHOR_TTL', 600))
+
 # Documentation dfr
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-}
\ No newline at end of file
+    # Débits par fenêtre glissante (user.throttling) des vues de connexion et d'inscription
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('THROTTLE_LOGIN_IP', '30/min'),
+        'login_email': os.environ.get('THROTTLE_LOGIN_EMAIL', '10/min'),
+        'signup_ip': os.environ.get('THROTTLE_SIGNUP_IP', '20/min'),
+        'signup_email': os.environ.get('THROTTLE_SIGNUP_EMAIL', '5/min'),
+        # Création par lots (/api/user/bulk-create/), par utilisateur
+        'bulk_create': os.environ.get('THROTTLE_BULK_CREATE', '10/hour'),
+    },
+    # Nombre de proxys de confiance devant l'application : l'IP limitée est lue dans
+    # X-Forwarded-For à cette profondeur (0 = REMOTE_ADDR, un en-tête falsifié est ignoré)
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+}
+
+# Artefact JSON du schéma OpenAPI construit par `python manage.py build_schema`
+# (à défaut, le schéma est généré à la première demande de /api/schema/)
+SCHEMA_FILE = os.environ.get('SCHEMA_FILE', str(BASE_DIR / 'openapi-schema.json'))
+
+# Limitation de débit (désactivable, par exemple pour benchmark_api)
+THROTTLE_ENABLED = os.environ.get('THROTTLE_ENABLED', '1').lower() not in ('0', 'false', 'no')
+# Alias du cache Django des compteurs partagés entre processus (None = compteurs par processus)
+THROTTLE_CACHE_ALIAS = os.environ.get('THROTTLE_CACHE_ALIAS') or None
+# Nombre maximal de clés (IP, emails) suivies en mémoire par compteur
+THROTTLE_MAX_KEYS = int(os.environ.get('THROTTLE_MAX_KEYS', 100000))
+
+# Cache des jetons d'authentification (jeton -> utilisateur)
+# Durée de vie des entrées en secondes
+TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 60))
+# Nombre maximal de jetons conservés en mémoire par processus
+TOKEN_CACHE_MAX_SIZE = int(os.environ.get('TOKEN_CACHE_MAX_SIZE', 10000))
+# Alias du cache Django partagé entre processus (None pour le désactiver). Il porte aussi
+# la version de chaque utilisateur : sans lui, une modification n'invalide que le cache du
+# processus qui l'a faite, les autres servent l'ancienne capture jusqu'à TOKEN_CACHE_TTL
+TOKEN_CACHE_ALIAS = os.environ.get('TOKEN_CACHE_ALIAS') or None
+
+# Jetons d'authentification expirants (edcp_apirest.AuthToken)
+# Durée de validité en secondes, prolongée à chaque utilisation (défaut : 7 jours)
+AUTH_TOKEN_TTL = int(os.environ.get('AUTH_TOKEN_TTL', 7 * 24 * 3600))
+# Intervalle minimal en secondes entre deux écritures de la prolongation en base
+AUTH_TOKEN_REFRESH_INTERVAL = int(os.environ.get('AUTH_TOKEN_REFRESH_INTERVAL', 3600))
+
+# Jetons délivrés par /api/user/token/ : 'db' (table AuthToken) ou 'signed' (jetons signés
+# autonomes, vérifiés sans requête SQL ; les jetons de la table restent acceptés)
+AUTH_TOKEN_MODE = os.environ.get('AUTH_TOKEN_MODE', 'db')
+# Clés HMAC des jetons signés, séparées par des virgules : la première signe, toutes vérifient (rotation)
+SIGNED_TOKEN_KEYS = [key for key in os.environ.get('SIGNED_TOKEN_KEYS', '').split(',') if key] or [SECRET_KEY]
+# Alias du cache Django de la liste de révocation et des versions des utilisateurs : doit être
+# partagé entre processus (Redis, Memcached, base) en mode 'signed', sinon ImproperlyConfigured
+SIGNED_TOKEN_REVOCATION_CACHE = os.environ.get('SIGNED_TOKEN_REVOCATION_CACHE', 'default')
+
+# Cache des permissions résolues (edcp_apirest.backends.EmailBackend), invalidé par
+# version à chaque modification de groupe ou de permission
+# Alias du cache Django, partagé entre processus (Redis, Memcached, base) pour que
+# l'invalidation atteigne tous les workers (ImproperlyConfigured sinon) ; vide = désactivé
+PERMISSION_CACHE_ALIAS = os.environ.get('PERMISSION_CACHE_ALIAS') or None
+# Durée de vie des entrées en secondes
+PERMISSION_CACHE_TTL = int(os.environ.get('PERMISSION_CACHE_TTL', 300))
+
+# Écriture de last_login : 'buffered' (connexions par jeton et par session mises en
+# tampon, vidé par UPDATE groupés depuis un fil du processus) ou 'sync' (comportement de
+# Django et DRF : UPDATE à chaque connexion par session, rien pour les jetons)
+LAST_LOGIN_MODE = os.environ.get('LAST_LOGIN_MODE', 'buffered')
+# Intervalle en secondes entre deux vidages du tampon
+LAST_LOGIN_FLUSH_INTERVAL = int(os.environ.get('LAST_LOGIN_FLUSH_INTERVAL', 30))
+# Nombre d'utilisateurs en attente qui déclenche un vidage immédiat
+LAST_LOGIN_FLUSH_MAX_SIZE = int(os.environ.get('LAST_LOGIN_FLUSH_MAX_SIZE', 1000))
+# Nombre de lignes par UPDATE
+LAST_LOGIN_FLUSH_BATCH_SIZE = int(os.environ.get('LAST_LOGIN_FLUSH_BATCH_SIZE', 500))
+# Alias du cache Django partagé par les processus (None = tampon par processus)
+LAST_LOGIN_CACHE_ALIAS = os.environ.get('LAST_LOGIN_CACHE_ALIAS') or None
+
+# Création d'utilisateurs par lots (/api/user/bulk-create/)
+# Nombre maximal d'utilisateurs par requête
+BULK_CREATE_MAX_ITEMS = int(os.environ.get('BULK_CREATE_MAX_ITEMS', 1000))
+# Nombre de lignes par INSERT
+BULK_CREATE_BATCH_SIZE = int(os.environ.get('BULK_CREATE_BATCH_SIZE', 500))
@@ -13,22 +13,41 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
-
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
 
+from edcp_apirest.views import (
+    DatabasePoolStatsView, MetricsView, SchemaView, lazy_view,
+)
+
 urlpatterns = [
-  # URL de l'administration Django
-    path('admin/', admin.site.urls),
     # URL de l'API pour les utilisateurs
     path('api/user/', include('user.urls'), name='api-user'),
 
-    # URL de schéma pour l'API
-    path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
-    # URL de la documentation de l'API
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='api-schema'), name='api-docs')
-]
\ No newline at end of file
+    # URL de schéma pour l'API (précalculé par build_schema ou généré à la
+    # première demande)
+    path('api/schema/', SchemaView.as_view(), name='api-schema'),
+    # Documentation de l'API (drf_spectacular importé à la première visite)
+    path(
+        'api/docs/',
+        lazy_view(
+            'drf_spectacular.views.SpectacularSwaggerView',
+            url_name='api-schema',
+        ),
+        name='api-docs',
+    ),
+
+    # URL des métriques du pool de connexions
+    path(
+        'api/internal/db-pool/', DatabasePoolStatsView.as_view(),
+        name='api-db-pool',
+    ),
+    # URL des métriques de performance (format Prometheus)
+    path('api/internal/metrics/', MetricsView.as_view(), name='api-metrics'),
+]
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    # URL de l'administration Django
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
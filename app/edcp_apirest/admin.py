@@ -3,16 +3,29 @@ Personnalisation de l'administration Django.
 """
 from django.contrib import admin  # noqa
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
 # Importe les modèles ici
 from edcp_apirest import models
+# Pagination sans COUNT(*) ni OFFSET coûteux
+from edcp_apirest.paginator import EstimatedCountPaginator
 
 class UserAdmin(BaseUserAdmin):
     """Définit les pages d'administration pour les utilisateurs."""
     ordering = ['id']  # Ordonne les utilisateurs par ID
     list_display = ['email', 'name']  # Affiche les utilisateurs par e-mail et nom
 
+    # Grandes tables : nombre estimé, pas de second COUNT(*) du total non
+    # filtré
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Filtres servis par les index (is_active, id) et (is_staff, id)
+    list_filter = ('is_active', 'is_staff')
+    # Recherche par préfixe d'email ou de nom (voir get_search_results)
+    search_fields = ('email', 'name')
+
     # Éditer l'utilisateur
     fieldsets = (
         (None, {'fields': ('email', "password")}),  # Informations de connexion
@@ -30,6 +43,23 @@ class UserAdmin(BaseUserAdmin):
     )
     readonly_fields = ['last_login']  # Affiche la dernière connexion en lecture seule
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Recherche par préfixe insensible à la casse sur l'email ou le nom.
+        LOWER(champ) LIKE 'terme%' utilise les index text_pattern_ops,
+        contrairement au icontains par défaut qui parcourt toute la table.
+        """
+        search_term = search_term.strip().lower()
+        if not search_term:
+            return queryset, False
+        queryset = queryset.annotate(
+            email_lower=Lower('email'), name_lower=Lower('name'),
+        ).filter(
+            Q(email_lower__startswith=search_term)
+            | Q(name_lower__startswith=search_term)
+        )
+        return queryset, False
+
     # ajoute d'un utilisateur
     add_fieldsets = (
         (None, {
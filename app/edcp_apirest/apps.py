@@ -4,3 +4,50 @@ from django.apps import AppConfig
 class EdcpApirestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'edcp_apirest'
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in
+
+        from edcp_apirest.backends import permissions_cache
+
+        # Refuse au démarrage un cache des permissions propre au processus
+        permissions_cache()
+
+        # Invalidation du cache des permissions et écriture de last_login
+        # (LAST_LOGIN_MODE)
+        from edcp_apirest import receivers  # noqa: F401
+
+        # last_login est écrit par receivers.record_last_login à la place du
+        # récepteur de Django
+        user_logged_in.disconnect(dispatch_uid='update_last_login')
+
+        # Exporte les métriques des pools avec les autres métriques
+        from edcp_apirest import last_login, metrics, ratelimit
+        from edcp_apirest.db.backends.postgresql_pool.base import pool_stats
+
+        metrics.register_gauge(
+            'edcp_db_pool', 'Métriques des pools de connexions du processus.',
+            lambda: [
+                ([('pool', pool), ('stat', stat)], value)
+                for pool, stats in sorted(pool_stats().items())
+                for stat, value in sorted(stats.items())
+            ],
+        )
+        # Exporte les compteurs de limitation de débit
+        metrics.register_gauge(
+            'edcp_ratelimit', 'Compteurs de limitation de débit du processus.',
+            lambda: [
+                ([('scope', counter.name), ('stat', stat)], value)
+                for counter in ratelimit.counters()
+                for stat, value in sorted(counter.stats().items())
+            ],
+        )
+        # Exporte le tampon des dates de connexion
+        metrics.register_gauge(
+            'edcp_last_login_buffer',
+            'Tampon des dates de connexion du processus.',
+            lambda: [
+                ([('stat', stat)], value)
+                for stat, value in sorted(last_login.buffer.stats().items())
+            ],
+        )
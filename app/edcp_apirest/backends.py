@@ -0,0 +1,137 @@
+"""
+Backend d'authentification par email insensible à la casse.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from edcp_apirest.cache import is_shared
+
+# Clé de la version des permissions : l'incrémenter invalide tout le cache
+PERMISSIONS_VERSION_KEY = 'edcp:perms:version'
+
+
+def permissions_cache():
+    """
+    Retourne le cache Django des permissions résolues (PERMISSION_CACHE_ALIAS),
+    ou None s'il est désactivé. Un cache propre au processus est refusé :
+    l'invalidation par version n'atteindrait pas les autres workers.
+    """
+    alias = settings.PERMISSION_CACHE_ALIAS
+    if not alias:
+        return None
+    if not is_shared(alias):
+        raise ImproperlyConfigured(
+            f"PERMISSION_CACHE_ALIAS ('{alias}') doit désigner un cache "
+            "partagé entre processus."
+        )
+    return caches[alias]
+
+
+def permissions_version(cache):
+    """
+    Retourne la version courante des permissions (créée à 1 au premier appel).
+    """
+    version = cache.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        # add : deux processus qui démarrent ensemble ne s'écrasent pas
+        cache.add(PERMISSIONS_VERSION_KEY, 1, None)
+        version = cache.get(PERMISSIONS_VERSION_KEY, 1)
+    return version
+
+
+def bump_permissions_version():
+    """
+    Invalide les permissions en cache de tous les utilisateurs (groupes ou
+    permissions modifiés).
+    """
+    cache = permissions_cache()
+    if cache is None:
+        return
+    try:
+        cache.incr(PERMISSIONS_VERSION_KEY)
+    except ValueError:
+        # Clé absente ou expulsée : une nouvelle version suffit, les anciennes
+        # entrées expirent
+        cache.set(
+            PERMISSIONS_VERSION_KEY, permissions_version(cache) + 1, None)
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authentifie par email sans tenir compte de la casse. La recherche porte sur
+    LOWER(email), servie par l'index unique : une lecture d'index.
+
+    Si PERMISSION_CACHE_ALIAS est défini, les permissions résolues (propres et
+    par les groupes) sont conservées entre les requêtes dans ce cache partagé,
+    sous une clé (version, utilisateur, superutilisateur) ; les récepteurs de
+    edcp_apirest.receivers incrémentent la version à chaque modification de
+    groupe ou de permission.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_email(username)
+        except UserModel.DoesNotExist:
+            # Hachage factice : un email inconnu prend le même temps qu'un mot
+            # de passe faux
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def _cached_permissions(self, user_obj):
+        """
+        Retourne (permissions propres, permissions des groupes) : instance,
+        puis cache, puis base.
+        """
+        if not hasattr(user_obj, '_edcp_perm_cache'):
+            cache = permissions_cache()
+            permissions = key = None
+            if cache is not None:
+                # is_superuser dans la clé : le retrait du statut ne sert pas
+                # l'ancienne entrée
+                version = permissions_version(cache)
+                superuser = int(user_obj.is_superuser)
+                key = f'edcp:perms:{version}:{user_obj.pk}:{superuser}'
+                permissions = cache.get(key)
+            if permissions is None:
+                permissions = (
+                    frozenset(super().get_user_permissions(user_obj)),
+                    frozenset(super().get_group_permissions(user_obj)),
+                )
+                if cache is not None:
+                    cache.set(key, permissions, settings.PERMISSION_CACHE_TTL)
+            user_obj._edcp_perm_cache = permissions
+        return user_obj._edcp_perm_cache
+
+    def _resolvable(self, user_obj, obj):
+        # Mêmes exclusions que ModelBackend : compte inactif, anonyme,
+        # permission par objet
+        return user_obj.is_active and not user_obj.is_anonymous and obj is None
+
+    def get_user_permissions(self, user_obj, obj=None):
+        if not self._resolvable(user_obj, obj):
+            return set()
+        return set(self._cached_permissions(user_obj)[0])
+
+    def get_group_permissions(self, user_obj, obj=None):
+        if not self._resolvable(user_obj, obj):
+            return set()
+        return set(self._cached_permissions(user_obj)[1])
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not self._resolvable(user_obj, obj):
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            own, groups = self._cached_permissions(user_obj)
+            user_obj._perm_cache = own | groups
+        return user_obj._perm_cache
@@ -0,0 +1,97 @@
+"""
+Caches en mémoire partagés par les applications du projet.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Moteurs de cache propres à chaque processus : une écriture n'y atteint pas
+# les autres workers
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared(alias):
+    """
+    Indique si le cache Django `alias` est partagé entre processus (Redis,
+    Memcached, base...).
+    """
+    return not isinstance(caches[alias], PROCESS_LOCAL_BACKENDS)
+
+
+class LRUCache:
+    """
+    Cache LRU en mémoire de processus avec durée de vie (TTL) et compteurs.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size  # Nombre maximal d'entrées conservées
+        self.ttl = ttl  # Durée de vie d'une entrée en secondes
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Retourne la valeur associée à la clé ou `default` si absente ou
+        expirée.
+        """
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires = item
+            if expires <= now:
+                # Entrée expirée : on la retire et on compte un échec
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Enregistre une valeur et évince les entrées les moins récemment
+        utilisées.
+        """
+        if self.max_size <= 0:
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Supprime une entrée si elle existe."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Retourne les compteurs du cache."""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,140 @@
+"""
+Backend PostgreSQL dont les connexions proviennent d'un pool partagé par les
+threads.
+
+Django ferme la connexion à la fin de chaque requête (CONN_MAX_AGE = 0) :
+ici, la fermeture rend simplement la connexion au pool.
+"""
+import threading
+
+import psycopg2
+import psycopg2.extras
+
+from django.db.backends.postgresql import base
+
+from edcp_apirest.db.pool import ConnectionPool
+
+# Pools par alias de base de données, partagés par tous les threads du
+# processus
+_pools = {}
+_pools_lock = threading.Lock()
+
+POOL_DEFAULTS = {
+    'MIN_SIZE': 1,
+    'MAX_SIZE': 10,
+    'TIMEOUT': 30.0,
+    'MAX_IDLE': 300.0,
+    'MAX_LIFETIME': 3600.0,
+    'CHECK_INTERVAL': 30.0,
+}
+
+
+def _connect(conn_params, options):
+    """
+    Ouvre une connexion psycopg2 configurée comme le backend PostgreSQL de
+    Django.
+    """
+    connection = psycopg2.connect(**conn_params)
+    isolation_level = options.get('isolation_level')
+    if isolation_level not in (None, connection.isolation_level):
+        connection.set_session(isolation_level=isolation_level)
+    psycopg2.extras.register_default_jsonb(
+        conn_or_curs=connection, loads=lambda x: x)
+    return connection
+
+
+def _check(connection):
+    """Vérifie qu'une connexion inactive répond encore."""
+    if connection.closed:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return True
+
+
+def get_pool(alias, conn_params, settings_dict):
+    """
+    Retourne (en le créant si besoin) le pool de l'alias et des paramètres
+    donnés.
+    """
+    # La base de test remplace NAME : chaque jeu de paramètres a son propre
+    # pool
+    params = sorted((name, str(value)) for name, value in conn_params.items())
+    key = (alias, tuple(params))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            config = {**POOL_DEFAULTS, **settings_dict.get('POOL', {})}
+            options = settings_dict['OPTIONS']
+            pool = _pools[key] = ConnectionPool(
+                connect=lambda: _connect(conn_params, options),
+                min_size=config['MIN_SIZE'],
+                max_size=config['MAX_SIZE'],
+                timeout=config['TIMEOUT'],
+                max_idle=config['MAX_IDLE'],
+                max_lifetime=config['MAX_LIFETIME'],
+                check_interval=config['CHECK_INTERVAL'],
+                check=_check,
+            )
+        return pool
+
+
+def close_pools(database=None):
+    """
+    Ferme les connexions inactives des pools (éventuellement d'une seule base).
+    """
+    with _pools_lock:
+        pools = [
+            pool for (alias, params), pool in _pools.items()
+            if database is None or ('database', database) in params
+        ]
+    for pool in pools:
+        pool.closeall()
+
+
+def pool_stats():
+    """Retourne les métriques de chaque pool ouvert dans ce processus."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {
+        '%s/%s' % (alias, dict(params).get('database', '')): pool.stats()
+        for (alias, params), pool in pools.items()
+    }
+
+
+class DatabaseCreation(base.DatabaseCreation):
+    """Ferme les connexions du pool avant de supprimer une base de test."""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Wrapper PostgreSQL utilisant un pool de connexions."""
+
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, conn_params, self.settings_dict)
+        connection = pool.getconn()
+        # Même initialisation que le backend PostgreSQL de Django
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level,
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = get_pool(
+            self.alias, self.get_connection_params(), self.settings_dict)
+        discard = bool(self.connection.closed)
+        if not discard:
+            try:
+                # Une connexion rendue au pool ne doit pas garder de
+                # transaction ouverte
+                self.connection.rollback()
+            except psycopg2.Error:
+                discard = True
+        pool.putconn(self.connection, discard=discard)
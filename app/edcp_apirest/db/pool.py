@@ -0,0 +1,190 @@
+"""
+Pool de connexions générique : taille min/max, vérification de santé,
+recyclage des connexions inactives et métriques.
+
+Le pool ne dépend pas du pilote : il reçoit une fonction de connexion, ce qui
+permet de le tester avec des connexions factices.
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Levée quand aucune connexion n'est disponible dans le délai imparti."""
+
+
+class _Entry:
+    """Connexion gérée par le pool et ses dates d'utilisation."""
+
+    __slots__ = ('connection', 'created', 'last_used')
+
+    def __init__(self, connection, now):
+        self.connection = connection
+        self.created = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Pool de connexions thread-safe."""
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=30.0,
+                 max_idle=300.0, max_lifetime=3600.0, check_interval=30.0,
+                 check=None, close=None):
+        self.connect = connect  # Fonction qui ouvre une nouvelle connexion
+        self.min_size = min_size  # Connexions conservées même inactives
+        self.max_size = max_size  # Connexions ouvertes au maximum
+        # Attente maximale d'une connexion libre (secondes)
+        self.timeout = timeout
+        # Inactivité au-delà de laquelle une connexion est fermée
+        self.max_idle = max_idle
+        # Âge au-delà duquel une connexion est renouvelée
+        self.max_lifetime = max_lifetime
+        # Inactivité au-delà de laquelle on vérifie la connexion
+        self.check_interval = check_interval
+        self.check = check or (lambda connection: True)
+        self.close = close or (lambda connection: connection.close())
+
+        self._idle = deque()
+        self._in_use = {}  # id(connexion) -> _Entry
+        self._size = 0  # Connexions ouvertes ou en cours d'ouverture
+        self._cond = threading.Condition()
+
+        # Métriques
+        self.waiting = 0
+        self.wait_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.created = 0
+        self.closed = 0
+        self.failed_checks = 0
+        self.timeouts = 0
+
+    def _expired(self, entry, now):
+        """Indique si la connexion a dépassé sa durée de vie."""
+        return self.max_lifetime and now - entry.created > self.max_lifetime
+
+    def _discard(self, entry):
+        """Ferme une connexion retirée du pool (appelé hors verrou)."""
+        try:
+            self.close(entry.connection)
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self.closed += 1
+            self._cond.notify()
+
+    def getconn(self):
+        """
+        Retourne une connexion saine, en attendant au plus `timeout` secondes.
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            entry = None
+            reserve = False
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(
+                            'Aucune connexion disponible après '
+                            f'{self.timeout} s ({self._size} ouvertes)'
+                        )
+                    self.waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self.waiting -= 1
+                if self._idle:
+                    # LIFO : la connexion la plus récemment utilisée est la
+                    # plus chaude
+                    entry = self._idle.pop()
+                else:
+                    self._size += 1
+                    reserve = True
+
+            now = time.monotonic()
+            if reserve:
+                try:
+                    entry = _Entry(self.connect(), now)
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self.created += 1
+            elif self._expired(entry, now):
+                self._discard(entry)
+                continue
+            elif (now - entry.last_used > self.check_interval
+                  and not self._healthy(entry)):
+                self.failed_checks += 1
+                self._discard(entry)
+                continue
+
+            waited = now - start
+            with self._cond:
+                self._in_use[id(entry.connection)] = entry
+                self.wait_count += 1
+                self.wait_time_total += waited
+                self.wait_time_max = max(self.wait_time_max, waited)
+            return entry.connection
+
+    def _healthy(self, entry):
+        """Vérifie une connexion restée inactive."""
+        try:
+            return bool(self.check(entry.connection))
+        except Exception:
+            return False
+
+    def putconn(self, connection, discard=False):
+        """Rend une connexion au pool (ou la ferme si `discard`)."""
+        now = time.monotonic()
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            # Connexion inconnue du pool : on la ferme simplement
+            self.close(connection)
+            return
+        if discard or self._expired(entry, now):
+            self._discard(entry)
+            return
+        entry.last_used = now
+        stale = []
+        with self._cond:
+            self._idle.append(entry)
+            # Recyclage des connexions inactives au-delà du minimum
+            while self._size - len(stale) > self.min_size and self._idle \
+                    and now - self._idle[0].last_used > self.max_idle:
+                stale.append(self._idle.popleft())
+            self._cond.notify()
+        for old in stale:
+            self._discard(old)
+
+    def closeall(self):
+        """Ferme toutes les connexions inactives."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self):
+        """Retourne les métriques du pool."""
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'waiting': self.waiting,
+                'wait_count': self.wait_count,
+                'wait_time_total': self.wait_time_total,
+                'wait_time_max': self.wait_time_max,
+                'created': self.created,
+                'closed': self.closed,
+                'failed_checks': self.failed_checks,
+                'timeouts': self.timeouts,
+            }
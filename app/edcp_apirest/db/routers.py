@@ -0,0 +1,96 @@
+"""
+Routage des lectures vers les réplicas et des écritures vers la base
+principale.
+
+Une fois qu'une requête a écrit (ou ouvert une transaction), toutes ses
+lectures suivantes restent sur la base principale. Le middleware prolonge
+cet épinglage quelques secondes pour le même client afin de masquer le
+retard de réplication (lecture de ses propres écritures).
+"""
+import random
+
+from asgiref.local import Local
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# État propre à chaque thread / tâche asyncio
+_state = Local()
+
+# Cookie indiquant qu'un client vient d'écrire
+PIN_COOKIE = 'db_pin_primary'
+
+
+def pin_primary():
+    """
+    Force les lectures suivantes de la requête courante sur la base principale.
+    """
+    _state.pinned = True
+
+
+def reset():
+    """Réinitialise l'épinglage (début et fin de requête)."""
+    _state.pinned = False
+    _state.wrote = False
+
+
+def is_pinned():
+    """Indique si les lectures doivent aller sur la base principale."""
+    return (
+        getattr(_state, 'pinned', False)
+        or connections[DEFAULT_DB_ALIAS].in_atomic_block
+    )
+
+
+class PrimaryReplicaRouter:
+    """
+    Lectures sur un réplica, écritures et lectures après écriture sur la base
+    principale.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or is_pinned():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Les lectures qui suivent une écriture doivent voir cette écriture
+        _state.pinned = True
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les réplicas contiennent les mêmes données que la base principale
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaPinningMiddleware:
+    """
+    Épingle sur la base principale les requêtes d'écriture et les clients qui
+    viennent d'écrire.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset()
+        safe = request.method in ('GET', 'HEAD', 'OPTIONS')
+        if not safe or PIN_COOKIE in request.COOKIES:
+            pin_primary()
+        try:
+            response = self.get_response(request)
+            if getattr(_state, 'wrote', False) and settings.DATABASE_REPLICAS:
+                # Le client lit ses propres écritures malgré le retard de
+                # réplication
+                response.set_cookie(
+                    PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True, samesite='Lax',
+                )
+            return response
+        finally:
+            reset()
@@ -0,0 +1,40 @@
+"""
+Hacheurs de mots de passe dont le facteur de travail est réglable via les
+settings.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+)
+
+
+def _param(name, default):
+    """
+    Lit un paramètre de la politique de hachage (settings.PASSWORD_HASHING).
+    """
+    return getattr(settings, 'PASSWORD_HASHING', {}).get(name, default)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id avec coûts en temps, mémoire et parallélisme configurables."""
+
+    def __init__(self):
+        self.time_cost = _param('ARGON2_TIME_COST', self.time_cost)
+        self.memory_cost = _param('ARGON2_MEMORY_COST', self.memory_cost)
+        self.parallelism = _param('ARGON2_PARALLELISM', self.parallelism)
+
+
+class TunedBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    """bcrypt (précédé de SHA-256) avec nombre de tours configurable."""
+
+    def __init__(self):
+        self.rounds = _param('BCRYPT_ROUNDS', self.rounds)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 avec nombre d'itérations configurable."""
+
+    def __init__(self):
+        self.iterations = _param('PBKDF2_ITERATIONS', self.iterations)
@@ -0,0 +1,274 @@
+"""
+Hachage des mots de passe, optionnellement exécuté dans un pool de processus
+borné.
+
+Quand `PASSWORD_HASHING_POOL_SIZE` vaut 0 (défaut), le hachage reste exécuté
+dans le thread de la requête, comme le fait Django.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingPoolFull(APIException):
+    """Levée quand la file d'attente du pool de hachage est pleine."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Service temporairement surchargé, veuillez réessayer.')
+    default_code = 'hashing_pool_full'
+
+
+def init_worker(settings_module):
+    """
+    Initialise Django dans un processus du pool (nécessaire avec `spawn`).
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def _verify(password, encoded):
+    """
+    Vérifie un mot de passe et indique si son hachage doit être mis à jour.
+    """
+    if password is None or not hashers.is_password_usable(encoded):
+        return False, False
+    preferred = hashers.get_hasher('default')
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False, False
+
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    is_correct = hasher.verify(password, encoded)
+    # Même protection contre les attaques temporelles que django.contrib.auth
+    if not is_correct and not hasher_changed and must_update:
+        hasher.harden_runtime(password, encoded)
+    return is_correct, must_update
+
+
+def _map_chunk(fn, chunk):
+    """Applique `fn` à un morceau de lot dans un processus du pool."""
+    return [fn(item) for item in chunk]
+
+
+class HashingPool:
+    """
+    Pool de processus dont le nombre de tâches en cours et en attente est
+    borné.
+    """
+
+    def __init__(self, size, queue_depth, timeout=None):
+        self.size = size  # Nombre de processus de hachage
+        # Nombre de tâches pouvant attendre un processus
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size + queue_depth)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """Démarre les processus à la première utilisation."""
+        with self._lock:
+            if self._executor is None:
+                settings_module = os.environ.get(
+                    'DJANGO_SETTINGS_MODULE', 'app.settings')
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=(settings_module,),
+                )
+            return self._executor
+
+    def _reset(self, executor):
+        """
+        Abandonne un pool cassé (processus mort) ; le suivant est créé à la
+        demande.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def run(self, fn, *args):
+        """
+        Exécute `fn(*args)` dans le pool. Lève HashingPoolFull (503) si la file
+        est pleine, si le résultat n'arrive pas dans le délai ou si un
+        processus du pool est mort.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolFull()
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset(executor)
+            raise HashingPoolFull()
+        except BaseException:
+            self._slots.release()
+            raise
+        # La place n'est rendue qu'à la fin de la tâche, même après un
+        # dépassement du délai
+        future.add_done_callback(lambda f: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            future.cancel()
+            raise HashingPoolFull()
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise HashingPoolFull()
+
+    def map(self, fn, items):
+        """
+        Exécute `fn` sur chaque élément, réparti sur tous les processus du
+        pool, et retourne la liste des résultats. Le lot occupe une seule place
+        de la file ; le délai s'applique au lot entier. Lève HashingPoolFull
+        comme run().
+        """
+        items = list(items)
+        if not items:
+            return []
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolFull()
+        executor = self._get_executor()
+        # Un morceau par processus : le lot est haché en parallèle
+        chunksize = -(-len(items) // self.size)
+        futures = []
+        try:
+            for start in range(0, len(items), chunksize):
+                chunk = items[start:start + chunksize]
+                futures.append(executor.submit(_map_chunk, fn, chunk))
+        except BrokenProcessPool:
+            self._release_when_done(futures)
+            self._reset(executor)
+            raise HashingPoolFull()
+        except BaseException:
+            self._release_when_done(futures)
+            raise
+        # Comme run() : la place n'est rendue qu'à la fin de tous les morceaux
+        self._release_when_done(futures)
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+        try:
+            results = []
+            for future in futures:
+                remaining = None
+                if deadline is not None:
+                    remaining = max(0, deadline - time.monotonic())
+                results.extend(future.result(timeout=remaining))
+            return results
+        except FuturesTimeoutError:
+            for future in futures:
+                future.cancel()
+            raise HashingPoolFull()
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise HashingPoolFull()
+
+    def _release_when_done(self, futures):
+        """Rend la place de la file quand toutes les tâches sont finies."""
+        if not futures:
+            self._slots.release()
+            return
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(future):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._slots.release()
+
+        for future in futures:
+            future.add_done_callback(done)
+
+    def shutdown(self):
+        """Arrête les processus du pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Retourne le pool configuré dans les settings, ou None en mode synchrone.
+    """
+    global _pool
+    size = settings.PASSWORD_HASHING_POOL_SIZE
+    if size <= 0:
+        return None
+    config = (
+        size,
+        settings.PASSWORD_HASHING_POOL_QUEUE_DEPTH,
+        settings.PASSWORD_HASHING_POOL_TIMEOUT,
+    )
+    with _pool_lock:
+        current = _pool and (_pool.size, _pool.queue_depth, _pool.timeout)
+        if current != config:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = HashingPool(*config)
+        return _pool
+
+
+def shutdown_pool():
+    """Arrête le pool du processus s'il existe (fin d'un worker du serveur)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def make_password(raw_password):
+    """Hache un mot de passe avec le hacheur préféré."""
+    pool = get_pool()
+    if pool is None or raw_password is None:
+        return hashers.make_password(raw_password)
+    return pool.run(hashers.make_password, raw_password)
+
+
+def make_passwords(raw_passwords):
+    """
+    Hache une liste de mots de passe, en parallèle sur les processus du pool
+    s'il est activé.
+    """
+    pool = get_pool()
+    if pool is None:
+        return [hashers.make_password(password) for password in raw_passwords]
+    return pool.map(hashers.make_password, raw_passwords)
+
+
+def check_password(raw_password, encoded, setter=None):
+    """
+    Vérifie un mot de passe et appelle `setter` si son hachage est obsolète.
+    """
+    pool = get_pool()
+    if pool is None:
+        return hashers.check_password(raw_password, encoded, setter)
+    is_correct, must_update = pool.run(_verify, raw_password, encoded)
+    if setter and is_correct and must_update:
+        setter(raw_password)
+    return is_correct
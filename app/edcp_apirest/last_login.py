@@ -0,0 +1,276 @@
+"""
+Écriture différée de last_login (LAST_LOGIN_MODE = 'buffered').
+
+Chaque connexion (signal user_logged_in) enregistre sa date dans un tampon au
+lieu d'écrire la ligne de l'utilisateur ; le tampon est vidé par un UPDATE
+groupé (UPDATE ... FROM (VALUES ...)) depuis un fil du processus, démarré à la
+première connexion : toutes les LAST_LOGIN_FLUSH_INTERVAL secondes, ou plus tôt
+dès LAST_LOGIN_FLUSH_MAX_SIZE utilisateurs en attente. Aucune requête HTTP ne
+paie le vidage. Le tampon est aussi vidé à l'arrêt d'un worker gunicorn et par
+`python manage.py flush_last_login`.
+
+Le tampon est propre au processus, ou partagé par le cache
+LAST_LOGIN_CACHE_ALIAS (nécessaire pour que la commande vide les dates
+enregistrées par les workers). Une date non encore écrite est perdue si le
+processus est tué : last_login est une information d'affichage, pas un contrôle
+d'accès.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connections, router
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Clés du tampon partagé : compteur de positions, dernière position vidée,
+# verrou, première position manquante (position, date où elle a été vue) et
+# positions
+SEQUENCE_KEY = 'edcp:last_login:seq'
+FLUSHED_KEY = 'edcp:last_login:flushed'
+LOCK_KEY = 'edcp:last_login:lock'
+MISSING_KEY = 'edcp:last_login:missing'
+SLOT_KEY = 'edcp:last_login:{}'
+# Durée de vie (secondes) d'une position du tampon partagé et du verrou
+SLOT_TTL = 24 * 3600
+LOCK_TTL = 60
+# Délai (secondes) au-delà duquel une position réservée mais toujours vide
+# (processus tué entre incr() et set(), entrée évincée) est abandonnée au lieu
+# de bloquer le vidage
+MISSING_SLOT_GRACE = 60
+
+
+def update_last_login(pending, using=None, batch_size=500):
+    """
+    Écrit les dates {identifiant: date} par UPDATE ... FROM (VALUES ...) de
+    `batch_size` lignes et retourne le nombre de lignes modifiées. Une date
+    plus ancienne que celle déjà en base est ignorée.
+    """
+    User = get_user_model()
+    using = using or router.db_for_write(User)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(User._meta.db_table)
+    pk = quote(User._meta.pk.column)
+    column = quote(User._meta.get_field('last_login').column)
+    # Ordre stable des verrous de ligne : deux vidages simultanés ne
+    # s'interbloquent pas
+    items = sorted(pending.items())
+    updated = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            values = ', '.join(['(%s, %s)'] * len(batch))
+            cursor.execute(
+                f'UPDATE {table} AS u SET {column} = v.last_login '
+                f'FROM (VALUES {values}) AS v(id, last_login) '
+                f'WHERE u.{pk} = v.id '
+                f'AND (u.{column} IS NULL OR u.{column} < v.last_login)',
+                [param for item in batch for param in item],
+            )
+            updated += cursor.rowcount
+    return updated
+
+
+class LastLoginBuffer:
+    """
+    Tampon des dates de connexion (identifiant -> date la plus récente), vidé
+    par lots.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread = None  # Fil de vidage périodique
+        self._pid = None  # Processus du fil (un fork ne l'hérite pas)
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self.recorded = 0  # Connexions enregistrées
+        self.flushed = 0  # Lignes écrites en base
+
+    @staticmethod
+    def _shared_cache():
+        alias = settings.LAST_LOGIN_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def _store(self, user_id, when):
+        cache = self._shared_cache()
+        if cache is None:
+            with self._lock:
+                previous = self._pending.get(user_id)
+                if previous is None or previous < when:
+                    self._pending[user_id] = when
+            return
+        # Une position par connexion : incr est atomique dans le cache partagé
+        cache.add(SEQUENCE_KEY, 0, None)
+        position = cache.incr(SEQUENCE_KEY)
+        cache.set(SLOT_KEY.format(position), (user_id, when), SLOT_TTL)
+
+    def record(self, user, when=None):
+        """
+        Enregistre la connexion de `user` ; le fil de vidage écrit la date plus
+        tard.
+        """
+        when = when or timezone.now()
+        user.last_login = when  # L'instance courante reflète la connexion
+        self._store(user.pk, when)
+        self.recorded += 1
+        self._start()
+        if self.pending() >= settings.LAST_LOGIN_FLUSH_MAX_SIZE:
+            self._wakeup.set()  # Vidage anticipé, hors de la requête
+
+    def _start(self):
+        """
+        Démarre le fil de vidage du processus s'il ne tourne pas (après un fork
+        notamment).
+        """
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._wakeup = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, name='last-login-flush', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        """
+        Boucle du fil de vidage : un vidage par intervalle ou à chaque réveil.
+        """
+        while not self._stopping:
+            self._wakeup.wait(max(settings.LAST_LOGIN_FLUSH_INTERVAL, 0.01))
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Les dates sont revenues dans le tampon : nouvel essai à
+                # l'intervalle suivant
+                logger.exception('Échec du vidage des dates de connexion')
+            finally:
+                # Connexion propre au fil : fermée entre deux vidages
+                connections.close_all()
+
+    def stop(self, timeout=None):
+        """
+        Arrête le fil de vidage (les dates en attente restent dans le tampon).
+        """
+        with self._thread_lock:
+            thread, self._stopping = self._thread, True
+            self._wakeup.set()
+            self._pid = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def pending(self):
+        """
+        Nombre de dates en attente (positions non vidées pour le tampon
+        partagé).
+        """
+        cache = self._shared_cache()
+        if cache is None:
+            return len(self._pending)
+        last = cache.get(SEQUENCE_KEY) or 0
+        return max(0, last - (cache.get(FLUSHED_KEY) or 0))
+
+    def drain(self):
+        """
+        Retire et retourne les dates en attente {identifiant: date la plus
+        récente}.
+        """
+        cache = self._shared_cache()
+        if cache is None:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            return pending
+        # Un seul vidage à la fois ; les autres processus repasseront à
+        # l'intervalle suivant
+        if not cache.add(LOCK_KEY, 1, LOCK_TTL):
+            return {}
+        try:
+            last = cache.get(SEQUENCE_KEY) or 0
+            first = (cache.get(FLUSHED_KEY) or 0) + 1
+            entries = cache.get_many([
+                SLOT_KEY.format(position)
+                for position in range(first, last + 1)
+            ])
+            pending = {}
+            flushed = first - 1
+            for position in range(first, last + 1):
+                entry = entries.get(SLOT_KEY.format(position))
+                # Position réservée par incr() mais pas encore écrite : le
+                # vidage s'y arrête
+                if entry is None and not self._abandoned(cache, position):
+                    break
+                if entry is not None:
+                    user_id, when = entry
+                    if user_id not in pending or pending[user_id] < when:
+                        pending[user_id] = when
+                flushed = position
+            cache.delete_many([
+                SLOT_KEY.format(position)
+                for position in range(first, flushed + 1)
+            ])
+            cache.set(FLUSHED_KEY, flushed, None)
+        finally:
+            cache.delete(LOCK_KEY)
+        return pending
+
+    @staticmethod
+    def _abandoned(cache, position):
+        """
+        Indique si la position manquante l'est depuis plus de
+        MISSING_SLOT_GRACE secondes.
+        """
+        now = time.time()
+        missing = cache.get(MISSING_KEY)
+        if missing is None or missing[0] != position:
+            cache.set(MISSING_KEY, (position, now), SLOT_TTL)
+            return False
+        return now - missing[1] >= MISSING_SLOT_GRACE
+
+    def flush(self, using=None, batch_size=None):
+        """
+        Écrit les dates en attente et retourne le nombre de lignes modifiées.
+        """
+        pending = self.drain()
+        if not pending:
+            return 0
+        try:
+            updated = update_last_login(
+                pending, using=using,
+                batch_size=batch_size or settings.LAST_LOGIN_FLUSH_BATCH_SIZE,
+            )
+        except Exception:
+            # Base indisponible : les dates reviennent dans le tampon pour le
+            # vidage suivant
+            for user_id, when in pending.items():
+                self._store(user_id, when)
+            raise
+        self.flushed += updated
+        return updated
+
+    def clear(self):
+        """Vide le tampon sans écrire (tests)."""
+        self.drain()
+        self.recorded = self.flushed = 0
+
+    def stats(self):
+        """Retourne les compteurs du tampon."""
+        return {
+            'pending': self.pending(),
+            'recorded': self.recorded,
+            'flushed': self.flushed,
+        }
+
+
+# Tampon du processus
+buffer = LastLoginBuffer()
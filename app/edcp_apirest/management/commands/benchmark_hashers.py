@@ -0,0 +1,68 @@
+"""
+Commande Django pour mesurer le coût des hacheurs de mots de passe sur cette
+machine.
+"""
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Mesure le nombre de connexions par seconde pour chaque hacheur configuré.
+    """
+
+    help = (
+        "Mesure les connexions/s (vérifications de mot de passe) "
+        "par hacheur."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=20,
+            help='Nombre de vérifications par hacheur (défaut : 20).',
+        )
+        parser.add_argument(
+            '--hashers', nargs='*', default=None,
+            help=(
+                'Algorithmes à mesurer '
+                '(défaut : tous ceux de PASSWORD_HASHERS).'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        iterations = max(1, options['iterations'])
+        selected = options['hashers']
+        password = 'benchmark-password-123'
+
+        self.stdout.write(
+            f"{'algorithme':<16}{'hachage (ms)':>14}{'connexions/s':>16}")
+        for hasher in get_hashers():
+            if selected and hasher.algorithm not in selected:
+                continue
+            try:
+                # Le premier hachage, non mesuré, charge la bibliothèque
+                # éventuelle (argon2, bcrypt)
+                hasher.encode(password, hasher.salt())
+            except ValueError as exc:
+                self.stdout.write(self.style.WARNING(
+                    f'{hasher.algorithm:<16}indisponible : {exc}'))
+                continue
+            start = time.perf_counter()
+            encoded = hasher.encode(password, hasher.salt())
+            encode_ms = (time.perf_counter() - start) * 1000
+
+            # Une connexion réussie coûte une vérification du mot de passe
+            start = time.perf_counter()
+            for _ in range(iterations):
+                hasher.verify(password, encoded)
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f'{hasher.algorithm:<16}{encode_ms:>14.1f}'
+                f'{iterations / elapsed:>16.1f}'
+            )
@@ -0,0 +1,111 @@
+"""
+Commande Django de mesure du coût de la pile de middlewares par requête.
+"""
+import json
+import logging
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+
+class Command(BaseCommand):
+    """
+    Compare la pile complète et la voie rapide de l'API
+    (API_FAST_PATH_PREFIXES).
+    """
+
+    help = (
+        "Mesure le temps par requête et les requêtes SQL d'un appel à l'API "
+        "avec la pile de middlewares complète puis avec la voie rapide "
+        "API_FAST_PATH_PREFIXES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='/api/user/create/',
+            help=(
+                'Chemin appelé (défaut : /api/user/create/, POST invalide '
+                'sans hachage).'
+            ),
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Nombre de requêtes mesurées par pile (défaut : 2000).',
+        )
+        parser.add_argument(
+            '--session-cookie', default='benchmark-session',
+            help=(
+                'Cookie de session envoyé, comme un navigateur connecté à '
+                'l\'admin ("" pour aucun).'
+            ),
+        )
+
+    def _measure(self, path, requests, cookie, fast_path_prefixes):
+        """
+        Retourne (µs par requête, requêtes SQL par requête, statut) pour une
+        configuration.
+        """
+        with override_settings(
+            API_FAST_PATH_PREFIXES=fast_path_prefixes, THROTTLE_ENABLED=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        ):
+            handler = BaseHandler()
+            handler.load_middleware()
+            factory = RequestFactory()
+            if cookie:
+                factory.cookies['sessionid'] = cookie
+
+            def call():
+                request = factory.post(
+                    path, data=json.dumps({}), content_type='application/json')
+                return handler.get_response(request)
+
+            # Chauffe (imports, caches) puis mesure
+            for _ in range(min(50, requests)):
+                call()
+            with CaptureQueriesContext(connection) as queries:
+                status = call().status_code
+            timings = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                call()
+                timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1e6, len(queries), status
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        if options['requests'] < 1:
+            raise CommandError('--requests doit être supérieur à 0.')
+        path = options['path']
+        # Pas de journalisation « Bad Request » pour chaque requête mesurée
+        logger = logging.getLogger('django.request')
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        try:
+            requests, cookie = options['requests'], options['session_cookie']
+            full = self._measure(path, requests, cookie, [])
+            fast = self._measure(path, requests, cookie, [path])
+        finally:
+            logger.setLevel(level)
+
+        self.stdout.write(
+            f"POST {path} ({options['requests']} requêtes, médiane)")
+        self.stdout.write(
+            f"{'pile':<10}{'µs/req':>10}{'SQL/req':>9}{'statut':>8}")
+        stacks = (('complète', full), ('api', fast))
+        for label, (duration, queries, status) in stacks:
+            self.stdout.write(
+                f'{label:<10}{duration:>10.1f}{queries:>9}{status:>8}')
+        gain = full[0] - fast[0]
+        self.stdout.write(self.style.SUCCESS(
+            f'Gain : {gain:.1f} µs/req ({gain / full[0] * 100:.1f} %), '
+            f'{full[1] - fast[1]} requête(s) SQL en moins.'
+        ))
@@ -0,0 +1,33 @@
+"""
+Commande Django de construction de l'artefact du schéma OpenAPI.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from edcp_apirest import schema
+
+
+class Command(BaseCommand):
+    """
+    Génère le schéma OpenAPI une fois (build, déploiement) pour que les workers
+    le servent tel quel.
+    """
+
+    help = (
+        "Génère le schéma OpenAPI dans SCHEMA_FILE (ou --output) ; "
+        "/api/schema/ le sert ensuite depuis la mémoire sans importer "
+        "drf_spectacular. À relancer à chaque modification de l'API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', help='Fichier JSON à écrire (défaut : SCHEMA_FILE).')
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        path = options['output'] or settings.SCHEMA_FILE
+        size = schema.build(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Schéma OpenAPI écrit dans {path} ({size} octets).'))
@@ -0,0 +1,44 @@
+"""
+Commande Django de vidage du tampon des dates de connexion.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from edcp_apirest.last_login import buffer
+
+
+class Command(BaseCommand):
+    """
+    Écrit en base les dates de connexion en attente (mode 'buffered' de
+    LAST_LOGIN_MODE).
+    """
+
+    help = (
+        "Écrit les dates de connexion en attente par UPDATE groupés. Le "
+        "tampon des workers n'est visible de la commande que s'il est partagé "
+        "(LAST_LOGIN_CACHE_ALIAS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            help=(
+                'Nombre de lignes par UPDATE '
+                '(défaut : LAST_LOGIN_FLUSH_BATCH_SIZE).'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size doit être supérieur à 0.')
+        if not settings.LAST_LOGIN_CACHE_ALIAS:
+            self.stderr.write(self.style.WARNING(
+                'LAST_LOGIN_CACHE_ALIAS n\'est pas défini : seul le tampon '
+                'de ce processus est vidé.'
+            ))
+        updated = buffer.flush(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{updated} date(s) de connexion écrite(s).'))
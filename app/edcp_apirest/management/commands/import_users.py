@@ -0,0 +1,276 @@
+"""
+Commande Django pour importer des utilisateurs en masse depuis un fichier CSV
+ou JSONL.
+"""
+import csv
+import io
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+
+from edcp_apirest import hashing
+
+
+def _read_rows(path, fmt):
+    """
+    Lit le fichier ligne à ligne et produit des triplets (numéro de ligne,
+    dict, erreur). Une ligne JSONL illisible produit (numéro, None, message)
+    sans interrompre la lecture.
+    """
+    with open(path, newline='', encoding='utf-8') as stream:
+        if fmt == 'csv':
+            # La ligne 1 est l'en-tête
+            for line_no, row in enumerate(csv.DictReader(stream), start=2):
+                yield line_no, row, None
+        else:
+            for line_no, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield line_no, None, f'JSON invalide ({exc})'
+                    continue
+                if isinstance(row, dict):
+                    yield line_no, row, None
+                else:
+                    yield line_no, None, 'objet JSON attendu'
+
+
+def _as_bool(value, default):
+    """Convertit une valeur CSV/JSON en booléen."""
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 't', 'yes', 'oui')
+
+
+class Command(BaseCommand):
+    """Importe des utilisateurs par lots (bulk_create ou COPY PostgreSQL)."""
+
+    help = (
+        "Importe des utilisateurs depuis un fichier CSV ou JSONL "
+        "(email, password, name)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Fichier CSV (avec en-tête) ou JSONL à importer.',
+        )
+        parser.add_argument(
+            '--format', choices=['csv', 'jsonl'], default=None,
+            help="Format du fichier (déduit de l'extension par défaut).",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Nombre de lignes insérées par lot (défaut : 1000).',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help=(
+                'Processus de hachage des mots de passe '
+                '(0 = dans le processus courant).'
+            ),
+        )
+        parser.add_argument(
+            '--method', choices=['bulk', 'copy'], default='bulk',
+            help='bulk_create (toutes bases) ou COPY (PostgreSQL uniquement).',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        path = options['path']
+        fmt = options['format']
+        if fmt is None:
+            fmt = 'jsonl' if path.endswith(('.jsonl', '.json')) else 'csv'
+        if not os.path.exists(path):
+            raise CommandError(f'Fichier introuvable : {path}')
+        if options['method'] == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError('La méthode COPY nécessite PostgreSQL.')
+
+        self.model = get_user_model()
+        if options['method'] == 'copy':
+            self.insert = self._insert_copy
+        else:
+            self.insert = self._insert_bulk
+        self.seen = set()  # Emails déjà rencontrés dans le fichier
+        self.read = self.created = self.errors = 0
+
+        executor = None
+        if options['workers'] > 0:
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=hashing.init_worker,
+                initargs=(
+                    os.environ.get('DJANGO_SETTINGS_MODULE', 'app.settings'),
+                ),
+            )
+
+        start = time.perf_counter()
+        try:
+            rows = _read_rows(path, fmt)
+            while True:
+                batch = list(islice(rows, max(1, options['batch_size'])))
+                if not batch:
+                    break
+                self._import_batch(batch, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        elapsed = time.perf_counter() - start
+
+        rate = self.read / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{self.created} utilisateur(s) créé(s), '
+            f'{self.errors} erreur(s) sur {self.read} ligne(s) '
+            f'en {elapsed:.2f} s ({rate:.0f} lignes/s)'
+        ))
+
+    def _error(self, line_no, message):
+        """Signale une erreur sur une ligne sans interrompre l'import."""
+        self.errors += 1
+        self.stderr.write(f'ligne {line_no} : {message}')
+
+    def _import_batch(self, batch, executor):
+        """Valide, hache et insère un lot de lignes."""
+        self.read += len(batch)
+        candidates = []
+        for line_no, row, error in batch:
+            if error is not None:
+                self._error(line_no, error)
+                continue
+            email = (str(row.get('email') or '')).strip()
+            if not email:
+                self._error(line_no, 'email manquant')
+                continue
+            email = self.model.objects.normalize_email(email)
+            # Les emails ne diffèrent pas par la casse (index unique sur
+            # LOWER(email))
+            if email.lower() in self.seen:
+                self._error(
+                    line_no, f'email en double dans le fichier ({email})')
+                continue
+            self.seen.add(email.lower())
+            candidates.append((line_no, email, row))
+
+        # Une seule requête pour détecter les emails déjà présents en base
+        found = self.model.objects.filter_emails(
+            [email for _, email, _ in candidates]
+        ).values_list('email', flat=True)
+        existing = {email.lower() for email in found}
+        pending = []
+        for line_no, email, row in candidates:
+            if email.lower() in existing:
+                self._error(line_no, f'email déjà utilisé ({email})')
+            else:
+                pending.append((line_no, email, row))
+        if not pending:
+            return
+
+        passwords = [row.get('password') or None for _, _, row in pending]
+        if executor is not None:
+            chunksize = max(1, len(passwords) // 32)
+            hashed = list(
+                executor.map(make_password, passwords, chunksize=chunksize))
+        else:
+            hashed = [make_password(password) for password in passwords]
+
+        users = [
+            self.model(
+                email=email,
+                name=row.get('name') or '',
+                password=password,
+                is_active=_as_bool(row.get('is_active'), True),
+                is_staff=_as_bool(row.get('is_staff'), False),
+            )
+            for (_, email, row), password in zip(pending, hashed)
+        ]
+        self.insert(pending, users)
+
+    def _insert_bulk(self, pending, users):
+        """
+        Insère le lot avec bulk_create ; les conflits concurrents sont signalés
+        ligne par ligne.
+        """
+        with transaction.atomic():
+            self.model.objects.bulk_create(
+                users, batch_size=len(users), ignore_conflicts=True)
+            # bulk_create(ignore_conflicts=True) ne dit pas quelles lignes ont
+            # été ignorées : le hachage, salé donc unique, reconnaît les lignes
+            # insérées par ce lot
+            stored = {
+                email.lower(): password
+                for email, password in self.model.objects.filter_emails(
+                    [user.email for user in users]
+                ).values_list('email', 'password')
+            }
+
+        # Les lignes non insérées ont été créées entre-temps par un autre
+        # processus
+        for (line_no, email, _), user in zip(pending, users):
+            if stored.get(email.lower()) == user.password:
+                self.created += 1
+            else:
+                self._error(line_no, f'email déjà utilisé ({email})')
+
+    def _insert_copy(self, pending, users):
+        """
+        Insère le lot via COPY dans une table temporaire puis INSERT ... ON
+        CONFLICT.
+        """
+        opts = self.model._meta
+        fields = [
+            f for f in opts.concrete_fields
+            if not isinstance(f, models.AutoField)
+        ]
+        quote_name = connection.ops.quote_name
+        columns = ', '.join(quote_name(f.column) for f in fields)
+        table = quote_name(opts.db_table)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for user in users:
+            values = [
+                f.get_db_prep_save(f.pre_save(user, True), connection)
+                for f in fields
+            ]
+            writer.writerow(
+                ['\\N' if value is None else value for value in values])
+        buffer.seek(0)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE import_users_tmp ON COMMIT DROP AS '
+                f'SELECT {columns} FROM {table} WITH NO DATA'
+            )
+            cursor.copy_expert(
+                f'COPY import_users_tmp ({columns}) FROM STDIN '
+                f"WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) '
+                f'SELECT {columns} FROM import_users_tmp '
+                f'ON CONFLICT DO NOTHING RETURNING {quote_name("email")}'
+            )
+            inserted = {email for (email,) in cursor.fetchall()}
+
+        # Les lignes non insérées ont été créées entre-temps par un autre
+        # processus
+        for line_no, email, _ in pending:
+            if email in inserted:
+                self.created += 1
+            else:
+                self._error(line_no, f'email déjà utilisé ({email})')
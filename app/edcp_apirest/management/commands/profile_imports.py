@@ -0,0 +1,98 @@
+"""
+Commande Django de profil des imports au démarrage d'un worker.
+"""
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def parse_importtime(output):
+    """
+    Retourne [(module, temps propre µs, temps cumulé µs, profondeur)] depuis la
+    sortie de -X importtime.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_time), int(cumulative), depth))
+    return modules
+
+
+class Command(BaseCommand):
+    """
+    Mesure, dans un processus neuf, le temps d'import des settings, des
+    applications et des URL.
+    """
+
+    help = (
+        "Rapport du temps d'import (python -X importtime) de django.setup() "
+        "(settings et applications) puis de ROOT_URLCONF, par paquet et par "
+        "module."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Nombre de lignes par tableau (défaut : 20).',
+        )
+        parser.add_argument(
+            '--module', action='append',
+            help=(
+                'Module importé après django.setup() (répétable, défaut : '
+                'ROOT_URLCONF).'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        modules = options['module'] or [settings.ROOT_URLCONF]
+        imports = '; '.join(f'import {module}' for module in modules)
+        code = f'import django; django.setup(); {imports}'
+        # SETTINGS_MODULE vaut None sous override_settings (tests)
+        env = {**os.environ}
+        env.setdefault(
+            'DJANGO_SETTINGS_MODULE',
+            settings.SETTINGS_MODULE or 'app.settings',
+        )
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            env=env, capture_output=True, text=True,
+        )
+        if process.returncode != 0:
+            raise CommandError(
+                f'Échec de l\'import :\n{process.stderr[-2000:]}')
+        imports = parse_importtime(process.stderr)
+
+        # Les imports de premier niveau couvrent tout le démarrage
+        total = sum(
+            cumulative for _, _, cumulative, depth in imports if depth == 0)
+        self.stdout.write(
+            f'Imports de django.setup() + {", ".join(modules)} : '
+            f'{total / 1000:.1f} ms'
+        )
+
+        packages = defaultdict(int)
+        for name, self_time, _, _ in imports:
+            packages[name.split('.')[0]] += self_time
+        self.stdout.write(f"\n{'paquet':<40}{'ms':>10}{'%':>8}")
+        top = options['top']
+        for package, self_time in sorted(
+                packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(
+                f'{package:<40}{self_time / 1000:>10.1f}'
+                f'{self_time / total * 100:>8.1f}'
+            )
+
+        self.stdout.write(f"\n{'module (temps cumulé)':<60}{'ms':>10}")
+        for name, _, cumulative, _ in sorted(
+                imports, key=lambda item: -item[2])[:top]:
+            self.stdout.write(f'{name:<60}{cumulative / 1000:>10.1f}')
@@ -0,0 +1,64 @@
+"""
+Commande Django de purge des jetons d'authentification expirés.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router
+from django.utils import timezone
+
+from edcp_apirest.models import AuthToken
+
+
+class Command(BaseCommand):
+    """
+    Supprime les jetons expirés par lots courts, sans verrouiller la table.
+    """
+
+    help = (
+        "Supprime les jetons d'authentification expirés par lots (un DELETE "
+        "court par lot, en autocommit) ; à lancer périodiquement (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Nombre de jetons supprimés par lot (défaut : 1000).',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help=(
+                'Pause en secondes entre deux lots, pour étaler la charge '
+                '(défaut : 0).'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size doit être supérieur à 0.')
+
+        # Date de référence fixe : les jetons qui expirent pendant la purge
+        # attendront la suivante
+        now = timezone.now()
+        # Clés lues et supprimées sur la base d'écriture, pas sur un réplica
+        tokens = AuthToken.objects.db_manager(router.db_for_write(AuthToken))
+        deleted = batches = 0
+        while True:
+            # Parcours de l'index sur expires, limité à un lot
+            keys = list(
+                tokens.expired(now).order_by('expires')
+                .values_list('key', flat=True)[:options['chunk_size']]
+            )
+            if not keys:
+                break
+            deleted += tokens.delete_keys(keys)
+            batches += 1
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} jeton(s) expiré(s) supprimé(s) en {batches} lot(s).'
+        ))
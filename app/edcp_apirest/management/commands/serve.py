@@ -0,0 +1,117 @@
+"""
+Commande Django de lancement du serveur de production (gunicorn).
+"""
+import importlib.util
+import os
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from edcp_apirest.server import ASGI_WORKER_CLASS, gunicorn_settings
+
+# Fichier de configuration gunicorn, à côté de manage.py
+CONFIG_FILE = os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+
+
+class Command(BaseCommand):
+    """
+    Remplace le processus par gunicorn, configuré par gunicorn.conf.py et les
+    options.
+    """
+
+    help = (
+        "Lance l'application sous gunicorn (workers et threads dérivés des "
+        "CPU, préchargement, recyclage des workers, arrêt propre sur "
+        "SIGTERM)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bind',
+            help='Adresse d\'écoute (défaut : WEB_BIND ou 0.0.0.0:8000).',
+        )
+        parser.add_argument(
+            '--workers', type=int,
+            help='Nombre de processus (défaut : calculé).',
+        )
+        parser.add_argument(
+            '--threads', type=int,
+            help='Threads par processus WSGI (défaut : calculé).',
+        )
+        parser.add_argument(
+            '--max-requests', type=int,
+            help=(
+                'Requêtes avant recyclage d\'un worker, 0 pour jamais '
+                '(défaut : 1000).'
+            ),
+        )
+        parser.add_argument(
+            '--asgi', action='store_true',
+            help='Sert app.asgi avec des workers uvicorn.',
+        )
+        parser.add_argument(
+            '--no-preload', action='store_true',
+            help='Charge l\'application dans chaque worker.',
+        )
+        parser.add_argument(
+            '--print-config', action='store_true',
+            help='Affiche la configuration calculée sans lancer le serveur.',
+        )
+
+    def environment(self, options):
+        """
+        Retourne l'environnement du serveur : variables WEB_* complétées par
+        les options.
+        """
+        env = dict(os.environ)
+        overrides = {
+            'WEB_BIND': options['bind'],
+            'WEB_WORKERS': options['workers'],
+            'WEB_THREADS': options['threads'],
+            'WEB_MAX_REQUESTS': options['max_requests'],
+        }
+        env.update({
+            name: str(value) for name, value in overrides.items()
+            if value is not None
+        })
+        if options['asgi']:
+            env['WEB_ASGI'] = '1'
+        if options['no_preload']:
+            env['WEB_PRELOAD'] = '0'
+        env.setdefault(
+            'DJANGO_SETTINGS_MODULE',
+            settings.SETTINGS_MODULE or 'app.settings',
+        )
+        return env
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        env = self.environment(options)
+        config = gunicorn_settings(env)
+        if options['print_config']:
+            for name, value in config.items():
+                self.stdout.write(f'{name} = {value!r}')
+            return
+
+        if importlib.util.find_spec('gunicorn') is None:
+            raise CommandError(
+                'gunicorn n\'est pas installé (voir requirements.txt).')
+        asgi = config['worker_class'] == ASGI_WORKER_CLASS
+        if asgi and importlib.util.find_spec('uvicorn') is None:
+            raise CommandError(
+                'Le mode ASGI nécessite uvicorn : pip install uvicorn.')
+        application = (
+            'app.asgi:application' if options['asgi']
+            else 'app.wsgi:application'
+        )
+        argv = [
+            sys.executable, '-m', 'gunicorn', '-c', CONFIG_FILE, application,
+        ]
+        sys.stdout.flush()
+        # gunicorn remplace ce processus et reçoit directement les signaux
+        # (SIGTERM : arrêt propre)
+        os.chdir(settings.BASE_DIR)
+        os.execvpe(sys.executable, argv, env)
@@ -0,0 +1,157 @@
+"""
+Commande Django de test de fumée du serveur de production.
+
+Lance `manage.py serve` sur un port local, exécute `benchmark_api` contre lui
+(avec recyclage des workers pendant la mesure), puis vérifie l'arrêt propre
+sur SIGTERM.
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+
+def free_port():
+    """Retourne un port TCP local libre."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    """
+    Démarre gunicorn, le mesure avec benchmark_api et vérifie son arrêt propre.
+    """
+
+    help = (
+        "Test de fumée du serveur de production : démarrage de gunicorn, "
+        "benchmark_api contre lui, puis arrêt propre (SIGTERM). La base "
+        "configurée doit être disponible."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Nombre de workers (défaut : 2).',
+        )
+        parser.add_argument(
+            '--max-requests', type=int, default=50,
+            help=(
+                'Recyclage des workers pendant la mesure '
+                '(défaut : 50 requêtes).'
+            ),
+        )
+        parser.add_argument(
+            '--requests', type=int, default=100,
+            help='Requêtes par scénario (défaut : 100).',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Clients simultanés (défaut : 4).',
+        )
+        parser.add_argument(
+            '--startup-timeout', type=float, default=30,
+            help='Attente du démarrage (s).',
+        )
+        parser.add_argument(
+            '--output', help='Fichier JSON des résultats de benchmark_api.')
+
+    def _wait_ready(self, process, port, timeout):
+        """Attend que le serveur accepte les connexions."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(
+                    'Le serveur s\'est arrêté au démarrage '
+                    f'(code {process.returncode}).'
+                )
+            try:
+                with socket.create_connection(
+                        ('127.0.0.1', port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.1)
+        raise CommandError(f'Serveur non disponible après {timeout:g} s.')
+
+    def _stop(self, process, timeout):
+        """
+        Envoie SIGTERM et retourne la durée de l'arrêt ; tue le serveur s'il ne
+        s'arrête pas.
+        """
+        start = time.monotonic()
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise CommandError(
+                f'Le serveur ne s\'est pas arrêté {timeout:g} s '
+                'après SIGTERM.'
+            )
+        if process.returncode != 0:
+            raise CommandError(
+                f'Arrêt du serveur en erreur (code {process.returncode}).')
+        return time.monotonic() - start
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        port = free_port()
+        command = [
+            sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+            'serve', '--bind', f'127.0.0.1:{port}',
+            '--workers', str(options['workers']),
+            '--max-requests', str(options['max_requests']),
+        ]
+        # La limitation de débit compterait les requêtes répétées du benchmark
+        # comme des erreurs
+        env = {**os.environ, 'THROTTLE_ENABLED': '0', 'WEB_ACCESS_LOG': ''}
+        env.setdefault(
+            'DJANGO_SETTINGS_MODULE',
+            settings.SETTINGS_MODULE or 'app.settings',
+        )
+        process = subprocess.Popen(
+            command, env=env, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            start = time.monotonic()
+            self._wait_ready(process, port, options['startup_timeout'])
+            self.stdout.write(
+                f'Serveur prêt en {time.monotonic() - start:.2f} s '
+                f'sur le port {port}.'
+            )
+
+            with tempfile.TemporaryDirectory() as directory:
+                output = options['output'] or os.path.join(
+                    directory, 'results.json')
+                call_command(
+                    'benchmark_api', url=f'http://127.0.0.1:{port}',
+                    requests=options['requests'],
+                    concurrency=options['concurrency'], warmup=5,
+                    cleanup=True, output=output, stdout=self.stdout,
+                )
+                with open(output, encoding='utf-8') as stream:
+                    results = json.load(stream)
+        finally:
+            if process.poll() is None:
+                graceful = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+                shutdown = self._stop(process, graceful + 5)
+                self.stdout.write(f'Arrêt propre en {shutdown:.2f} s.')
+
+        errors = sum(
+            stats['errors'] for stats in results['scenarios'].values())
+        if errors:
+            raise CommandError(
+                f'{errors} requête(s) en erreur pendant le test de fumée.')
+        self.stdout.write(self.style.SUCCESS('Test de fumée réussi.'))
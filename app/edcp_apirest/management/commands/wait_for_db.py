@@ -1,37 +1,121 @@
 """
 Commande Django pour attendre que la base de données soit disponible.
 """
+import random
 import time
+from functools import partial
 
 from psycopg2 import OperationalError as Psycopg2OpError
 
-from django.db import OperationalError
-from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
     """Commande Django pour attendre que la base de données soit disponible."""
 
+    help = (
+        "Attend que la base de données soit disponible "
+        "(backoff exponentiel avec gigue)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--probe', choices=['check', 'select'], default='check',
+            help=(
+                "'check' lance les vérifications système, "
+                "'select' un simple SELECT 1."
+            ),
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help=(
+                'Attente maximale en secondes avant échec '
+                '(0 = illimitée, défaut : 60).'
+            ),
+        )
+        parser.add_argument(
+            '--initial-delay', type=float, default=0.1,
+            help=(
+                'Premier délai entre deux tentatives en secondes '
+                '(défaut : 0.1).'
+            ),
+        )
+        parser.add_argument(
+            '--max-delay', type=float, default=5,
+            help=(
+                'Délai maximal entre deux tentatives en secondes '
+                '(défaut : 5).'
+            ),
+        )
+
+    def _select_probe(self):
+        """Vérifie la connexion avec un simple SELECT 1."""
+        connection = connections['default']
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Exception:
+            # Repartir d'une connexion neuve à la tentative suivante
+            connection.close()
+            raise
+
     def handle(self, *args, **options):
         """
         Point d'entrée de la commande.
         """
         # Afficher un message pour indiquer que nous attendons que la base de données soit disponible
         self.stdout.write('En attente de la base de données...')
-        
+
+        if options['probe'] == 'select':
+            probe = self._select_probe
+        else:
+            probe = partial(self.check, databases=['default'])
+
+        start = time.monotonic()
+        deadline = None
+        if options['timeout'] > 0:
+            deadline = start + options['timeout']
+        attempts = 0
+        slept = 0.0
+
         # Variable pour suivre l'état de la base de données
         db_up = False
-        
+
         # Boucle pour attendre que la base de données soit disponible
         while db_up is False:
+            attempts += 1
             try:
                 # Vérifier l'état de la base de données
-                self.check(databases=['default'])
+                probe()
                 db_up = True  # Marquer la base de données comme disponible si la vérification réussit
             except (Psycopg2OpError, OperationalError):
-                # La base de données n'est pas disponible, attendre 1 seconde avant de réessayer
-                self.stdout.write('Base de données non disponible, attente de 1 seconde...')
-                time.sleep(1)
+                # Backoff exponentiel avec gigue : les réplicas ne réessaient
+                # pas tous en même temps
+                delay = min(
+                    options['max_delay'],
+                    options['initial_delay'] * 2 ** (attempts - 1),
+                )
+                delay = delay / 2 + random.uniform(0, delay / 2)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise CommandError(
+                            'Base de données indisponible après '
+                            f"{options['timeout']:g} s "
+                            f'({attempts} tentatives).'
+                        )
+                    delay = min(delay, remaining)
+                self.stdout.write(
+                    'Base de données non disponible, '
+                    f'nouvelle tentative dans {delay:.2f} s...'
+                )
+                time.sleep(delay)
+                slept += delay
 
         # Afficher un message pour indiquer que la base de données est disponible
         self.stdout.write(self.style.SUCCESS('Base de données disponible !'))
+        self.stdout.write(
+            f'Attente totale : {time.monotonic() - start:.2f} s '
+            f'({attempts} tentative(s), {slept:.2f} s en pause).'
+        )
@@ -0,0 +1,229 @@
+"""
+Mesures de performance par requête et export au format texte de Prometheus.
+
+Les histogrammes sont agrégés en mémoire, par processus : avec plusieurs
+workers, chacun expose ses propres séries (à agréger côté Prometheus).
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from rest_framework.serializers import ListSerializer
+
+# Bornes des histogrammes
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)
+
+
+def _escape(value):
+    """Échappe une valeur de label Prometheus."""
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def _format_labels(labels):
+    return '{%s}' % ','.join(
+        f'{name}="{_escape(value)}"' for name, value in labels)
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Histogramme cumulatif à bornes fixes, par combinaison de labels
+    (thread-safe).
+    """
+
+    def __init__(self, name, documentation, buckets, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # Valeurs des labels -> [compte par borne..., +Inf, somme]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        """
+        Enregistre une observation pour les valeurs de labels données (dans
+        l'ordre).
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = [0] * (len(self.buckets) + 1) + [0.0]
+                self._series[labelvalues] = series
+            series[index] += 1
+            series[-1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        """Retourne les lignes au format texte de Prometheus."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            series = {
+                labelvalues: list(values)
+                for labelvalues, values in self._series.items()
+            }
+        for labelvalues, values in sorted(series.items()):
+            labels = list(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                bucket_labels = _format_labels(labels + [('le', bound)])
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            formatted = _format_labels(labels)
+            lines.append(
+                f'{self.name}_sum{formatted} {_format_value(values[-1])}')
+            lines.append(f'{self.name}_count{formatted} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """Jauge dont les valeurs sont lues au moment de l'export."""
+
+    def __init__(self, name, documentation, collect):
+        self.name = name
+        self.documentation = documentation
+        # collect() retourne une liste de (labels [(nom, valeur)], valeur)
+        self.collect = collect
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} gauge',
+        ]
+        for labels, value in self.collect():
+            lines.append(
+                f'{self.name}{_format_labels(labels)} {_format_value(value)}')
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'edcp_request_duration_seconds', 'Durée totale de la requête.',
+    DURATION_BUCKETS, ('view', 'method', 'status'),
+)
+DB_QUERIES = Histogram(
+    'edcp_request_db_queries', 'Nombre de requêtes SQL par requête HTTP.',
+    QUERY_COUNT_BUCKETS, ('view', 'method'),
+)
+DB_DURATION = Histogram(
+    'edcp_request_db_duration_seconds',
+    'Temps passé en base de données par requête HTTP.',
+    DURATION_BUCKETS, ('view', 'method'),
+)
+SERIALIZER_DURATION = Histogram(
+    'edcp_request_serializer_duration_seconds',
+    'Temps passé dans les sérialiseurs par requête HTTP.',
+    DURATION_BUCKETS, ('view', 'method'),
+)
+RESPONSE_SIZE = Histogram(
+    'edcp_response_size_bytes', 'Taille du corps de la réponse.',
+    SIZE_BUCKETS, ('view', 'method'),
+)
+
+# Métriques exportées, dans l'ordre
+_metrics = [
+    REQUEST_DURATION, DB_QUERIES, DB_DURATION, SERIALIZER_DURATION,
+    RESPONSE_SIZE,
+]
+
+
+def register_gauge(name, documentation, collect):
+    """Ajoute à l'export une jauge lue par collect() à chaque export."""
+    _metrics.append(Gauge(name, documentation, collect))
+
+
+def render():
+    """Retourne toutes les métriques au format texte de Prometheus."""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def clear():
+    """Vide les histogrammes (utilisé par les tests)."""
+    for metric in _metrics:
+        if isinstance(metric, Histogram):
+            metric.clear()
+
+
+class RequestTimings:
+    """Compteurs d'une requête instrumentée."""
+
+    __slots__ = ('db_queries', 'db_time', 'serializer_time')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """
+        Wrapper d'exécution SQL (connection.execute_wrapper) : compte et
+        chronomètre.
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+
+# Compteurs de la requête en cours (None si elle n'est pas instrumentée)
+current_timings = ContextVar('current_timings', default=None)
+
+
+class TimedSerializerMixin:
+    """
+    Ajoute au compteur de la requête le temps de validation (is_valid) et de
+    représentation (data) du sérialiseur. Ce sont les points d'entrée appelés
+    par les vues : les sérialiseurs imbriqués ou les éléments d'une liste ne
+    sont pas comptés deux fois.
+    """
+
+    def is_valid(self, raise_exception=False):
+        timings = current_timings.get()
+        if timings is None:
+            return super().is_valid(raise_exception=raise_exception)
+        start = time.perf_counter()
+        try:
+            return super().is_valid(raise_exception=raise_exception)
+        finally:
+            timings.serializer_time += time.perf_counter() - start
+
+    @property
+    def data(self):
+        timings = current_timings.get()
+        if timings is None:
+            return super().data
+        start = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            timings.serializer_time += time.perf_counter() - start
+
+
+class TimedListSerializer(TimedSerializerMixin, ListSerializer):
+    """
+    ListSerializer chronométré (sérialiseurs sans list_serializer_class dédié).
+    """
@@ -0,0 +1,135 @@
+"""
+Middlewares du projet : mesure des performances par requête et variantes des
+middlewares Django court-circuitées pour les routes de l'API.
+"""
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import connections
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+from edcp_apirest import metrics
+
+
+class PerformanceMiddleware:
+    """
+    Mesure, pour les vues des namespaces de PERF_INSTRUMENTED_NAMESPACES, la
+    durée totale, le nombre et la durée des requêtes SQL, le temps des
+    sérialiseurs et la taille de la réponse. Les mesures alimentent les
+    histogrammes exportés par /api/internal/metrics/ et l'en-tête Server-Timing
+    de la réponse.
+
+    Seule une fraction PERF_SAMPLE_RATE des requêtes est instrumentée ; les
+    autres ne paient qu'un tirage aléatoire.
+
+    Les wrappers SQL ne sont installés que sur les connexions du thread de la
+    requête : les vues asynchrones comptent celles de leur pool de threads
+    dans user.async_views._call.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        timings = getattr(request, '_perf_timings', None)
+        if timings is None:
+            return response
+        self._uninstall(timings)
+
+        duration = time.perf_counter() - start
+        view = request.resolver_match.view_name
+        method = request.method
+        metrics.REQUEST_DURATION.observe(
+            duration, view, method, str(response.status_code))
+        metrics.DB_QUERIES.observe(timings.db_queries, view, method)
+        metrics.DB_DURATION.observe(timings.db_time, view, method)
+        metrics.SERIALIZER_DURATION.observe(
+            timings.serializer_time, view, method)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe(len(response.content), view, method)
+
+        response['Server-Timing'] = (
+            f'total;dur={duration * 1000:.2f}, '
+            f'db;dur={timings.db_time * 1000:.2f}, '
+            f'db-queries;desc="{timings.db_queries}", '
+            f'serializer;dur={timings.serializer_time * 1000:.2f}'
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Active l'instrumentation une fois la vue connue (namespace et
+        échantillonnage).
+        """
+        namespace = request.resolver_match.namespace
+        if namespace not in settings.PERF_INSTRUMENTED_NAMESPACES:
+            return None
+        rate = settings.PERF_SAMPLE_RATE
+        if rate < 1 and random.random() >= rate:
+            return None
+
+        timings = metrics.RequestTimings()
+        request._perf_timings = timings
+        metrics.current_timings.set(timings)
+        for connection in connections.all():
+            connection.execute_wrappers.append(timings.db_wrapper)
+        return None
+
+    def _uninstall(self, timings):
+        """Retire les wrappers SQL installés par process_view."""
+        metrics.current_timings.set(None)
+        for connection in connections.all():
+            if timings.db_wrapper in connection.execute_wrappers:
+                connection.execute_wrappers.remove(timings.db_wrapper)
+
+
+class APIExemptMixin:
+    """
+    Court-circuite le middleware pour les chemins commençant par un préfixe de
+    API_FAST_PATH_PREFIXES : l'API n'utilise que l'authentification par jeton
+    et n'a besoin ni de session, ni de messages, ni de protection CSRF ou
+    clickjacking. Les autres routes (/admin/...) gardent le comportement
+    complet.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.fast_path_prefixes = tuple(settings.API_FAST_PATH_PREFIXES)
+
+    def __call__(self, request):
+        prefixes = self.fast_path_prefixes
+        if prefixes and request.path_info.startswith(prefixes):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class APISessionMiddleware(APIExemptMixin, SessionMiddleware):
+    """SessionMiddleware sans chargement de session pour l'API."""
+
+
+class APICsrfViewMiddleware(APIExemptMixin, CsrfViewMiddleware):
+    """
+    CsrfViewMiddleware ignoré pour l'API (les vues DRF sont exemptées de CSRF).
+    """
+
+
+class APIAuthenticationMiddleware(APIExemptMixin, AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware ignoré pour l'API (request.user est fourni par
+    DRF).
+    """
+
+
+class APIMessageMiddleware(APIExemptMixin, MessageMiddleware):
+    """MessageMiddleware ignoré pour l'API."""
+
+
+class APIXFrameOptionsMiddleware(APIExemptMixin, XFrameOptionsMiddleware):
+    """XFrameOptionsMiddleware ignoré pour l'API (réponses JSON)."""
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:23
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edcp_apirest', '0002_user_last_modified'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active', 'id'], name='user_is_active_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_staff', 'id'], name='user_is_staff_id_idx'),
+        ),
+        # Django 3.2 met l'expression entre parenthèses et génère un SQL invalide
+        # pour OpClass dans un index fonctionnel : l'index est créé en SQL brut.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE INDEX "user_email_lower_idx" ON "edcp_apirest_user" (LOWER("email") text_pattern_ops);',
+                    'DROP INDEX "user_email_lower_idx";',
+                ),
+                migrations.RunSQL(
+                    'CREATE INDEX "user_name_lower_idx" ON "edcp_apirest_user" (LOWER("name") text_pattern_ops);',
+                    'DROP INDEX "user_name_lower_idx";',
+                ),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='user',
+                    index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('email'), name='text_pattern_ops'), name='user_email_lower_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='user',
+                    index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('name'), name='text_pattern_ops'), name='user_name_lower_idx'),
+                ),
+            ],
+        ),
+    ]
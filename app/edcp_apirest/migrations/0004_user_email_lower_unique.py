@@ -0,0 +1,67 @@
+# Generated by Django 3.2.25 on 2026-10-18 16:05
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def find_email_collisions(users):
+    """Retourne {email en minuscules: [emails]} pour les emails qui ne diffèrent que par la casse."""
+    users = users.annotate(email_lower=Lower('email'))
+    duplicates = (
+        users.values('email_lower')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+    collisions = {}
+    for user in users.filter(email_lower__in=duplicates).order_by('email_lower', 'id'):
+        collisions.setdefault(user.email_lower, []).append(f'{user.email} (id={user.pk})')
+    return collisions
+
+
+def check_email_collisions(apps, schema_editor):
+    """Interrompt la migration si des emails entreraient en collision avec l'index unique."""
+    User = apps.get_model('edcp_apirest', 'User')
+    collisions = find_email_collisions(User.objects.using(schema_editor.connection.alias))
+    if collisions:
+        lines = '\n'.join(f'  {key} : {", ".join(emails)}' for key, emails in collisions.items())
+        raise RuntimeError(
+            f'{len(collisions)} email(s) ne diffèrent que par la casse. '
+            f'Fusionnez ou renommez ces comptes puis relancez la migration :\n{lines}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edcp_apirest', '0003_user_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_email_collisions, migrations.RunPython.noop),
+        # L'index d'égalité/préfixe sur LOWER(email) devient unique : un seul index
+        # sert la connexion (égalité) et la liste des utilisateurs (préfixe).
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    [
+                        'DROP INDEX "user_email_lower_idx";',
+                        'CREATE UNIQUE INDEX "user_email_lower_uniq" ON "edcp_apirest_user" '
+                        '(LOWER("email") text_pattern_ops);',
+                    ],
+                    [
+                        'DROP INDEX "user_email_lower_uniq";',
+                        'CREATE INDEX "user_email_lower_idx" ON "edcp_apirest_user" '
+                        '(LOWER("email") text_pattern_ops);',
+                    ],
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='user',
+                    name='user_email_lower_idx',
+                ),
+            ],
+        ),
+    ]
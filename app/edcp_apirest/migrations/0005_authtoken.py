@@ -0,0 +1,44 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:43
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def copy_drf_tokens(apps, schema_editor):
+    """Reprend les jetons rest_framework.authtoken existants (les clients restent connectés)."""
+    Token = apps.get_model('authtoken', 'Token')
+    AuthToken = apps.get_model('edcp_apirest', 'AuthToken')
+    db = schema_editor.connection.alias
+    expires = django.utils.timezone.now() + timedelta(seconds=settings.AUTH_TOKEN_TTL)
+    AuthToken.objects.using(db).bulk_create(
+        [
+            AuthToken(key=token.key, user_id=token.user_id, created=token.created, expires=expires)
+            for token in Token.objects.using(db).iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edcp_apirest', '0004_user_email_lower_unique'),
+        ('authtoken', '0003_tokenproxy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auth_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(copy_drf_tokens, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,19 @@
 """
     Model de la base de données
 """
-from django.db import models
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, router
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.contrib.postgres.indexes import OpClass
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 
+from edcp_apirest import hashing
+from edcp_apirest.signals import tokens_revoked
+
 class UserManager(BaseUserManager):
     """Gestionnaire pour les utilisateurs."""
 
@@ -17,6 +27,23 @@ class UserManager(BaseUserManager):
 
         return user
 
+    def filter_emails(self, emails):
+        """
+        Filtre insensible à la casse sur une liste d'emails. LOWER(email) IN
+        (...) est servi par l'index unique user_email_lower_uniq.
+        """
+        return self.annotate(email_lower=Lower('email')).filter(
+            email_lower__in=[email.lower() for email in emails]
+        )
+
+    def get_by_email(self, email):
+        """
+        Retourne l'utilisateur dont l'email correspond, sans tenir compte de la
+        casse.
+        """
+        return self.annotate(email_lower=Lower('email')).get(
+            email_lower=email.lower())
+
 
     def create_superuser(self, email, password):
         """Crée et enregistre un superutilisateur avec les informations fournies."""
@@ -36,9 +63,145 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Date de dernière modification (sert d'ETag/Last-Modified pour
+    # /api/user/me/)
+    last_modified = models.DateTimeField(auto_now=True)
 
     # instance de la table utilisateur
     objects = UserManager()
 
     # Champ d'identification de l'utilisateur (par défaut, 'username' ou 'email')
-    USERNAME_FIELD = 'email'
\ No newline at end of file
+    USERNAME_FIELD = 'email'
+
+    class Meta:
+        indexes = [
+            # Filtres de la liste combinés à la pagination par id
+            models.Index(
+                fields=['is_active', 'id'], name='user_is_active_id_idx'),
+            models.Index(
+                fields=['is_staff', 'id'], name='user_is_staff_id_idx'),
+            # Recherche par préfixe insensible à la casse (LOWER(...) LIKE
+            # 'abc%'). Pour l'email, c'est l'index UNIQUE user_email_lower_uniq
+            # créé par la migration 0004 (Django 3.2 ne gère pas les
+            # contraintes uniques fonctionnelles).
+            models.Index(
+                OpClass(Lower('name'), name='text_pattern_ops'),
+                name='user_name_lower_idx',
+            ),
+        ]
+
+    def set_password(self, raw_password):
+        """Hache le mot de passe (dans le pool de hachage s'il est activé)."""
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Vérifie le mot de passe et met à jour son hachage s'il est obsolète.
+        """
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # La mise à jour du hachage n'est pas un changement de mot de passe
+            self._password = None
+            self.save(update_fields=['password'])
+        return hashing.check_password(raw_password, self.password, setter)
+
+
+class AuthTokenQuerySet(models.QuerySet):
+    """Requêtes sur les jetons d'authentification."""
+
+    def expired(self, now=None):
+        """Jetons expirés (servi par l'index sur expires)."""
+        return self.filter(expires__lte=now or timezone.now())
+
+    def revoke(self, chunk_size=1000):
+        """
+        Supprime les jetons par DELETE groupés de chunk_size clés, sans charger
+        les objets ni envoyer post_delete un par un, et retourne le nombre
+        supprimé.
+        """
+        # Lecture et DELETE sur la base d'écriture (self.db désigne un réplica
+        # en lecture)
+        using = self._db or router.db_for_write(self.model)
+        keys = list(self.using(using).values_list('key', flat=True))
+        manager = self.model.objects.db_manager(using)
+        return sum(
+            manager.delete_keys(keys[start:start + chunk_size])
+            for start in range(0, len(keys), chunk_size)
+        )
+
+
+class AuthTokenManager(models.Manager.from_queryset(AuthTokenQuerySet)):
+    """Gestionnaire des jetons d'authentification."""
+
+    def delete_keys(self, keys):
+        """
+        Supprime les jetons donnés en un seul DELETE et retourne le nombre
+        supprimé. Le signal tokens_revoked remplace les post_delete individuels
+        (invalidation du cache).
+        """
+        if not keys:
+            return 0
+        using = self._db or router.db_for_write(self.model)
+        deleted = self.filter(key__in=keys)._raw_delete(using)
+        tokens_revoked.send(sender=self.model, keys=keys)
+        return deleted
+
+    def create_for_user(self, user):
+        """
+        Crée un nouveau jeton pour l'utilisateur (un jeton par connexion).
+        """
+        now = timezone.now()
+        return self.create(
+            key=secrets.token_hex(20), user=user, created=now,
+            expires=now + timedelta(seconds=settings.AUTH_TOKEN_TTL),
+        )
+
+
+class AuthToken(models.Model):
+    """
+    Jeton d'authentification expirant.
+
+    L'expiration est glissante : chaque utilisation la repousse de
+    AUTH_TOKEN_TTL, mais elle n'est écrite en base qu'au plus une fois par
+    AUTH_TOKEN_REFRESH_INTERVAL.
+    """
+
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name='auth_tokens',
+        on_delete=models.CASCADE,
+    )
+    created = models.DateTimeField(default=timezone.now)
+    # Indexé pour la purge des jetons expirés (purge_expired_tokens)
+    expires = models.DateTimeField(db_index=True)
+
+    objects = AuthTokenManager()
+
+    def __str__(self):
+        return self.key
+
+    def is_expired(self, now=None):
+        return self.expires <= (now or timezone.now())
+
+    def needs_refresh(self, now=None):
+        """
+        Indique si la dernière prolongation date de plus de
+        AUTH_TOKEN_REFRESH_INTERVAL.
+        """
+        remaining = self.expires - (now or timezone.now())
+        fresh = settings.AUTH_TOKEN_TTL - settings.AUTH_TOKEN_REFRESH_INTERVAL
+        return remaining < timedelta(seconds=fresh)
+
+    def refresh(self, now=None):
+        """
+        Repousse l'expiration de AUTH_TOKEN_TTL (un UPDATE, sans relire la
+        ligne).
+        """
+        ttl = timedelta(seconds=settings.AUTH_TOKEN_TTL)
+        self.expires = (now or timezone.now()) + ttl
+        # Le jeton a pu être lu sur un réplica en lecture seule : l'écriture va
+        # sur la base principale
+        using = router.db_for_write(type(self), instance=self)
+        type(self)._base_manager.using(using).filter(key=self.key).update(
+            expires=self.expires)
@@ -0,0 +1,198 @@
+"""
+Pagination de l'admin adaptée aux grandes tables.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+# Nombre de pages précédentes où chercher une ancre de pagination par clé
+KEYSET_ANCHOR_LOOKBACK = 10
+
+
+class EstimatedPage(Page):
+    """
+    Page dont l'existence d'une suivante est connue par la lecture, pas par le
+    nombre estimé.
+    """
+
+    def __init__(self, object_list, number, paginator, more=None):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        if self.more is not None:
+            return self.more
+        return super().has_next()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginateur qui évite COUNT(*) et les OFFSET coûteux sur les grandes tables.
+
+    - Sans filtre, le nombre de lignes vient de pg_class.reltuples
+      (statistiques de PostgreSQL) ; avec des filtres, de l'estimation du
+      planificateur (EXPLAIN). Au-delà de ADMIN_ESTIMATED_COUNT_THRESHOLD
+      lignes, l'estimation est utilisée telle quelle ; en dessous, le
+      COUNT(*) exact reste bon marché.
+    - Les pages suivantes sont lues par clé (keyset) : la dernière ligne
+      d'une page (colonnes du tri, clé primaire) est conservée dans le cache
+      ADMIN_KEYSET_CACHE_ALIAS comme ancre de la page suivante, lue par
+      WHERE (tri, pk) > ancre LIMIT n. Sans ancre à moins de
+      KEYSET_ANCHOR_LOOKBACK pages (saut direct, tri sur une relation ou une
+      expression), l'OFFSET part de l'ancre la plus proche ou du début.
+    - Les lignes sont lues en deux temps : les clés de la page (sur l'index
+      seul) puis les lignes de ces clés.
+    - Un nombre estimé trop bas ne rend pas les dernières pages
+      introuvables : le numéro de page n'est vérifié que par la lecture.
+    """
+
+    count_is_estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = self.estimated_count()
+        threshold = settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        if estimate is not None and estimate > threshold:
+            self.count_is_estimated = True
+            return estimate
+        return super().count
+
+    def estimated_count(self):
+        """
+        Retourne le nombre estimé de lignes, ou None s'il n'est pas disponible.
+        """
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class '
+                    'WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table],
+                )
+                estimate = cursor.fetchone()[0]
+            else:
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                estimate = cursor.fetchone()[0][0]['Plan']['Plan Rows']
+        # reltuples vaut -1 (ou 0) tant que la table n'a pas été analysée
+        return int(estimate) if estimate > 0 else None
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # Au-delà du nombre estimé : la page existe peut-être, la lecture
+            # le dira
+            if self.count_is_estimated and int(number) > 1:
+                return int(number)
+            raise
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
+
+    @cached_property
+    def keyset_ordering(self):
+        """
+        Retourne [(champ, décroissant)] du tri terminé par la clé primaire, ou
+        None.
+        """
+        query = self.object_list.query
+        opts = self.object_list.model._meta
+        ordering = list(query.order_by)
+        if not ordering or not all(isinstance(item, str) for item in ordering):
+            return None
+        fields = []
+        for item in ordering:
+            name = item.lstrip('-')
+            if name == 'pk':
+                name = opts.pk.name
+            if '__' in name or name == '?' or name in query.annotations:
+                return None
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.is_relation:
+                return None
+            fields.append((field.attname, item.startswith('-')))
+        if opts.pk.attname not in [name for name, _ in fields]:
+            fields.append((opts.pk.attname, False))
+        return fields
+
+    def _anchor_key(self, number):
+        sql, params = self.object_list.query.sql_with_params()
+        key = repr((sql, params, self.per_page)).encode()
+        digest = hashlib.md5(key).hexdigest()
+        return f'edcp:keyset:{digest}:{number}'
+
+    def _nearest_anchor(self, number):
+        """
+        Retourne (numéro de page, ancre) de la page la plus proche à partir de
+        `number`, ou (1, None).
+        """
+        numbers = range(number, max(1, number - KEYSET_ANCHOR_LOOKBACK), -1)
+        anchors = caches[settings.ADMIN_KEYSET_CACHE_ALIAS].get_many(
+            [self._anchor_key(n) for n in numbers])
+        for candidate in numbers:
+            anchor = anchors.get(self._anchor_key(candidate))
+            if anchor is not None:
+                return candidate, anchor
+        return 1, None
+
+    def _after(self, anchor):
+        """
+        Condition « après l'ancre » dans l'ordre du tri :
+        (a > x) OU (a = x ET b > y)...
+        """
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.keyset_ordering, anchor):
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            condition |= Q(**equal, **{lookup: value})
+            equal[name] = value
+        return condition
+
+    def page(self, number):
+        number = self.validate_number(number)
+        ordering = self.keyset_ordering
+        queryset, start = self.object_list, (number - 1) * self.per_page
+        if ordering is not None and number > 1:
+            anchor_number, anchor = self._nearest_anchor(number)
+            if anchor is not None:
+                # Pagination par clé : plus d'OFFSET depuis le début
+                queryset = queryset.filter(self._after(anchor))
+                start = (number - anchor_number) * self.per_page
+        pk_name = self.object_list.model._meta.pk.attname
+        if ordering is not None:
+            names = [name for name, _ in ordering]
+        else:
+            names = [pk_name]
+        # Clés de la page seulement (une ligne de plus indique s'il existe une
+        # page suivante)
+        end = start + self.per_page + self.orphans + 1
+        rows = list(queryset.values_list(*names)[start:end])
+        more = len(rows) > self.per_page + self.orphans
+        if more:
+            rows = rows[:self.per_page]
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        if more and ordering is not None and None not in rows[-1]:
+            caches[settings.ADMIN_KEYSET_CACHE_ALIAS].set(
+                self._anchor_key(number + 1), rows[-1],
+                settings.ADMIN_KEYSET_ANCHOR_TTL,
+            )
+        pk_index = names.index(pk_name)
+        # Jointure différée : les lignes complètes des seules clés de la page
+        object_list = self.object_list.filter(
+            pk__in=[row[pk_index] for row in rows])
+        return self._get_page(object_list, number, self, more=more)
@@ -0,0 +1,165 @@
+"""
+Compteurs de limitation de débit à fenêtre glissante.
+
+La fenêtre glissante est estimée à partir de deux fenêtres fixes (courante et
+précédente, pondérée par la part encore couverte) : deux entiers par clé au
+lieu de l'historique des requêtes. Les compteurs sont tenus en mémoire de
+processus ou, si un alias de cache est donné, dans un cache Django partagé
+entre processus.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class SlidingWindowCounter:
+    """
+    Au plus `limit` hits par clé sur toute période glissante de `window`
+    secondes.
+    """
+
+    def __init__(self, name, limit, window, max_keys=100000, alias=None):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        # Clés conservées en mémoire (les moins récentes sont évincées)
+        self.max_keys = max_keys
+        # Alias du cache Django partagé (None = mémoire du processus)
+        self.alias = alias
+        # Clé -> (index de fenêtre, compte précédent, compte courant)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def _wait(self, previous, current, offset):
+        """
+        Retourne None si un hit de plus est permis, sinon le délai d'attente en
+        secondes.
+        """
+        if self.limit <= 0:
+            # Débit nul (ex. '0/min') : tout est refusé, nouvel essai à la
+            # fenêtre suivante
+            return self.window - offset
+        weight = 1 - offset / self.window
+        if previous * weight + current < self.limit:
+            return None
+        if current < self.limit:
+            # La part de la fenêtre précédente décroît au cours de la fenêtre
+            # courante
+            share = 1 - (self.limit - current) / previous
+            return self.window * share - offset
+        # Fenêtre courante pleine : attendre que sa part décroisse dans la
+        # suivante
+        return self.window - offset + self.window * (1 - self.limit / current)
+
+    def hit(self, key, now=None):
+        """
+        Compte un hit s'il est permis ; retourne None ou le délai d'attente en
+        secondes.
+        """
+        now = now if now is not None else time.time()
+        index, offset = divmod(now, self.window)
+        if self.alias:
+            wait = self._hit_shared(key, int(index), offset)
+        else:
+            wait = self._hit_local(key, int(index), offset)
+        if wait is None:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return wait
+
+    def _hit_local(self, key, index, offset):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < index - 1:
+                previous = current = 0
+            elif entry[0] == index - 1:
+                previous, current = entry[2], 0
+            else:
+                previous, current = entry[1], entry[2]
+            wait = self._wait(previous, current, offset)
+            if wait is None:
+                current += 1
+            self._entries[key] = (index, previous, current)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+            return wait
+
+    def _hit_shared(self, key, index, offset):
+        cache = caches[self.alias]
+        # Clés de cache courtes et sans caractères interdits (memcached)
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        prefix = f'ratelimit:{self.name}:{digest}:'
+        previous_key, current_key = f'{prefix}{index - 1}', f'{prefix}{index}'
+        previous = cache.get(previous_key, 0)
+        # Le hit est réservé par un incr() atomique avant d'être évalué : deux
+        # processus concurrents reçoivent deux comptes distincts et ne
+        # dépassent pas la limite ensemble
+        timeout = int(self.window * 2) + 1
+        cache.add(current_key, 0, timeout)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Entrée expirée entre add() et incr()
+            cache.add(current_key, 1, timeout)
+            current = cache.get(current_key, 1)
+        wait = self._wait(previous, current - 1, offset)
+        if wait is not None:
+            # Hit refusé : il ne compte pas
+            try:
+                cache.decr(current_key)
+            except ValueError:
+                pass
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.allowed = self.rejected = 0
+
+    def stats(self):
+        return {
+            'keys': len(self._entries),
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+        }
+
+
+# Compteurs du processus, par nom et paramètres
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def get_counter(name, limit, window):
+    """
+    Retourne le compteur partagé du processus pour ce nom et ces paramètres.
+    """
+    alias = settings.THROTTLE_CACHE_ALIAS
+    key = (name, limit, window, alias)
+    counter = _counters.get(key)
+    if counter is None:
+        with _counters_lock:
+            counter = _counters.setdefault(
+                key,
+                SlidingWindowCounter(
+                    name, limit, window, settings.THROTTLE_MAX_KEYS, alias),
+            )
+    return counter
+
+
+def counters():
+    """Retourne les compteurs créés dans le processus."""
+    return list(_counters.values())
+
+
+def clear():
+    """Vide tous les compteurs du processus (utilisé par les tests)."""
+    for counter in counters():
+        counter.clear()
@@ -0,0 +1,51 @@
+"""
+Récepteurs de signaux de l'application (connectés dans
+EdcpApirestConfig.ready).
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission, update_last_login
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from edcp_apirest import last_login
+from edcp_apirest.backends import bump_permissions_version
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_permissions_on_change(sender, action, **kwargs):
+    """
+    Invalide le cache des permissions après l'ajout ou le retrait d'un groupe
+    ou d'une permission.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_permissions_version()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_permissions_on_save(sender, **kwargs):
+    """
+    Invalide le cache des permissions après l'enregistrement ou la suppression
+    d'un groupe ou d'une permission.
+    """
+    bump_permissions_version()
+
+
+@receiver(user_logged_in, dispatch_uid='edcp_last_login')
+def record_last_login(sender, user, **kwargs):
+    """
+    Met à jour last_login à la connexion : par lots en mode 'buffered' de
+    LAST_LOGIN_MODE, sinon tout de suite.
+    """
+    if settings.LAST_LOGIN_MODE == 'buffered':
+        last_login.buffer.record(user)
+    else:
+        update_last_login(sender, user, **kwargs)
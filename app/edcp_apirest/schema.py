@@ -0,0 +1,104 @@
+"""
+Schéma OpenAPI servi depuis la mémoire avec ETag.
+
+Le schéma est lu dans l'artefact SCHEMA_FILE (construit par `python manage.py
+build_schema`) s'il existe, sinon généré par drf_spectacular à la première
+demande. Le générateur de drf_spectacular (openapi, plumbing, extensions) n'est
+importé qu'à ce moment : les workers qui ne servent jamais le schéma ne paient
+ni cet import ni la génération. Seuls les modules apps et checks de
+drf_spectacular, chargés par INSTALLED_APPS, le sont au démarrage.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.utils.http import quote_etag
+
+# Formats servis : (type de contenu, renderer drf_spectacular)
+FORMATS = {
+    'yaml': (
+        'application/vnd.oai.openapi; charset=utf-8',
+        'drf_spectacular.renderers.OpenApiYamlRenderer',
+    ),
+    'json': (
+        'application/vnd.oai.openapi+json; charset=utf-8',
+        'drf_spectacular.renderers.OpenApiJsonRenderer',
+    ),
+}
+
+_lock = threading.Lock()
+_schema = None  # Schéma (dict) du processus
+_rendered = {}  # Format -> (contenu, ETag)
+
+
+def generate_schema():
+    """
+    Génère le schéma avec drf_spectacular (imports et parcours des vues
+    coûteux).
+    """
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(
+        request=None, public=spectacular_settings.SERVE_PUBLIC)
+
+
+def render(schema, fmt):
+    """Retourne le schéma au format demandé (bytes)."""
+    from django.utils.module_loading import import_string
+
+    return import_string(FORMATS[fmt][1])().render(schema, renderer_context={})
+
+
+def load_schema():
+    """
+    Retourne le schéma : artefact SCHEMA_FILE s'il existe, sinon généré une
+    fois par processus.
+    """
+    global _schema
+    if _schema is None:
+        with _lock:
+            if _schema is None:
+                path = settings.SCHEMA_FILE
+                if path and os.path.exists(path):
+                    with open(path, 'rb') as stream:
+                        _schema = json.load(stream)
+                else:
+                    # Le JSON sérialise les chaînes traduisibles et autres
+                    # objets paresseux
+                    _schema = json.loads(render(generate_schema(), 'json'))
+    return _schema
+
+
+def get_rendered(fmt):
+    """
+    Retourne (contenu, ETag) du schéma au format demandé, mis en cache en
+    mémoire.
+    """
+    rendered = _rendered.get(fmt)
+    if rendered is None:
+        content = render(load_schema(), fmt)
+        etag = quote_etag(hashlib.sha256(content).hexdigest()[:32])
+        rendered = _rendered[fmt] = (content, etag)
+    return rendered
+
+
+def build(path):
+    """
+    Génère le schéma et l'enregistre dans l'artefact JSON ; retourne sa taille
+    en octets.
+    """
+    content = render(generate_schema(), 'json')
+    with open(path, 'wb') as stream:
+        stream.write(content)
+    return len(content)
+
+
+def clear():
+    """Oublie le schéma du processus (utilisé par les tests)."""
+    global _schema
+    with _lock:
+        _schema = None
+        _rendered.clear()
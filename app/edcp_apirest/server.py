@@ -0,0 +1,119 @@
+"""
+Configuration du serveur de production (gunicorn), dérivée des CPU disponibles.
+
+Lue par `gunicorn.conf.py` (à la racine de l'application) et par la commande
+`python manage.py serve`. Chaque réglage peut être imposé par une variable
+d'environnement WEB_* ; ce module n'importe ni Django ni gunicorn.
+"""
+import math
+import os
+
+# Classe de worker ASGI (uvicorn, voir requirements.txt)
+ASGI_WORKER_CLASS = 'uvicorn.workers.UvicornWorker'
+
+# Quota CPU du conteneur (cgroup v2 puis v1)
+CGROUP_CPU_MAX = '/sys/fs/cgroup/cpu.max'
+CGROUP_V1_QUOTA = '/sys/fs/cgroup/cpu/cpu.cfs_quota_us'
+CGROUP_V1_PERIOD = '/sys/fs/cgroup/cpu/cpu.cfs_period_us'
+
+_TRUE = ('1', 'true', 'yes')
+
+# Threads par worker WSGI au plus : chacun tient sa connexion à la base
+MAX_WSGI_THREADS = 4
+
+
+def _read(path):
+    try:
+        with open(path) as stream:
+            return stream.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(cpu_max=CGROUP_CPU_MAX, quota=CGROUP_V1_QUOTA,
+                     period=CGROUP_V1_PERIOD):
+    """
+    Retourne le quota CPU du conteneur (arrondi au supérieur) ou None s'il
+    n'est pas limité.
+    """
+    value = _read(cpu_max)
+    if value:
+        limit, _, interval = value.partition(' ')
+        if limit != 'max' and interval:
+            return max(1, math.ceil(int(limit) / int(interval)))
+        return None
+    limit, interval = _read(quota), _read(period)
+    if limit and interval and int(limit) > 0:
+        return max(1, math.ceil(int(limit) / int(interval)))
+    return None
+
+
+def cpu_count():
+    """
+    CPU utilisables : affinité du processus, bornée par le quota du conteneur.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    return min(cpus, limit) if limit else cpus
+
+
+def autotune(cpus, asgi=False):
+    """
+    Retourne (workers, threads) pour `cpus` CPU.
+
+    WSGI : 2 × CPU + 1 processus ; pendant qu'un processus attend la base, un
+    autre hache un mot de passe. Chaque processus a autant de threads (workers
+    gthread) que de CPU, au plus MAX_WSGI_THREADS, pour couvrir les attentes
+    d'E/S sans multiplier les connexions à la base ; un seul CPU garde des
+    workers synchrones. WEB_THREADS remplace ce nombre (1 = workers
+    synchrones : gthread abandonne les connexions acceptées et en attente quand
+    un worker est recyclé par max_requests).
+    ASGI : un processus (une boucle d'événements) par CPU.
+    """
+    if asgi:
+        return cpus, 1
+    return 2 * cpus + 1, max(1, min(cpus, MAX_WSGI_THREADS))
+
+
+def gunicorn_settings(environ=None, cpus=None):
+    """
+    Retourne les réglages gunicorn (nom -> valeur) calculés depuis
+    l'environnement.
+    """
+    environ = os.environ if environ is None else environ
+    asgi = environ.get('WEB_ASGI', '').lower() in _TRUE
+    workers, threads = autotune(cpus or cpu_count(), asgi=asgi)
+    workers = int(environ.get('WEB_WORKERS') or workers)
+    threads = 1 if asgi else int(environ.get('WEB_THREADS') or threads)
+    max_requests = int(environ.get('WEB_MAX_REQUESTS', 1000))
+    config = {
+        'bind': environ.get('WEB_BIND', '0.0.0.0:8000'),
+        'workers': workers,
+        'threads': threads,
+        'worker_class': (
+            ASGI_WORKER_CLASS if asgi
+            else 'gthread' if threads > 1 else 'sync'
+        ),
+        # Application chargée avant le fork : imports partagés (copie sur
+        # écriture)
+        'preload_app': environ.get('WEB_PRELOAD', '1').lower() in _TRUE,
+        # Recyclage des workers après N requêtes (0 = jamais), avec une gigue
+        # de 10 % pour ne pas redémarrer tous les workers en même temps
+        'max_requests': max_requests,
+        'max_requests_jitter': int(
+            environ.get('WEB_MAX_REQUESTS_JITTER', max_requests // 10)),
+        # Arrêt propre : les requêtes en cours ont ce délai pour se terminer
+        # après SIGTERM
+        'graceful_timeout': int(environ.get('WEB_GRACEFUL_TIMEOUT', 30)),
+        'timeout': int(environ.get('WEB_TIMEOUT', 30)),
+        'keepalive': int(environ.get('WEB_KEEPALIVE', 5)),
+        'accesslog': environ.get('WEB_ACCESS_LOG') or None,
+        'errorlog': '-',
+    }
+    # Battement de cœur des workers en mémoire plutôt que sur le disque
+    if os.path.isdir('/dev/shm'):
+        config['worker_tmp_dir'] = '/dev/shm'
+    return config
@@ -0,0 +1,7 @@
+"""
+Signaux propres à l'application.
+"""
+from django.dispatch import Signal
+
+# Envoyé après une révocation groupée de jetons (argument : keys, les clés)
+tokens_revoked = Signal()
@@ -0,0 +1,168 @@
+"""
+Budgets de requêtes SQL pour les tests : détection des N+1 et des requêtes en
+double.
+
+- query_budget(n) : gestionnaire de contexte / décorateur qui échoue si le bloc
+  exécute plus de n requêtes ou deux fois la même requête (même SQL, mêmes
+  paramètres).
+- QueryBudgetTestMixin.assertQueryBudget : la même chose depuis un TestCase.
+- QueryBudgetRunner : runner de tests qui vérifie, pour chaque requête HTTP des
+  tests, le budget déclaré par la vue (attribut query_budget = {méthode: n}).
+  La limitation de débit y est désactivée (THROTTLE_ENABLED) : les tests qui la
+  vérifient la réactivent avec override_settings.
+"""
+from collections import Counter
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+
+# Middleware ajouté par QueryBudgetRunner
+MIDDLEWARE = 'edcp_apirest.testing.QueryBudgetMiddleware'
+
+# Contrôle de transaction (savepoints des TestCase et atomic()), hors budget
+TRANSACTION_CONTROL = (
+    'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT',
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Le code testé dépasse son budget de requêtes ou répète une requête."""
+
+
+def check_queries(queries, max_queries=None, allow_duplicates=False,
+                  label='Le bloc'):
+    """
+    Vérifie une liste de requêtes capturées ({'sql': ...}) et lève
+    QueryBudgetExceeded.
+    """
+    queries = [
+        query for query in queries
+        if not query['sql'].startswith(TRANSACTION_CONTROL)
+    ]
+    problems = []
+    if max_queries is not None and len(queries) > max_queries:
+        problems.append(
+            f'{len(queries)} requêtes SQL pour un budget de {max_queries}')
+    if not allow_duplicates:
+        counts = Counter(query['sql'] for query in queries)
+        duplicates = [sql for sql, count in counts.items() if count > 1]
+        if duplicates:
+            problems.append(
+                f'{len(duplicates)} requête(s) exécutée(s) plusieurs fois')
+    if problems:
+        listing = '\n'.join(
+            f'{index}. {query["sql"]}'
+            for index, query in enumerate(queries, start=1)
+        )
+        raise QueryBudgetExceeded(
+            f'{label} : {", ".join(problems)}\n{listing}')
+
+
+class query_budget(ContextDecorator):
+    """
+    Échoue si le bloc dépasse max_queries requêtes ou exécute deux fois la même
+    requête.
+    """
+
+    def __init__(self, max_queries=None, allow_duplicates=False,
+                 using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.allow_duplicates = allow_duplicates
+        self.using = using
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            check_queries(
+                self.context.captured_queries, self.max_queries,
+                self.allow_duplicates,
+            )
+        return False
+
+
+class QueryBudgetTestMixin:
+    """Ajoute assertQueryBudget aux TestCase."""
+
+    def assertQueryBudget(self, max_queries=None, allow_duplicates=False,
+                          using=DEFAULT_DB_ALIAS):
+        return query_budget(max_queries, allow_duplicates, using)
+
+
+def get_view_budget(view_func, method):
+    """Retourne le budget déclaré par la vue pour la méthode HTTP, ou None."""
+    # Les vues DRF exposent leur classe dans view_func.cls
+    view = getattr(view_func, 'cls', view_func)
+    budgets = getattr(view, 'query_budget', None)
+    if not budgets:
+        return None
+    return budgets.get(method)
+
+
+class QueryBudgetMiddleware:
+    """
+    Vérifie, pendant les tests, le budget de requêtes déclaré par la vue
+    appelée. Les requêtes en double sont toujours signalées pour ces vues.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            context = getattr(request, '_query_budget_context', None)
+            if context is not None:
+                context.__exit__(None, None, None)
+        if context is not None:
+            check_queries(
+                context.captured_queries, request._query_budget,
+                label=f'{request.method} {request.path}',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        budget = get_view_budget(view_func, request.method)
+        if budget is None:
+            return None
+        request._query_budget = budget
+        request._query_budget_context = CaptureQueriesContext(
+            connections[DEFAULT_DB_ALIAS])
+        request._query_budget_context.__enter__()
+        return None
+
+
+class QueryBudgetRunner(DiscoverRunner):
+    """
+    Runner de tests qui fait respecter les budgets de requêtes déclarés par les
+    vues.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._middleware_override = override_settings(
+            MIDDLEWARE=[MIDDLEWARE, *settings.MIDDLEWARE],
+            # Les compteurs sont partagés par tout le processus de test
+            THROTTLE_ENABLED=False,
+        )
+        self._middleware_override.enable()
+
+    def teardown_databases(self, old_config, **kwargs):
+        # Le fil de vidage de last_login ne doit pas garder de connexion aux
+        # bases supprimées
+        from edcp_apirest.last_login import buffer
+
+        buffer.stop()
+        super().teardown_databases(old_config, **kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        self._middleware_override.disable()
+        super().teardown_test_environment(**kwargs)
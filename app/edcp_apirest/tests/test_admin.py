@@ -5,6 +5,14 @@ from django.test import TestCase  # Importe la classe TestCase du module django.
 from django.contrib.auth import get_user_model  # Importe la fonction get_user_model pour obtenir le modèle d'utilisateur personnalisé
 from django.urls import reverse  # Importe la fonction reverse pour la résolution d'URL
 from django.test import Client  # Importe la classe Client du module django.test pour les tests de requête
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+
+from edcp_apirest.paginator import EstimatedCountPaginator
 
 
 class AdminSiteTests(TestCase):
@@ -50,4 +58,110 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         # Vérifie que la réponse contient l'utilisateur creer
-        self.assertEqual(res.status_code, 200)
\ No newline at end of file
+        self.assertEqual(res.status_code, 200)
+
+
+class LargeTableAdminTests(TestCase):
+    """Tests de la liste de l'admin pour les grandes tables."""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            'admin@example.com', 'testpass123')
+        self.client.force_login(self.admin_user)
+        for i in range(5):
+            get_user_model().objects.create_user(
+                email=f'user{i}@example.com', password='testpass123',
+                name=f'Name {i}',
+            )
+        self.url = reverse('admin:edcp_apirest_user_changelist')
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_search_by_prefix(self):
+        """
+        La recherche porte sur le préfixe de l'email ou du nom, sans tenir
+        compte de la casse.
+        """
+        res = self.client.get(self.url, {'q': 'USER3'})
+
+        self.assertContains(res, 'user3@example.com')
+        self.assertNotContains(res, 'user4@example.com')
+
+    def test_filter_is_staff(self):
+        """Le filtre is_staff est disponible."""
+        res = self.client.get(self.url, {'is_staff__exact': '1'})
+
+        self.assertContains(res, 'admin@example.com')
+        self.assertNotContains(res, 'user1@example.com')
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0)
+    def test_estimated_count_used_above_threshold(self):
+        """Au-delà du seuil, le nombre vient des statistiques de PostgreSQL."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE edcp_apirest_user')
+        paginator = EstimatedCountPaginator(
+            get_user_model().objects.order_by('id'), 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            paginator.count
+
+        self.assertIn('reltuples', queries[0]['sql'])
+        self.assertNotIn('COUNT(', queries[0]['sql'])
+
+    def test_exact_count_below_threshold(self):
+        """Sous le seuil, le nombre exact est retourné."""
+        queryset = get_user_model().objects.filter(is_staff=False)
+        paginator = EstimatedCountPaginator(queryset.order_by('id'), 2)
+
+        self.assertEqual(paginator.count, 5)
+
+    def test_deep_page_uses_deferred_join(self):
+        """Une page lointaine contient les bons utilisateurs, dans l'ordre."""
+        queryset = get_user_model().objects.filter(
+            is_staff=False).order_by('id')
+        paginator = EstimatedCountPaginator(queryset, 2)
+
+        page = paginator.page(2)
+
+        self.assertIn('IN (', str(page.object_list.query))
+        self.assertEqual(
+            [user.email for user in page],
+            ['user2@example.com', 'user3@example.com'],
+        )
+
+    def test_next_page_read_by_keyset(self):
+        """
+        Après la page 2, la page 3 part de la dernière ligne lue, sans OFFSET.
+        """
+        queryset = get_user_model().objects.filter(
+            is_staff=False).order_by('-id')
+        paginator = EstimatedCountPaginator(queryset, 2)
+        paginator.page(2)
+
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.page(3)
+            emails = [user.email for user in page]
+
+        self.assertEqual(emails, ['user0@example.com'])
+        self.assertNotIn('OFFSET', queries[0]['sql'])
+        self.assertFalse(page.has_next())
+
+    def test_low_estimate_serves_later_pages(self):
+        """
+        Un nombre estimé trop bas ne rend pas les dernières pages introuvables.
+        """
+        queryset = get_user_model().objects.filter(
+            is_staff=False).order_by('id')
+        paginator = EstimatedCountPaginator(queryset, 2)
+
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0), \
+                mock.patch.object(
+                    EstimatedCountPaginator, 'estimated_count',
+                    return_value=2):
+            self.assertEqual(paginator.num_pages, 1)
+            self.assertTrue(paginator.page(1).has_next())
+            page = paginator.page(3)
+
+        self.assertEqual([user.email for user in page], ['user4@example.com'])
+        self.assertFalse(page.has_next())
@@ -1,13 +1,24 @@
 """
 Test custom Django management commands.
 """
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2OpError
 
-from django.core.management import call_command
+from django.core.management import call_command, CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from edcp_apirest import last_login
+from edcp_apirest.db import routers
+from edcp_apirest.models import AuthToken
 
 
 @patch('edcp_apirest.management.commands.wait_for_db.Command.check')
@@ -30,4 +41,237 @@ class CommandTests(SimpleTestCase):
         call_command('wait_for_db')
 
         self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=['default'])
\ No newline at end of file
+        patched_check.assert_called_with(databases=['default'])
+
+    @patch('time.sleep')
+    def test_wait_for_db_backoff(self, patched_sleep, patched_check):
+        """
+        Test the delay between attempts grows exponentially up to max_delay.
+        """
+        patched_check.side_effect = [OperationalError] * 6 + [True]
+
+        call_command(
+            'wait_for_db', initial_delay=1, max_delay=8, stdout=StringIO())
+
+        delays = [call.args[0] for call in patched_sleep.call_args_list]
+        for delay, base in zip(delays, [1, 2, 4, 8, 8, 8]):
+            self.assertGreaterEqual(delay, base / 2)
+            self.assertLessEqual(delay, base)
+
+    @patch('time.sleep')
+    def test_wait_for_db_timeout(self, patched_sleep, patched_check):
+        """Test the command fails once the timeout is exceeded."""
+        patched_check.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', timeout=0.01, stdout=StringIO())
+
+
+class WaitForDbSelectProbeTests(TestCase):
+    """Test wait_for_db with the SELECT 1 probe."""
+
+    @patch('edcp_apirest.management.commands.wait_for_db.Command.check')
+    def test_select_probe_skips_system_checks(self, patched_check):
+        """Test the select probe queries the database without system checks."""
+        out = StringIO()
+
+        call_command('wait_for_db', probe='select', stdout=out)
+
+        patched_check.assert_not_called()
+        self.assertIn('Attente totale', out.getvalue())
+
+
+class BenchmarkHashersTests(SimpleTestCase):
+    """Test de la commande benchmark_hashers."""
+
+    def test_benchmark_reports_each_hasher(self):
+        """La commande affiche une ligne par hacheur mesuré."""
+        out = StringIO()
+
+        call_command(
+            'benchmark_hashers', iterations=1, hashers=['pbkdf2_sha256'],
+            stdout=out,
+        )
+
+        self.assertIn('pbkdf2_sha256', out.getvalue())
+        self.assertNotIn('bcrypt_sha256', out.getvalue())
+
+
+class ImportUsersTests(TestCase):
+    """Test de la commande import_users."""
+
+    def _write(self, name, content):
+        """Écrit un fichier d'import temporaire et retourne son chemin."""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = os.path.join(tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        return path
+
+    def test_import_csv_reports_duplicates(self):
+        """
+        Les doublons sont signalés ligne par ligne sans interrompre le lot.
+        """
+        get_user_model().objects.create_user(
+            email='existing@example.com', password='testpass123')
+        path = self._write('users.csv', (
+            'email,password,name\n'
+            'new1@EXAMPLE.com,testpass123,New One\n'
+            'Existing@example.com,testpass123,Existing\n'
+            'NEW1@example.com,testpass123,Again\n'
+            'new2@example.com,,New Two\n'
+        ))
+        out, err = StringIO(), StringIO()
+
+        call_command(
+            'import_users', path, workers=0, batch_size=2,
+            stdout=out, stderr=err,
+        )
+
+        user = get_user_model().objects.get(email='new1@example.com')
+        self.assertTrue(user.check_password('testpass123'))
+        user = get_user_model().objects.get(email='new2@example.com')
+        self.assertFalse(user.has_usable_password())
+        self.assertIn('ligne 3', err.getvalue())
+        self.assertIn('ligne 4', err.getvalue())
+        self.assertIn('2 utilisateur(s) créé(s), 2 erreur(s)', out.getvalue())
+
+    def test_import_jsonl(self):
+        """Le format JSONL est déduit de l'extension du fichier."""
+        path = self._write('users.jsonl', (
+            '{"email": "json@example.com", "password": "testpass123", '
+            '"name": "Json", "is_staff": true}\n'
+        ))
+
+        call_command('import_users', path, workers=0, stdout=StringIO())
+
+        user = get_user_model().objects.get(email='json@example.com')
+        self.assertTrue(user.is_staff)
+
+    def test_import_jsonl_skips_invalid_lines(self):
+        """
+        Une ligne JSONL illisible ou qui n'est pas un objet est signalée puis
+        ignorée.
+        """
+        path = self._write('users.jsonl', (
+            '{"email": "first@example.com", "password": "testpass123"}\n'
+            '{"email": "broken@example.com",\n'
+            '["not", "an", "object"]\n'
+            '{"email": "last@example.com", "password": "testpass123"}\n'
+        ))
+        out, err = StringIO(), StringIO()
+
+        call_command('import_users', path, workers=0, stdout=out, stderr=err)
+
+        self.assertEqual(
+            set(get_user_model().objects.values_list('email', flat=True)),
+            {'first@example.com', 'last@example.com'},
+        )
+        self.assertIn('ligne 2 : JSON invalide', err.getvalue())
+        self.assertIn('ligne 3 : objet JSON attendu', err.getvalue())
+        self.assertIn(
+            '2 utilisateur(s) créé(s), 2 erreur(s) sur 4 ligne(s)',
+            out.getvalue())
+
+    def test_bulk_conflict_reported_as_duplicate(self):
+        """
+        Un email créé entre la vérification et l'INSERT n'est pas compté comme
+        créé.
+        """
+        path = self._write('users.csv', (
+            'email,password\n'
+            'race@example.com,testpass123\n'
+            'free@example.com,x\n'
+        ))
+        out, err = StringIO(), StringIO()
+
+        def hash_during_concurrent_signup(password):
+            # Un autre processus crée le même email pendant le hachage du lot
+            users = get_user_model().objects
+            if not users.filter(email='race@example.com').exists():
+                users.create_user(email='race@example.com', password='other')
+            return make_password(password)
+
+        with patch(
+            'edcp_apirest.management.commands.import_users.make_password',
+            side_effect=hash_during_concurrent_signup,
+        ):
+            call_command(
+                'import_users', path, workers=0, stdout=out, stderr=err)
+
+        self.assertIn(
+            'ligne 2 : email déjà utilisé (race@example.com)', err.getvalue())
+        self.assertIn('1 utilisateur(s) créé(s), 1 erreur(s)', out.getvalue())
+
+
+class PurgeExpiredTokensTests(TestCase):
+    """Test de la purge des jetons expirés."""
+
+    def test_purge_expired_tokens_in_chunks(self):
+        """
+        Seuls les jetons expirés sont supprimés, par lots de --chunk-size.
+        """
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123')
+        tokens = [AuthToken.objects.create_for_user(user) for _ in range(5)]
+        expired = [token.key for token in tokens[:3]]
+        AuthToken.objects.filter(key__in=expired).update(
+            expires=timezone.now() - timedelta(seconds=1),
+        )
+        out = StringIO()
+
+        call_command('purge_expired_tokens', chunk_size=2, stdout=out)
+
+        self.assertEqual(
+            set(AuthToken.objects.values_list('key', flat=True)),
+            {tokens[3].key, tokens[4].key},
+        )
+        self.assertIn(
+            '3 jeton(s) expiré(s) supprimé(s) en 2 lot(s)', out.getvalue())
+
+    @override_settings(DATABASE_REPLICAS=['replica_0'])
+    def test_purge_uses_write_database(self):
+        """
+        Avec des réplicas, les clés sont lues et supprimées sur la base
+        d'écriture.
+        """
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123',
+        )
+        token = AuthToken.objects.create_for_user(user)
+        AuthToken.objects.filter(key=token.key).update(
+            expires=timezone.now() - timedelta(seconds=1),
+        )
+        # Lectures routées vers le réplica (non configuré ici), hors
+        # transaction du test
+        unpinned = patch.object(routers, 'is_pinned', return_value=False)
+        unpinned.start()
+        self.addCleanup(unpinned.stop)
+
+        call_command('purge_expired_tokens', stdout=StringIO())
+
+        self.assertFalse(AuthToken.objects.using('default').exists())
+
+
+class FlushLastLoginTests(TestCase):
+    """Test du vidage forcé du tampon des dates de connexion."""
+
+    def test_flush_last_login(self):
+        """La commande écrit les dates en attente."""
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123')
+        last_login.buffer.clear()
+        last_login.buffer.record(user)
+        out = StringIO()
+
+        call_command('flush_last_login', stdout=out, stderr=StringIO())
+
+        user.refresh_from_db()
+        self.assertIsNotNone(user.last_login)
+        self.assertIn('1 date(s) de connexion écrite(s)', out.getvalue())
+
+    def test_invalid_batch_size(self):
+        """Une taille de lot nulle est refusée."""
+        with self.assertRaises(CommandError):
+            call_command('flush_last_login', batch_size=0, stderr=StringIO())
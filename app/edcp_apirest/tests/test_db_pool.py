@@ -0,0 +1,156 @@
+"""
+Tests du pool de connexions à la base de données.
+"""
+import threading
+import time
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from edcp_apirest.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """Connexion factice utilisée à la place d'une connexion PostgreSQL."""
+
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Tests du pool avec des connexions factices."""
+
+    def make_pool(self, **kwargs):
+        return ConnectionPool(
+            connect=FakeConnection,
+            check=lambda conn: conn.healthy,
+            **kwargs,
+        )
+
+    def test_connection_is_reused(self):
+        """
+        Une connexion rendue est réutilisée au lieu d'en ouvrir une nouvelle.
+        """
+        pool = self.make_pool(max_size=2)
+        conn = pool.getconn()
+        pool.putconn(conn)
+
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(pool.stats()['created'], 1)
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+    def test_timeout_when_exhausted(self):
+        """Quand toutes les connexions sont prises, l'attente est bornée."""
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        pool.getconn()
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiter_gets_returned_connection(self):
+        """Un thread en attente récupère la connexion rendue par un autre."""
+        pool = self.make_pool(max_size=1, timeout=5)
+        conn = pool.getconn()
+        threading.Timer(0.05, pool.putconn, args=[conn]).start()
+
+        self.assertIs(pool.getconn(), conn)
+        self.assertGreater(pool.stats()['wait_time_max'], 0)
+
+    def test_unhealthy_connection_replaced(self):
+        """
+        Une connexion inactive qui échoue à la vérification est remplacée.
+        """
+        pool = self.make_pool(check_interval=0)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.healthy = False
+
+        new_conn = pool.getconn()
+
+        self.assertIsNot(new_conn, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['failed_checks'], 1)
+
+    def test_idle_connections_recycled_above_min_size(self):
+        """Les connexions inactives au-delà de MIN_SIZE sont fermées."""
+        pool = self.make_pool(min_size=1, max_size=3, max_idle=0.01)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+        time.sleep(0.02)
+        pool.putconn(second)
+
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_discarded_connection_closed(self):
+        """Une connexion rendue comme inutilisable est fermée."""
+        pool = self.make_pool()
+        conn = pool.getconn()
+        pool.putconn(conn, discard=True)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Nécessite PostgreSQL')
+class PostgresPoolBackendTests(SimpleTestCase):
+    """Tests du backend PostgreSQL avec pool sur une vraie base."""
+
+    def test_connection_returned_to_pool(self):
+        """Fermer la connexion Django la rend au pool sans la fermer."""
+        from edcp_apirest.db.backends.postgresql_pool import base
+
+        settings_dict = {**connection.settings_dict, 'POOL': {'MAX_SIZE': 2}}
+        wrapper = base.DatabaseWrapper(settings_dict, alias='pool_test')
+        try:
+            wrapper.ensure_connection()
+            raw = wrapper.connection
+            wrapper.close()
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                self.assertEqual(cursor.fetchone(), (1,))
+
+            self.assertIs(wrapper.connection, raw)
+            self.assertFalse(raw.closed)
+        finally:
+            wrapper.close()
+            base.close_pools(settings_dict['NAME'])
+
+
+class DatabasePoolStatsViewTests(TestCase):
+    """Tests de l'exposition des métriques du pool."""
+
+    def test_requires_staff(self):
+        """Les métriques sont réservées au personnel."""
+        client = APIClient()
+        user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123')
+        client.force_authenticate(user=user)
+
+        res = client.get(reverse('api-db-pool'))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_staff_can_read_stats(self):
+        """Le personnel obtient les métriques de chaque pool."""
+        client = APIClient()
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com', 'testpass123')
+        client.force_authenticate(user=admin)
+
+        res = client.get(reverse('api-db-pool'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res.data, dict)
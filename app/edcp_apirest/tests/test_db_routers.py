@@ -0,0 +1,74 @@
+"""
+Tests du routage vers les réplicas en lecture.
+"""
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from edcp_apirest.db import routers
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'], REPLICA_PIN_SECONDS=5)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    """Tests du routeur et du middleware d'épinglage."""
+
+    def setUp(self):
+        routers.reset()
+        self.addCleanup(routers.reset)
+        self.router = routers.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.model = get_user_model()
+
+    def run_middleware(self, request, write=False):
+        """Exécute le middleware et retourne (base de lecture, réponse)."""
+        seen = {}
+
+        def view(request):
+            if write:
+                self.router.db_for_write(self.model)
+            seen['db'] = self.router.db_for_read(self.model)
+            return HttpResponse()
+
+        response = routers.ReplicaPinningMiddleware(view)(request)
+        return seen['db'], response
+
+    def test_reads_go_to_replica(self):
+        """Les lectures vont sur un réplica."""
+        self.assertEqual(self.router.db_for_read(self.model), 'replica_0')
+
+    def test_reads_after_write_stay_on_primary(self):
+        """Après une écriture, les lectures restent sur la base principale."""
+        self.assertEqual(self.router.db_for_write(self.model), 'default')
+
+        self.assertEqual(self.router.db_for_read(self.model), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replica_configured(self):
+        """Sans réplica, tout va sur la base principale."""
+        self.assertEqual(self.router.db_for_read(self.model), 'default')
+
+    def test_get_request_reads_from_replica(self):
+        """Une requête GET lit sur un réplica et ne pose pas de cookie."""
+        db, response = self.run_middleware(self.factory.get('/api/user/me/'))
+
+        self.assertEqual(db, 'replica_0')
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_write_request_pins_client(self):
+        """Une requête qui écrit épingle le client sur la base principale."""
+        db, response = self.run_middleware(
+            self.factory.patch('/api/user/me/'), write=True)
+
+        self.assertEqual(db, 'default')
+        self.assertEqual(response.cookies[routers.PIN_COOKIE]['max-age'], 5)
+        # L'état ne fuit pas vers la requête suivante du même thread
+        self.assertEqual(self.router.db_for_read(self.model), 'replica_0')
+
+    def test_pinned_client_reads_from_primary(self):
+        """Un client qui vient d'écrire lit sur la base principale."""
+        request = self.factory.get('/api/user/me/')
+        request.COOKIES[routers.PIN_COOKIE] = '1'
+
+        db, response = self.run_middleware(request)
+
+        self.assertEqual(db, 'default')
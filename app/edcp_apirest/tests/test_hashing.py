@@ -0,0 +1,142 @@
+"""
+Tests du hachage des mots de passe dans un pool de processus borné.
+"""
+import os
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from edcp_apirest import hashing
+
+
+class HashingPoolTests(SimpleTestCase):
+    """Tests du pool de hachage."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pool = hashing.HashingPool(size=1, queue_depth=0, timeout=60)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        super().tearDownClass()
+
+    def test_hash_in_worker_process(self):
+        """Le hachage calculé dans un processus du pool est vérifiable."""
+        encoded = self.pool.run(hashing.hashers.make_password, 'testpass123')
+
+        self.assertTrue(check_password('testpass123', encoded))
+
+    def test_verify_in_worker_process(self):
+        """
+        La vérification dans le pool indique aussi si le hachage est à jour.
+        """
+        encoded = hashing.hashers.make_password('testpass123')
+
+        self.assertEqual(
+            self.pool.run(hashing._verify, 'testpass123', encoded),
+            (True, False))
+        self.assertEqual(
+            self.pool.run(hashing._verify, 'wrong', encoded), (False, False))
+
+    def test_map_hashes_batch(self):
+        """Un lot est haché dans le pool, dans l'ordre des mots de passe."""
+        encoded = self.pool.map(
+            hashing.hashers.make_password, ['first123', 'second123'])
+
+        self.assertTrue(check_password('first123', encoded[0]))
+        self.assertTrue(check_password('second123', encoded[1]))
+
+    def test_full_queue_raises(self):
+        """Une file pleine lève immédiatement HashingPoolFull."""
+        pool = hashing.HashingPool(size=1, queue_depth=0)
+        pool._slots.acquire()
+
+        with self.assertRaises(hashing.HashingPoolFull):
+            pool.run(hashing.hashers.make_password, 'testpass123')
+
+    def test_timeout_raises_pool_full(self):
+        """
+        Un résultat hors délai lève HashingPoolFull (503), pas une erreur 500.
+        """
+        pool = hashing.HashingPool(size=1, queue_depth=0, timeout=0.01)
+        self.addCleanup(pool.shutdown)
+
+        with self.assertRaises(hashing.HashingPoolFull):
+            pool.run(time.sleep, 1)
+
+    def test_map_timeout_keeps_slot_until_done(self):
+        """Après un délai dépassé, le lot garde sa place jusqu'à sa fin."""
+        pool = hashing.HashingPool(size=1, queue_depth=0, timeout=0.01)
+        self.addCleanup(pool.shutdown)
+
+        with self.assertRaises(hashing.HashingPoolFull):
+            pool.map(time.sleep, [0.5])
+        # Le morceau tourne encore : la file est pleine
+        with self.assertRaises(hashing.HashingPoolFull):
+            pool.run(hashing.hashers.make_password, 'testpass123')
+
+        time.sleep(1)
+        pool.timeout = 60
+        encoded = pool.run(hashing.hashers.make_password, 'testpass123')
+        self.assertTrue(check_password('testpass123', encoded))
+
+    def test_broken_pool_is_recreated(self):
+        """
+        Après la mort d'un processus, le pool est recréé pour les appels
+        suivants.
+        """
+        pool = hashing.HashingPool(size=1, queue_depth=0, timeout=60)
+        self.addCleanup(pool.shutdown)
+
+        with self.assertRaises(hashing.HashingPoolFull):
+            pool.run(os._exit, 1)
+
+        encoded = pool.run(hashing.hashers.make_password, 'testpass123')
+        self.assertTrue(check_password('testpass123', encoded))
+
+
+class HashingPoolApiTests(TestCase):
+    """Tests du comportement de l'API quand le pool est saturé."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.pool = hashing.HashingPool(size=1, queue_depth=0)
+        self.pool._slots.acquire()  # Occupe l'unique place du pool
+
+    @patch('edcp_apirest.hashing.get_pool')
+    def test_create_user_returns_503_when_full(self, patched_get_pool):
+        """
+        La création d'utilisateur répond 503 sans attendre quand le pool est
+        saturé.
+        """
+        patched_get_pool.return_value = self.pool
+        payload = {
+            'email': 'test@example.com', 'password': 'testpass123',
+            'name': 'Test',
+        }
+
+        res = self.client.post(reverse('user:create'), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(
+            get_user_model().objects.filter(email=payload['email']).exists())
+
+    def test_token_returns_503_when_full(self):
+        """La demande de jeton répond 503 quand le pool est saturé."""
+        get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123')
+        payload = {'email': 'test@example.com', 'password': 'testpass123'}
+
+        with patch('edcp_apirest.hashing.get_pool', return_value=self.pool):
+            res = self.client.post(reverse('user:token'), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,214 @@
+"""
+Tests de l'écriture différée de last_login.
+"""
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from edcp_apirest import last_login
+from edcp_apirest.last_login import LastLoginBuffer, buffer, update_last_login
+
+LOGIN = {'email': 'test@example.com', 'password': 'testpass123'}
+
+
+class LastLoginTests(TestCase):
+    """Tests de last_login à la connexion par jeton."""
+
+    def setUp(self):
+        buffer.clear()
+        self.addCleanup(buffer.clear)
+        self.addCleanup(buffer.stop)
+        self.user = get_user_model().objects.create_user(**LOGIN)
+        self.client = APIClient()
+
+    def last_login(self, user=None):
+        users = get_user_model().objects.values_list('last_login', flat=True)
+        return users.get(pk=(user or self.user).pk)
+
+    def new_buffer(self):
+        login_buffer = LastLoginBuffer()
+        self.addCleanup(login_buffer.stop)
+        return login_buffer
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600)
+    def test_buffered_mode_defers_write(self):
+        """
+        Par défaut, la date attend le vidage du login_buffer, sans requête
+        pendant la connexion.
+        """
+        with self.assertNumQueries(2):  # Utilisateur, création du jeton
+            self.client.post(reverse('user:token'), LOGIN)
+        self.assertIsNone(self.last_login())
+        self.assertEqual(buffer.pending(), 1)
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertIsNotNone(self.last_login())
+        self.assertEqual(buffer.pending(), 0)
+
+    @override_settings(LAST_LOGIN_MODE='sync')
+    def test_sync_mode(self):
+        """
+        En mode 'sync', comme Django et DRF : la session écrit last_login, le
+        jeton rien.
+        """
+        with self.assertNumQueries(2):
+            self.client.post(reverse('user:token'), LOGIN)
+        self.assertIsNone(self.last_login())
+
+        Client().force_login(self.user)
+        self.assertIsNotNone(self.last_login())
+        self.assertEqual(buffer.pending(), 0)
+
+    @override_settings(LAST_LOGIN_FLUSH_BATCH_SIZE=2)
+    def test_flush_in_batches(self):
+        """Un UPDATE par lot, une date par utilisateur (la plus récente)."""
+        users = [self.user] + [
+            get_user_model().objects.create_user(
+                email=f'user{i}@example.com', password='testpass123')
+            for i in range(2)
+        ]
+        now = timezone.now()
+        login_buffer = self.new_buffer()
+        for user in users:
+            login_buffer.record(user, now - timedelta(minutes=5))
+        login_buffer.record(self.user, now)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(login_buffer.flush(), 3)
+        self.assertEqual(self.last_login(), now)
+        self.assertEqual(self.last_login(users[1]), now - timedelta(minutes=5))
+
+    def test_older_date_does_not_overwrite(self):
+        """Une date plus ancienne que celle en base est ignorée."""
+        now = timezone.now()
+        get_user_model().objects.filter(pk=self.user.pk).update(last_login=now)
+        older = {self.user.pk: now - timedelta(hours=1)}
+        self.assertEqual(update_last_login(older), 0)
+        self.assertEqual(self.last_login(), now)
+
+    def test_failed_flush_keeps_pending_dates(self):
+        """Si l'écriture échoue, les dates restent dans le login_buffer."""
+        login_buffer = self.new_buffer()
+        login_buffer.record(self.user)
+        with patch('edcp_apirest.last_login.update_last_login',
+                   side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                login_buffer.flush()
+        self.assertEqual(login_buffer.pending(), 1)
+        self.assertEqual(login_buffer.flush(), 1)
+
+    @override_settings(LAST_LOGIN_CACHE_ALIAS='default')
+    def test_shared_buffer(self):
+        """
+        Le login_buffer partagé par le cache est vidé par un autre login_buffer
+        (autre processus).
+        """
+        cache.clear()
+        self.addCleanup(cache.clear)
+        worker, command = self.new_buffer(), self.new_buffer()
+        now = timezone.now()
+        worker.record(self.user, now - timedelta(minutes=1))
+        worker.record(self.user, now)
+        self.assertEqual(command.pending(), 2)
+
+        self.assertEqual(command.flush(), 1)
+        self.assertEqual(self.last_login(), now)
+        self.assertEqual(worker.pending(), 0)
+
+    @override_settings(LAST_LOGIN_CACHE_ALIAS='default')
+    def test_shared_flush_waits_for_reserved_slot(self):
+        """
+        Une position réservée par incr() mais pas encore écrite n'est pas
+        sautée par le vidage.
+        """
+        cache.clear()
+        self.addCleanup(cache.clear)
+        other = get_user_model().objects.create_user(
+            email='other@example.com', password='testpass123')
+        worker, command = self.new_buffer(), self.new_buffer()
+        now = timezone.now()
+        # Un autre processus a réservé la position 1 sans encore y écrire
+        cache.add(last_login.SEQUENCE_KEY, 0, None)
+        reserved = cache.incr(last_login.SEQUENCE_KEY)
+        worker.record(self.user, now)
+
+        self.assertEqual(command.flush(), 0)
+        self.assertEqual(command.pending(), 2)
+
+        cache.set(
+            last_login.SLOT_KEY.format(reserved), (other.pk, now),
+            last_login.SLOT_TTL,
+        )
+        self.assertEqual(command.flush(), 2)
+        self.assertEqual(self.last_login(other), now)
+
+    @override_settings(LAST_LOGIN_CACHE_ALIAS='default')
+    def test_shared_flush_abandons_lost_slot(self):
+        """
+        Une position toujours vide après MISSING_SLOT_GRACE ne bloque plus le
+        vidage.
+        """
+        cache.clear()
+        self.addCleanup(cache.clear)
+        worker = self.new_buffer()
+        cache.add(last_login.SEQUENCE_KEY, 0, None)
+        # Processus tué entre incr() et set()
+        cache.incr(last_login.SEQUENCE_KEY)
+        worker.record(self.user)
+        self.assertEqual(worker.flush(), 0)
+
+        with patch.object(last_login, 'MISSING_SLOT_GRACE', 0):
+            self.assertEqual(worker.flush(), 1)
+        self.assertEqual(worker.pending(), 0)
+
+
+class FlushThreadTests(TransactionTestCase):
+    """
+    Tests du fil de vidage périodique (ses écritures sont faites sur sa propre
+    connexion).
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(**LOGIN)
+        self.login_buffer = LastLoginBuffer()
+        self.addCleanup(self.login_buffer.stop)
+
+    def wait_for_last_login(self):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            value = get_user_model().objects.values_list(
+                'last_login', flat=True).get(pk=self.user.pk)
+            if value is not None:
+                return value
+            time.sleep(0.02)
+        return None
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=0.05)
+    def test_flushed_periodically(self):
+        """Sans nouvelle connexion, le fil écrit la date à l'intervalle."""
+        self.login_buffer.record(self.user)
+
+        self.assertIsNotNone(self.wait_for_last_login())
+        self.assertEqual(self.login_buffer.pending(), 0)
+
+    @override_settings(
+        LAST_LOGIN_FLUSH_INTERVAL=3600, LAST_LOGIN_FLUSH_MAX_SIZE=1)
+    def test_max_size_wakes_flusher(self):
+        """
+        La taille maximale atteinte réveille le fil, sans vidage dans la
+        requête.
+        """
+        with self.assertNumQueries(0):
+            self.login_buffer.record(self.user)
+
+        self.assertIsNotNone(self.wait_for_last_login())
@@ -0,0 +1,137 @@
+"""
+Tests des mesures de performance par requête.
+"""
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from edcp_apirest import metrics
+
+
+ME_URL = reverse('user:me')
+METRICS_URL = reverse('api-metrics')
+
+
+class HistogramTests(SimpleTestCase):
+    """Tests du format d'export des histogrammes."""
+
+    def test_render_cumulative_buckets(self):
+        """Les bornes sont cumulatives et suivies de la somme et du nombre."""
+        histogram = metrics.Histogram(
+            'test_seconds', 'Test.', (0.1, 1), ('view',))
+        histogram.observe(0.05, 'user:me')
+        histogram.observe(0.5, 'user:me')
+        histogram.observe(5, 'user:me')
+
+        self.assertEqual(histogram.render(), [
+            '# HELP test_seconds Test.',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{view="user:me",le="0.1"} 1',
+            'test_seconds_bucket{view="user:me",le="1"} 2',
+            'test_seconds_bucket{view="user:me",le="+Inf"} 3',
+            'test_seconds_sum{view="user:me"} 5.55',
+            'test_seconds_count{view="user:me"} 3',
+        ])
+
+    def test_label_values_escaped(self):
+        """Les guillemets des valeurs de labels sont échappés."""
+        histogram = metrics.Histogram('test_seconds', 'Test.', (1,), ('view',))
+        histogram.observe(0.5, 'a"b')
+
+        self.assertIn('test_seconds_count{view="a\\"b"} 1', histogram.render())
+
+
+@override_settings(PERF_SAMPLE_RATE=1, PERF_INSTRUMENTED_NAMESPACES=['user'])
+class PerformanceMiddlewareTests(TestCase):
+    """Tests du middleware de mesure des performances."""
+
+    def setUp(self):
+        metrics.clear()
+        self.addCleanup(metrics.clear)
+        self.user = get_user_model().objects.create_superuser(
+            'admin@example.com', 'testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_header(self):
+        """Une vue instrumentée retourne l'en-tête Server-Timing."""
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        parts = [
+            part.split(';')[0] for part in res['Server-Timing'].split(', ')
+        ]
+        self.assertEqual(parts, ['total', 'db', 'db-queries', 'serializer'])
+
+    def test_db_queries_counted(self):
+        """Les requêtes SQL de la vue sont comptées."""
+        res = self.client.patch(ME_URL, {'name': 'New name'})
+
+        self.assertNotIn('db-queries;desc="0"', res['Server-Timing'])
+        self.assertIn(
+            'edcp_request_db_queries_count{view="user:me",method="PATCH"} 1',
+            metrics.render(),
+        )
+
+    def test_histograms_exported(self):
+        """Les mesures alimentent l'export Prometheus."""
+        self.client.get(ME_URL)
+
+        with self.settings(METRICS_TOKEN='scrape-token'):
+            res = self.client.get(
+                METRICS_URL, HTTP_AUTHORIZATION='Bearer scrape-token')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        body = res.content.decode()
+        self.assertIn(
+            'edcp_request_duration_seconds_count'
+            '{view="user:me",method="GET",status="200"} 1',
+            body,
+        )
+        self.assertIn(
+            'edcp_response_size_bytes_bucket'
+            '{view="user:me",method="GET",le="+Inf"} 1',
+            body,
+        )
+        self.assertIn('edcp_token_cache{stat="local_hits"}', body)
+
+    def test_other_namespaces_not_instrumented(self):
+        """Les vues hors des namespaces instrumentés ne sont pas mesurées."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertNotIn('Server-Timing', res)
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_sampling_disabled(self):
+        """Avec un taux d'échantillonnage nul, rien n'est mesuré."""
+        res = self.client.get(ME_URL)
+
+        self.assertNotIn('Server-Timing', res)
+        self.assertNotIn('view="user:me"', metrics.render())
+
+    @override_settings(METRICS_TOKEN='scrape-token', METRICS_ALLOWED_IPS=[])
+    def test_metrics_require_scrape_token(self):
+        """L'export exige le jeton de collecte, même pour le personnel."""
+        bad = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer wrong')
+        staff = self.client.get(METRICS_URL)
+        anonymous = APIClient().get(
+            METRICS_URL, HTTP_AUTHORIZATION='Bearer scrape-token')
+
+        self.assertEqual(bad.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(staff.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(anonymous.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN='', METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_metrics_allowed_ips(self):
+        """Sans jeton, seules les adresses autorisées accèdent à l'export."""
+        client = APIClient()
+
+        allowed = client.get(METRICS_URL, REMOTE_ADDR='10.0.0.5')
+        denied = client.get(METRICS_URL, REMOTE_ADDR='10.0.0.6')
+
+        self.assertEqual(allowed.status_code, status.HTTP_200_OK)
+        self.assertEqual(denied.status_code, status.HTTP_403_FORBIDDEN)
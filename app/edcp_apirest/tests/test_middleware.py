@@ -0,0 +1,65 @@
+"""
+Tests de la voie rapide de l'API (middlewares court-circuités).
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+CREATE_USER_URL = reverse('user:create')
+
+
+class APIFastPathTests(TestCase):
+    """Tests des variantes API* des middlewares Django."""
+
+    def setUp(self):
+        self.client = APIClient()
+        # Cookie de session d'un navigateur connecté à l'admin
+        self.client.cookies['sessionid'] = 'session-inexistante'
+
+    def test_api_skips_session(self):
+        """
+        Les routes de l'API ne chargent pas la session et n'ajoutent pas
+        X-Frame-Options.
+        """
+        with self.assertNumQueries(0):
+            res = self.client.post(CREATE_USER_URL, {}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(hasattr(res.wsgi_request, 'session'))
+        self.assertNotIn('X-Frame-Options', res)
+
+    @override_settings(API_FAST_PATH_PREFIXES=[])
+    def test_full_stack_when_disabled(self):
+        """Sans préfixe, l'API passe par la pile complète."""
+        res = self.client.post(CREATE_USER_URL, {}, format='json')
+
+        self.assertTrue(hasattr(res.wsgi_request, 'session'))
+        self.assertIn('X-Frame-Options', res)
+
+    def test_admin_keeps_full_stack(self):
+        """L'administration garde sessions, messages et protection CSRF."""
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='testpass123')
+        self.client.force_login(admin)
+
+        res = self.client.get(reverse('admin:index'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.wsgi_request.user, admin)
+        self.assertIn('X-Frame-Options', res)
+
+    def test_benchmark_middleware_command(self):
+        """La commande compare les deux piles."""
+        out = StringIO()
+
+        call_command('benchmark_middleware', requests=5, stdout=out)
+
+        self.assertIn('complète', out.getvalue())
+        self.assertIn('Gain', out.getvalue())
@@ -2,8 +2,18 @@
 Tests du models
 """
 
+import importlib
+
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
-from django.contrib.auth import get_user_model
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import (
+    get_hasher, identify_hasher, make_password,
+)
+
+# Module de migration (son nom commence par un chiffre)
+email_migration = importlib.import_module(
+    'edcp_apirest.migrations.0004_user_email_lower_unique')
 
 class ModelTests(TestCase):
     """ Tests du models """
@@ -47,4 +57,86 @@ class ModelTests(TestCase):
             "testpass123",
         )
         self.assertTrue(user.is_superuser)
-        self.assertTrue(user.is_staff)
\ No newline at end of file
+        self.assertTrue(user.is_staff)
+
+    def test_password_hashed_with_preferred_hasher(self):
+        """Les nouveaux mots de passe utilisent le hacheur préféré."""
+        user = get_user_model().objects.create_user(
+            'test@exemple.com', 'testpass123')
+
+        self.assertEqual(
+            identify_hasher(user.password).algorithm, get_hasher().algorithm)
+
+    def test_outdated_hash_upgraded_on_login(self):
+        """
+        Un mot de passe haché avec un ancien algorithme est re-haché à la
+        connexion.
+        """
+        user = get_user_model().objects.create_user('test@exemple.com')
+        user.password = make_password('testpass123', hasher='bcrypt_sha256')
+        user.save()
+
+        authenticated = authenticate(
+            username='test@exemple.com', password='testpass123')
+
+        user.refresh_from_db()
+        self.assertEqual(authenticated, user)
+        self.assertEqual(
+            identify_hasher(user.password).algorithm, get_hasher().algorithm)
+
+    def test_email_unique_regardless_of_case(self):
+        """
+        Deux emails qui ne diffèrent que par la casse sont refusés par l'index
+        unique.
+        """
+        get_user_model().objects.create_user('test@exemple.com', 'testpass123')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            get_user_model().objects.create_user(
+                'TEST@exemple.com', 'testpass123')
+
+    def test_get_by_email_ignores_case(self):
+        """
+        get_by_email retrouve l'utilisateur quelle que soit la casse, en une
+        requête.
+        """
+        user = get_user_model().objects.create_user(
+            'Test@exemple.com', 'testpass123')
+
+        with self.assertNumQueries(1):
+            found = get_user_model().objects.get_by_email('tEST@EXEMPLE.com')
+        self.assertEqual(found, user)
+
+    def test_authenticate_ignores_email_case(self):
+        """La connexion fonctionne avec un email de casse différente."""
+        user = get_user_model().objects.create_user(
+            'Test@exemple.com', 'testpass123')
+
+        self.assertEqual(
+            authenticate(username='test@exemple.com', password='testpass123'),
+            user)
+        self.assertIsNone(
+            authenticate(username='test@exemple.com', password='wrongpass'))
+        self.assertIsNone(
+            authenticate(username='other@exemple.com', password='testpass123'))
+
+    def test_migration_reports_email_collisions(self):
+        """
+        La migration détecte les emails qui ne diffèrent que par la casse.
+        """
+        # DDL transactionnel : l'index est restauré à la fin du test
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX user_email_lower_uniq')
+        users = get_user_model().objects
+        first = users.create_user('test@exemple.com', 'testpass123')
+        second = users.create_user('Test@exemple.com', 'testpass123')
+        users.create_user('other@exemple.com', 'testpass123')
+
+        collisions = email_migration.find_email_collisions(users.all())
+
+        self.assertEqual(collisions, {
+            'test@exemple.com': [
+                f'test@exemple.com (id={first.pk})',
+                f'Test@exemple.com (id={second.pk})',
+            ],
+        })
@@ -0,0 +1,145 @@
+"""
+Tests du cache des permissions résolues (EmailBackend).
+"""
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from edcp_apirest.backends import permissions_cache
+
+
+# Cache partagé entre processus (fichiers), exigé par le cache des permissions
+SHARED_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'permissions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(
+            tempfile.gettempdir(), 'edcp-test-permissions'),
+    },
+}
+
+
+@override_settings(CACHES=SHARED_CACHES, PERMISSION_CACHE_ALIAS='permissions')
+class PermissionCacheTests(TestCase):
+    """Tests du cache inter-requêtes des permissions."""
+
+    def setUp(self):
+        """
+        Crée un membre du personnel dont les permissions viennent d'un groupe.
+        """
+        permissions_cache().clear()
+        self.addCleanup(permissions_cache().clear)
+        self.group = Group.objects.create(name='Lecteurs')
+        self.view_user = Permission.objects.get(codename='view_user')
+        self.change_user = Permission.objects.get(codename='change_user')
+        self.group.permissions.add(self.view_user)
+        self.user = get_user_model().objects.create_user(
+            email='staff@example.com', password='testpass123', is_staff=True,
+        )
+        self.user.groups.add(self.group)
+
+    def fresh_user(self):
+        """Recharge l'utilisateur, comme le fait chaque requête."""
+        return get_user_model().objects.get(pk=self.user.pk)
+
+    def test_permissions_cached_across_instances(self):
+        """
+        Une nouvelle instance du même utilisateur est servie par le cache, sans
+        requête.
+        """
+        self.assertTrue(self.fresh_user().has_perm('edcp_apirest.view_user'))
+
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm('edcp_apirest.view_user'))
+            self.assertFalse(user.has_perm('edcp_apirest.change_user'))
+            self.assertTrue(user.has_module_perms('edcp_apirest'))
+            self.assertEqual(
+                user.get_group_permissions(), {'edcp_apirest.view_user'})
+
+    def test_group_permission_change_invalidates(self):
+        """
+        Ajouter une permission à un groupe invalide le cache de ses membres.
+        """
+        self.assertFalse(
+            self.fresh_user().has_perm('edcp_apirest.change_user'))
+        self.group.permissions.add(self.change_user)
+        self.assertTrue(self.fresh_user().has_perm('edcp_apirest.change_user'))
+
+    def test_membership_change_invalidates(self):
+        """
+        Retirer l'utilisateur du groupe invalide ses permissions en cache.
+        """
+        self.assertTrue(self.fresh_user().has_perm('edcp_apirest.view_user'))
+        self.user.groups.remove(self.group)
+        self.assertFalse(self.fresh_user().has_perm('edcp_apirest.view_user'))
+
+    def test_user_permission_change_invalidates(self):
+        """
+        Une permission accordée directement est visible à la requête suivante.
+        """
+        self.assertFalse(
+            self.fresh_user().has_perm('edcp_apirest.change_user'))
+        self.user.user_permissions.add(self.change_user)
+        self.assertTrue(self.fresh_user().has_perm('edcp_apirest.change_user'))
+
+    def test_group_deletion_invalidates(self):
+        """Supprimer le groupe retire ses permissions."""
+        self.assertTrue(self.fresh_user().has_perm('edcp_apirest.view_user'))
+        self.group.delete()
+        self.assertFalse(self.fresh_user().has_perm('edcp_apirest.view_user'))
+
+    def test_inactive_user_has_no_permissions(self):
+        """
+        Un compte désactivé perd ses permissions malgré l'entrée en cache.
+        """
+        self.assertTrue(self.fresh_user().has_perm('edcp_apirest.view_user'))
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False)
+        self.assertFalse(self.fresh_user().has_perm('edcp_apirest.view_user'))
+
+    def test_admin_changelist_skips_permission_queries(self):
+        """
+        La page de liste de l'admin ne relit pas les permissions à chaque
+        requête.
+        """
+        self.client.force_login(self.user)
+        url = reverse('admin:edcp_apirest_user_changelist')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        permission_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'auth_permission' in query['sql']
+        ]
+        self.assertEqual(permission_queries, [])
+
+    @override_settings(PERMISSION_CACHE_ALIAS=None)
+    def test_disabled_reads_database(self):
+        """
+        Sans alias, les permissions sont relues en base pour chaque instance.
+        """
+        self.assertTrue(self.fresh_user().has_perm('edcp_apirest.view_user'))
+
+        user = self.fresh_user()
+        # Permissions propres, puis celles des groupes
+        with self.assertNumQueries(2):
+            self.assertTrue(user.has_perm('edcp_apirest.view_user'))
+
+    @override_settings(PERMISSION_CACHE_ALIAS='default')
+    def test_process_local_cache_refused(self):
+        """
+        Un cache propre au processus est refusé : l'invalidation n'atteindrait
+        pas les autres.
+        """
+        with self.assertRaises(ImproperlyConfigured):
+            self.fresh_user().has_perm('edcp_apirest.view_user')
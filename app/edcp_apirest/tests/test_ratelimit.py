@@ -0,0 +1,86 @@
+"""
+Tests des compteurs de limitation de débit à fenêtre glissante.
+"""
+from django.test import SimpleTestCase, override_settings
+
+from edcp_apirest.ratelimit import SlidingWindowCounter
+
+# Cache des compteurs partagés (un seul processus suffit pour les tests)
+RATELIMIT_CACHES = {
+    'ratelimit': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+
+class SlidingWindowCounterTests(SimpleTestCase):
+    """Tests du compteur en mémoire et partagé."""
+
+    def test_limit_within_window(self):
+        """Au-delà de la limite, le hit est refusé avec un délai d'attente."""
+        counter = SlidingWindowCounter('test', limit=3, window=60)
+
+        hits = [counter.hit('a', now=600 + i) for i in range(3)]
+        self.assertEqual(hits, [None, None, None])
+        wait = counter.hit('a', now=610)
+
+        self.assertAlmostEqual(wait, 50 + 60 * (1 - 3 / 3))
+        self.assertIsNone(counter.hit('b', now=610))
+        self.assertEqual(
+            counter.stats(), {'keys': 2, 'allowed': 4, 'rejected': 1})
+
+    def test_window_slides(self):
+        """
+        Les hits de la fenêtre précédente comptent au prorata de la part encore
+        couverte.
+        """
+        counter = SlidingWindowCounter('test', limit=4, window=60)
+        for i in range(4):
+            counter.hit('a', now=650 + i)
+
+        # À 15 s dans la fenêtre suivante, il reste 4 * 0.75 = 3 hits estimés
+        self.assertIsNone(counter.hit('a', now=675))
+        wait = counter.hit('a', now=675)
+        self.assertAlmostEqual(wait, 60 * (1 - (4 - 1) / 4) - 15)
+        # Deux fenêtres plus tard, tout est oublié
+        self.assertIsNone(counter.hit('a', now=800))
+
+    def test_zero_rate_rejects_everything(self):
+        """Un débit nul refuse tous les hits jusqu'à la fenêtre suivante."""
+        counter = SlidingWindowCounter('test', limit=0, window=60)
+
+        self.assertAlmostEqual(counter.hit('a', now=610), 50)
+
+    def test_evicts_least_recent_keys(self):
+        """Le nombre de clés suivies en mémoire est borné."""
+        counter = SlidingWindowCounter('test', limit=1, window=60, max_keys=2)
+        for key in ('a', 'b', 'c'):
+            counter.hit(key, now=600)
+
+        self.assertEqual(counter.stats()['keys'], 2)
+        self.assertIsNone(counter.hit('a', now=601))
+
+    @override_settings(CACHES=RATELIMIT_CACHES)
+    def test_shared_counters(self):
+        """
+        Avec un alias de cache, deux compteurs (deux processus) partagent les
+        comptes.
+        """
+        first = SlidingWindowCounter(
+            'test', limit=2, window=60, alias='ratelimit')
+        second = SlidingWindowCounter(
+            'test', limit=2, window=60, alias='ratelimit')
+
+        self.assertIsNone(first.hit('a', now=600))
+        self.assertIsNone(second.hit('a', now=601))
+        self.assertIsNotNone(first.hit('a', now=602))
+
+    @override_settings(CACHES=RATELIMIT_CACHES)
+    def test_shared_rejected_hit_not_counted(self):
+        """Un hit refusé est retiré du compte partagé qu'il avait réservé."""
+        counter = SlidingWindowCounter(
+            'rejected', limit=1, window=60, alias='ratelimit')
+        counter.hit('a', now=600)
+        self.assertIsNotNone(counter.hit('a', now=601))
+        self.assertIsNotNone(counter.hit('a', now=602))
+
+        # À mi-fenêtre suivante, seul le hit permis compte : 1 * 0.5 < 1
+        self.assertIsNone(counter.hit('a', now=690))
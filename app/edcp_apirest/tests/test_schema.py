@@ -0,0 +1,128 @@
+"""
+Tests du schéma OpenAPI servi depuis la mémoire.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+
+from edcp_apirest import schema
+from edcp_apirest.management.commands.profile_imports import parse_importtime
+
+
+SCHEMA_URL = reverse('api-schema')
+
+
+class SchemaViewTests(TestCase):
+    """Tests de /api/schema/."""
+
+    def setUp(self):
+        schema.clear()
+        self.addCleanup(schema.clear)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'openapi-schema.json')
+
+    def test_generated_on_first_use(self):
+        """
+        Sans artefact, le schéma est généré à la première demande puis gardé en
+        mémoire.
+        """
+        with override_settings(SCHEMA_FILE=self.path):
+            res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(
+            res['Content-Type'].startswith('application/vnd.oai.openapi'))
+        self.assertIn(b'/api/user/me/', res.content)
+        self.assertIn('ETag', res)
+
+    def test_etag_not_modified(self):
+        """Un If-None-Match à jour reçoit une réponse 304 sans corps."""
+        with override_settings(SCHEMA_FILE=self.path):
+            etag = self.client.get(SCHEMA_URL)['ETag']
+            res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+
+    def test_json_format(self):
+        """?format=json retourne le schéma en JSON."""
+        with override_settings(SCHEMA_FILE=self.path):
+            res = self.client.get(SCHEMA_URL, {'format': 'json'})
+            unknown = self.client.get(SCHEMA_URL, {'format': 'xml'})
+
+        self.assertEqual(json.loads(res.content)['openapi'], '3.0.3')
+        self.assertEqual(unknown.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_served_from_artifact(self):
+        """L'artefact construit par build_schema est servi tel quel."""
+        call_command('build_schema', output=self.path, stdout=StringIO())
+        with open(self.path) as stream:
+            artifact = json.load(stream)
+        artifact['info']['title'] = 'Artefact'
+        with open(self.path, 'w') as stream:
+            json.dump(artifact, stream)
+
+        with override_settings(SCHEMA_FILE=self.path):
+            res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertEqual(json.loads(res.content)['info']['title'], 'Artefact')
+
+    def test_generator_not_imported_at_startup(self):
+        """
+        Le démarrage et les URL n'importent pas le générateur de
+        drf_spectacular.
+        """
+        code = (
+            'import sys, django; django.setup(); '
+            'from django.urls import get_resolver; '
+            'get_resolver().url_patterns; '
+            'print(sorted(m for m in sys.modules '
+            'if m.startswith("drf_spectacular.")))'
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'app.settings'}
+        process = subprocess.run(
+            [sys.executable, '-c', code], env=env, capture_output=True,
+            text=True,
+        )
+
+        self.assertEqual(process.returncode, 0, process.stderr[-2000:])
+        self.assertEqual(
+            process.stdout.strip(),
+            "['drf_spectacular.apps', 'drf_spectacular.checks']",
+        )
+
+
+class ProfileImportsTests(TestCase):
+    """Tests du profil des imports."""
+
+    def test_parse_importtime(self):
+        """Les lignes de -X importtime sont lues avec leur profondeur."""
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   yaml.reader\n'
+            'import time:       300 |        420 | yaml\n'
+        )
+
+        self.assertEqual(
+            parse_importtime(output),
+            [('yaml.reader', 120, 120, 1), ('yaml', 300, 420, 0)],
+        )
+
+    def test_profile_imports_command(self):
+        """La commande mesure les imports dans un processus neuf."""
+        out = StringIO()
+
+        call_command('profile_imports', top=3, stdout=out)
+
+        self.assertIn('Imports de django.setup() + app.urls', out.getvalue())
+        self.assertIn('django', out.getvalue())
@@ -0,0 +1,111 @@
+"""
+Tests de la configuration du serveur de production.
+"""
+import os
+import tempfile
+import unittest
+from importlib.util import find_spec
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+
+from edcp_apirest.server import autotune, cgroup_cpu_limit, gunicorn_settings
+
+
+class ServerSettingsTests(SimpleTestCase):
+    """Tests du calcul des réglages gunicorn."""
+
+    def test_autotune(self):
+        """
+        2 × CPU + 1 workers en WSGI (threads selon les CPU), un worker par CPU
+        en ASGI.
+        """
+        self.assertEqual(autotune(1), (3, 1))
+        self.assertEqual(autotune(2), (5, 2))
+        self.assertEqual(autotune(16), (33, 4))
+        self.assertEqual(autotune(4, asgi=True), (4, 1))
+
+    def test_environment_overrides(self):
+        """Les variables WEB_* remplacent les valeurs calculées."""
+        environ = {
+            'WEB_WORKERS': '3', 'WEB_THREADS': '8', 'WEB_MAX_REQUESTS': '500',
+        }
+        config = gunicorn_settings(environ, cpus=2)
+
+        self.assertEqual(config['workers'], 3)
+        self.assertEqual(config['worker_class'], 'gthread')
+        self.assertEqual(config['max_requests_jitter'], 50)
+        self.assertTrue(config['preload_app'])
+
+    def test_threads_default_and_override(self):
+        """
+        Les threads gthread sont dérivés des CPU ; WEB_THREADS=1 garde des
+        workers synchrones.
+        """
+        default = gunicorn_settings({}, cpus=4)
+        self.assertEqual(default['worker_class'], 'gthread')
+        self.assertEqual(default['threads'], 4)
+        config = gunicorn_settings({'WEB_THREADS': '1'}, cpus=4)
+
+        self.assertEqual(
+            (config['threads'], config['worker_class']), (1, 'sync'))
+
+    def test_asgi(self):
+        """Le mode ASGI utilise les workers uvicorn sans threads."""
+        config = gunicorn_settings(
+            {'WEB_ASGI': '1', 'WEB_THREADS': '8'}, cpus=2)
+
+        self.assertEqual((config['workers'], config['threads']), (2, 1))
+        self.assertEqual(
+            config['worker_class'], 'uvicorn.workers.UvicornWorker')
+
+    def test_cgroup_cpu_limit(self):
+        """
+        Le quota CPU du conteneur est arrondi au supérieur ; 'max' signifie
+        sans limite.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cpu.max')
+            with open(path, 'w') as stream:
+                stream.write('150000 100000\n')
+            self.assertEqual(cgroup_cpu_limit(cpu_max=path), 2)
+            with open(path, 'w') as stream:
+                stream.write('max 100000\n')
+            self.assertIsNone(cgroup_cpu_limit(cpu_max=path))
+
+    def test_serve_print_config(self):
+        """
+        serve --print-config affiche la configuration sans lancer le serveur.
+        """
+        out = StringIO()
+
+        call_command(
+            'serve', workers=3, no_preload=True, print_config=True, stdout=out)
+
+        self.assertIn('workers = 3', out.getvalue())
+        self.assertIn('preload_app = False', out.getvalue())
+
+
+@unittest.skipIf(find_spec('gunicorn') is None, 'gunicorn non installé')
+class SmokeServerTests(TransactionTestCase):
+    """Test de fumée de gunicorn sur la base de test."""
+
+    def test_smoke_server(self):
+        """
+        Le serveur démarre, sert benchmark_api pendant le recyclage des workers
+        et s'arrête proprement.
+        """
+        out = StringIO()
+
+        db_name = connection.settings_dict['NAME']
+        with patch.dict(os.environ, {'DB_NAME': db_name}):
+            call_command(
+                'smoke_server', workers=2, max_requests=3, requests=4,
+                concurrency=2, stdout=out,
+            )
+
+        self.assertIn('Arrêt propre', out.getvalue())
+        self.assertIn('Test de fumée réussi.', out.getvalue())
@@ -0,0 +1,75 @@
+"""
+Tests des budgets de requêtes SQL.
+"""
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+
+from edcp_apirest import testing
+
+
+class QueryBudgetTests(TestCase):
+    """Tests de query_budget et du middleware de budget."""
+
+    def test_within_budget(self):
+        """Un bloc dans son budget passe."""
+        with testing.query_budget(1):
+            get_user_model().objects.count()
+
+    def test_budget_exceeded(self):
+        """Un bloc qui dépasse son budget échoue en listant les requêtes."""
+        with self.assertRaisesMessage(
+                testing.QueryBudgetExceeded,
+                '2 requêtes SQL pour un budget de 1'):
+            with testing.query_budget(1):
+                get_user_model().objects.filter(is_staff=True).count()
+                get_user_model().objects.filter(is_staff=False).count()
+
+    def test_duplicate_queries_detected(self):
+        """La même requête exécutée deux fois (N+1) est signalée."""
+        with self.assertRaisesMessage(
+                testing.QueryBudgetExceeded, 'exécutée(s) plusieurs fois'):
+            with testing.query_budget():
+                get_user_model().objects.count()
+                get_user_model().objects.count()
+
+    def test_duplicates_allowed(self):
+        """allow_duplicates désactive la détection des doublons."""
+        with testing.query_budget(allow_duplicates=True):
+            get_user_model().objects.count()
+            get_user_model().objects.count()
+
+    def test_savepoints_not_counted(self):
+        """Les savepoints des blocs atomic() ne comptent pas dans le budget."""
+        with testing.query_budget(1):
+            get_user_model().objects.create_user(
+                'test@example.com', 'testpass123')
+
+    def test_decorator(self):
+        """query_budget s'utilise aussi comme décorateur."""
+        @testing.query_budget(0)
+        def count_users():
+            return get_user_model().objects.count()
+
+        with self.assertRaises(testing.QueryBudgetExceeded):
+            count_users()
+
+    def test_middleware_checks_view_budget(self):
+        """
+        Le middleware applique le budget déclaré par la vue pour la méthode.
+        """
+        def view(request):
+            get_user_model().objects.count()
+            get_user_model().objects.exists()
+            return None
+        view.query_budget = {'GET': 1}
+        request = RequestFactory().get('/')
+
+        def get_response(request):
+            response = middleware.process_view(request, view, (), {})
+            return response or view(request)
+        middleware = testing.QueryBudgetMiddleware(get_response)
+
+        with self.assertRaisesMessage(testing.QueryBudgetExceeded, 'GET /'):
+            middleware(request)
+        # Méthode sans budget déclaré : rien n'est vérifié
+        middleware(RequestFactory().post('/'))
@@ -1,3 +1,116 @@
-from django.shortcuts import render
+"""
+Vues internes d'exploitation.
+"""
+import hmac
 
-# Create your views here.
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.module_loading import import_string
+from django.views import View
+
+from rest_framework import permissions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from edcp_apirest import metrics, schema
+from edcp_apirest.db.backends.postgresql_pool.base import pool_stats
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Métriques des pools de connexions du processus (réservé au personnel).
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    # Vue interne, hors de la documentation de l'API (sans importer
+    # drf_spectacular au démarrage)
+    schema = None
+
+    def get(self, request):
+        return Response(pool_stats())
+
+
+class MetricsScrapePermission(permissions.BasePermission):
+    """
+    Accès du collecteur Prometheus : jeton METRICS_TOKEN en Bearer ou adresse
+    de METRICS_ALLOWED_IPS. Aucun hachage de mot de passe par collecte.
+    """
+
+    def has_permission(self, request, view):
+        if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+            return True
+        expected = settings.METRICS_TOKEN
+        if not expected:
+            return False
+        auth = get_authorization_header(request).split()
+        if len(auth) != 2 or auth[0].lower() != b'bearer':
+            return False
+        return hmac.compare_digest(auth[1], expected.encode())
+
+
+class MetricsView(APIView):
+    """Métriques de performance du processus au format texte de Prometheus."""
+
+    # Ni session ni mot de passe : voir MetricsScrapePermission
+    authentication_classes = []
+    permission_classes = [MetricsScrapePermission]
+    # Vue interne, hors de la documentation de l'API
+    schema = None
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+class SchemaView(View):
+    """
+    Schéma OpenAPI servi depuis la mémoire (edcp_apirest.schema) avec ETag :
+    YAML par défaut, JSON avec ?format=json ou un en-tête Accept JSON.
+    """
+
+    # Valeurs de ?format= acceptées par SpectacularAPIView
+    format_aliases = {
+        'yaml': 'yaml', 'openapi': 'yaml', 'json': 'json',
+        'openapi-json': 'json',
+    }
+
+    def get(self, request):
+        requested = request.GET.get('format')
+        if requested is None:
+            accept = request.headers.get('Accept', '')
+            fmt = 'json' if 'json' in accept else 'yaml'
+        elif requested in self.format_aliases:
+            fmt = self.format_aliases[requested]
+        else:
+            raise Http404
+        content, etag = schema.get_rendered(fmt)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                content, content_type=schema.FORMATS[fmt][0])
+        response['ETag'] = etag
+        # Réponse publique, revalidée à chaque utilisation (304 si inchangée)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+def lazy_view(view_path, **initkwargs):
+    """
+    Vue DRF importée à sa première requête plutôt qu'au chargement des URL,
+    pour ne pas faire payer son import à chaque démarrage de worker.
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    # Comme toutes les vues DRF
+    wrapper.csrf_exempt = True
+    return wrapper
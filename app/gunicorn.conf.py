@@ -0,0 +1,59 @@
+"""
+Configuration gunicorn du serveur de production.
+
+    gunicorn -c gunicorn.conf.py app.wsgi:application
+    # ou
+    python manage.py serve
+
+Nombre de workers et de threads dérivé des CPU (edcp_apirest.server), réglable
+par les variables d'environnement WEB_*.
+"""
+import os
+import random
+
+from edcp_apirest.server import gunicorn_settings
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+
+globals().update(gunicorn_settings())
+
+
+def pre_fork(server, worker):
+    """
+    Le maître ne transmet aux workers aucune connexion ouverte pendant le
+    préchargement.
+    """
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        from edcp_apirest.db.backends.postgresql_pool.base import close_pools
+
+        connections.close_all()
+        close_pools()
+
+
+def post_fork(server, worker):
+    """
+    Générateur aléatoire (échantillonnage, choix des réplicas, gigue) différent
+    par worker.
+    """
+    random.seed()
+
+
+def worker_exit(server, worker):
+    """
+    Libère les ressources du worker à l'arrêt (recyclage ou arrêt propre).
+    """
+    from django.db import connections
+
+    from edcp_apirest.hashing import shutdown_pool
+    from edcp_apirest.last_login import buffer
+    from user.async_views import shutdown_executor
+
+    shutdown_pool()
+    # Connexions des threads des vues asynchrones (workers ASGI)
+    shutdown_executor()
+    # Dates de connexion encore en attente (LAST_LOGIN_MODE = 'buffered')
+    buffer.stop(timeout=5)
+    buffer.flush()
+    connections.close_all()
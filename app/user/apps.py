@@ -4,3 +4,25 @@ from django.apps import AppConfig
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user'
+
+    def ready(self):
+        from django.conf import settings
+
+        # Enregistre les récepteurs d'invalidation du cache des jetons
+        from user import signals  # noqa
+        from user import signed_tokens
+
+        if settings.AUTH_TOKEN_MODE == 'signed':
+            signed_tokens.check_revocation_cache()
+        # Exporte les compteurs du cache des jetons avec les autres métriques
+        from edcp_apirest import metrics
+        from user.authentication import token_cache
+
+        metrics.register_gauge(
+            'edcp_token_cache',
+            "Compteurs du cache des jetons d'authentification.",
+            lambda: [
+                ([('stat', stat)], value)
+                for stat, value in sorted(token_cache.stats().items())
+            ],
+        )
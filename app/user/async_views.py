@@ -0,0 +1,291 @@
+"""
+Vues asynchrones (ASGI) pour l'utilisateur API.
+
+Elles reproduisent les réponses de `user.views` sans thread par connexion : les
+accès à la base et le hachage passent par un pool de USER_API_ASYNC_THREADS
+threads (en parallèle, et non sur le thread unique de `sync_to_async` par
+défaut) et un jeton déjà en cache local est vérifié directement dans la boucle
+d'événements. Activées avec le setting `USER_API_ASYNC`.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.http import JsonResponse, QueryDict
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions, status
+from rest_framework.authentication import get_authorization_header
+
+from edcp_apirest import metrics
+from user import conditional, views
+from user.authentication import (
+    CachedTokenAuthentication, fresh_user, issue_token,
+)
+from user.serializers import (
+    AuthTokenSerializer, UserReadSerializer, UserSerializer,
+)
+from user.throttling import (
+    LoginEmailThrottle, LoginIPThrottle, SignupEmailThrottle,
+    SignupIPThrottle, check_throttles,
+)
+
+
+def _error(exc):
+    """
+    Convertit une exception DRF en réponse JSON identique à celle des vues DRF.
+    """
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {'detail': exc.detail}
+    response = JsonResponse(data, status=exc.status_code, safe=False)
+    unauthenticated = (
+        exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+    if isinstance(exc, unauthenticated):
+        response['WWW-Authenticate'] = CachedTokenAuthentication.keyword
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+def _method_not_allowed(request, allowed):
+    """Réponse 405 au format DRF."""
+    response = _error(exceptions.MethodNotAllowed(request.method))
+    response['Allow'] = ', '.join(allowed)
+    return response
+
+
+def _request_data(request):
+    """Retourne le corps de la requête (JSON, formulaire ou multipart)."""
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError as exc:
+            raise exceptions.ParseError(f'JSON parse error - {exc}')
+    if request.method == 'POST':
+        return request.POST
+    # Django ne décode les formulaires que pour POST (cas de PUT/PATCH)
+    if request.content_type == 'multipart/form-data':
+        data, files = request.parse_file_upload(
+            request.META, io.BytesIO(request.body))
+        return data
+    return QueryDict(request.body, encoding=request.encoding)
+
+
+_executor = None
+_executor_size = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Pool de threads du code synchrone, créé à la première requête."""
+    global _executor, _executor_size
+    with _executor_lock:
+        if _executor is None:
+            _executor_size = settings.USER_API_ASYNC_THREADS
+            _executor = ThreadPoolExecutor(
+                max_workers=_executor_size,
+                thread_name_prefix='user-api-async',
+            )
+        return _executor
+
+
+def shutdown_executor():
+    """
+    Ferme les connexions à la base de chaque thread puis arrête le pool (fin
+    d'un worker, tests).
+    """
+    global _executor
+    with _executor_lock:
+        executor, size, _executor = _executor, _executor_size, None
+    if executor is None:
+        return
+    # La barrière garantit qu'une tâche de fermeture s'exécute dans chacun des
+    # threads
+    barrier = threading.Barrier(size)
+
+    def close():
+        try:
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+        connections.close_all()
+
+    for _slot in range(size):
+        executor.submit(close)
+    executor.shutdown(wait=True)
+
+
+def _call(func, *args, **kwargs):
+    """
+    Appelle `func` dans un thread du pool, avec la gestion des connexions d'une
+    requête Django.
+    """
+    close_old_connections()
+    try:
+        with contextlib.ExitStack() as stack:
+            # PerformanceMiddleware n'instrumente que les connexions de son
+            # propre thread : les requêtes SQL de ce thread sont comptées ici
+            timings = metrics.current_timings.get()
+            if timings is not None:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.db_wrapper))
+            return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def _run(func, *args, **kwargs):
+    """
+    Exécute du code synchrone (ORM, hachage) hors de la boucle d'événements, en
+    parallèle.
+    """
+    call = functools.partial(
+        contextvars.copy_context().run, _call, func, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), call)
+
+
+def _check_throttle(throttle_classes, request, data):
+    wait = check_throttles(throttle_classes, request, data)
+    if wait is not None:
+        raise exceptions.Throttled(wait)
+
+
+async def _throttle(throttle_classes, request, data):
+    """
+    Lève Throttled si la requête dépasse un débit, avant tout hachage de mot de
+    passe.
+    """
+    if settings.THROTTLE_CACHE_ALIAS:
+        # Compteurs dans un cache partagé : entrée/sortie hors de la boucle
+        # d'événements
+        await _run(_check_throttle, throttle_classes, request, data)
+    else:
+        _check_throttle(throttle_classes, request, data)
+
+
+async def _options(view_class, request):
+    """
+    Répond à OPTIONS comme la vue DRF synchrone équivalente (métadonnées,
+    Allow).
+    """
+    def respond():
+        response = view_class.as_view()(request)
+        return response.render()
+    return await _run(respond)
+
+
+async def _authenticate(request):
+    """
+    Authentifie la requête par jeton, sans entrée/sortie si le jeton est en
+    cache local.
+    """
+    authenticator = CachedTokenAuthentication()
+    header = get_authorization_header(request).split()
+    keyword = authenticator.keyword.lower().encode()
+    if len(header) == 2 and header[0].lower() == keyword:
+        try:
+            result = authenticator.cached_credentials(
+                header[1].decode(), local_only=True)
+        except UnicodeError:
+            result = None
+        if result is not None:
+            return result[0]
+    result = await _run(authenticator.authenticate, request)
+    if result is None:
+        raise exceptions.NotAuthenticated(
+            _('Authentication credentials were not provided.'))
+    return result[0]
+
+
+async def create_user(request):
+    """Crée un nouvel utilisateur dans le système."""
+    if request.method == 'OPTIONS':
+        return await _options(views.CreateUserView, request)
+    if request.method != 'POST':
+        return _method_not_allowed(request, ['POST', 'OPTIONS'])
+    try:
+        data = _request_data(request)
+        await _throttle([SignupIPThrottle, SignupEmailThrottle], request, data)
+        serializer = UserSerializer(data=data)
+        await _run(serializer.is_valid, raise_exception=True)
+        await _run(serializer.save)
+    except exceptions.APIException as exc:
+        return _error(exc)
+    return JsonResponse(serializer.data, status=status.HTTP_201_CREATED)
+
+
+async def create_token(request):
+    """Authentifie l'utilisateur et lui délivre un nouveau jeton expirant."""
+    if request.method == 'OPTIONS':
+        return await _options(views.CreateTokenView, request)
+    if request.method != 'POST':
+        return _method_not_allowed(request, ['POST', 'OPTIONS'])
+    try:
+        data = _request_data(request)
+        await _throttle([LoginIPThrottle, LoginEmailThrottle], request, data)
+        serializer = AuthTokenSerializer(
+            data=data, context={'request': request})
+        await _run(serializer.is_valid, raise_exception=True)
+    except exceptions.APIException as exc:
+        return _error(exc)
+    key, expires = await _run(
+        issue_token, serializer.validated_data['user'], request)
+    return JsonResponse({'token': key, 'expires': expires})
+
+
+async def manage_user(request):
+    """Retourne ou met à jour l'utilisateur authentifié."""
+    allowed = ['GET', 'PUT', 'PATCH', 'HEAD', 'OPTIONS']
+    if request.method == 'OPTIONS':
+        return await _options(views.ManageUserView, request)
+    try:
+        user = await _authenticate(request)
+        if request.method not in ('GET', 'HEAD', 'PUT', 'PATCH'):
+            return _method_not_allowed(request, allowed)
+        if request.method in ('PUT', 'PATCH'):
+            return await _run(_update, user, request, _request_data(request))
+        response = conditional.evaluate_preconditions(request, user)
+        if response is not None:
+            if response.status_code == status.HTTP_304_NOT_MODIFIED:
+                conditional.set_validators(response, user)
+            return response
+        # Aucune requête SQL : l'utilisateur vient de l'authentification
+        response = JsonResponse(UserReadSerializer(user).data)
+        return conditional.set_validators(response, user)
+    except exceptions.APIException as exc:
+        return _error(exc)
+
+
+def _update(user, request, data):
+    """
+    Modifie le profil sur la ligne en base, verrouillée de la comparaison de
+    If-Match jusqu'à l'écriture (la capture du cache de jetons peut être
+    périmée).
+    """
+    with transaction.atomic(using=router.db_for_write(type(user))):
+        user = fresh_user(user, lock=True)
+        response = conditional.evaluate_preconditions(request, user)
+        if response is not None:
+            return response
+        serializer = UserSerializer(
+            user, data=data, partial=request.method == 'PATCH')
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+    return conditional.set_validators(JsonResponse(serializer.data), user)
+
+
+# Les vues DRF sont exemptées de CSRF ; on fait de même (csrf_exempt ne gère
+# pas les coroutines ici)
+for _view in (create_user, create_token, manage_user):
+    _view.csrf_exempt = True
@@ -0,0 +1,337 @@
+"""
+Authentification par jeton avec cache pour l'API utilisateur.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
+from django.core import signing
+from django.core.cache import caches
+from django.db import router
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import authentication, exceptions
+
+from edcp_apirest.cache import LRUCache
+from edcp_apirest.models import AuthToken
+from user import signed_tokens
+
+
+def _snapshot(instance):
+    """
+    Capture les valeurs des champs concrets d'une instance (sérialisable).
+    """
+    opts = instance._meta
+    return tuple(getattr(instance, f.attname) for f in opts.concrete_fields)
+
+
+def _restore(model, values, using):
+    """Reconstruit une instance indépendante à partir d'une capture."""
+    names = [f.attname for f in model._meta.concrete_fields]
+    return model.from_db(using, names, values)
+
+
+class TokenCache:
+    """
+    Cache jeton -> utilisateur à deux niveaux : mémoire du processus puis cache
+    Django.
+
+    Avec un cache partagé, chaque entrée porte la version de son utilisateur,
+    tenue dans ce cache et incrémentée par invalidate_user : une modification
+    faite dans un processus invalide les entrées de tous les autres (une
+    lecture du cache partagé par requête, aucune requête SQL). Sans cache
+    partagé, l'invalidation reste locale au processus et les autres servent
+    l'entrée jusqu'à TOKEN_CACHE_TTL.
+    """
+
+    key_prefix = 'auth-token:'
+    version_prefix = 'auth-user-version:'
+
+    def __init__(self, max_size=None, ttl=None, alias=None):
+        self.ttl = ttl if ttl is not None else settings.TOKEN_CACHE_TTL
+        if max_size is None:
+            max_size = settings.TOKEN_CACHE_MAX_SIZE
+        self.local = LRUCache(max_size=max_size, ttl=self.ttl)
+        # Alias du cache Django partagé entre processus (désactivé si None)
+        self.alias = alias if alias is not None else settings.TOKEN_CACHE_ALIAS
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.stale = 0  # Entrées rejetées : version de l'utilisateur dépassée
+
+    @property
+    def shared(self):
+        """
+        Retourne le cache Django partagé ou None s'il n'est pas configuré.
+        """
+        return caches[self.alias] if self.alias else None
+
+    def _version_key(self, user_id):
+        return f'{self.version_prefix}{user_id}'
+
+    def user_version(self, user_id):
+        """
+        Version courante de l'utilisateur dans le cache partagé (0 sans cache
+        partagé).
+        """
+        if self.shared is None:
+            return 0
+        return self.shared.get(self._version_key(user_id), 0)
+
+    def get(self, key, local_only=False):
+        """
+        Retourne la capture (base, jeton, utilisateur, identifiant, version)
+        associée à la clé ou None. Avec `local_only`, aucune entrée/sortie :
+        sans cache partagé seulement, car la version de l'utilisateur ne peut
+        pas être vérifiée sans le lire.
+        """
+        shared = self.shared
+        entry = self.local.get(key)
+        if entry is not None:
+            if shared is None:
+                return entry
+            if local_only:
+                return None
+            if shared.get(self._version_key(entry[3]), 0) == entry[4]:
+                return entry
+            self.local.delete(key)
+            self.stale += 1
+        if local_only or shared is None:
+            return None
+        entry = shared.get(self.key_prefix + key)
+        if entry is None:
+            self.shared_misses += 1
+            return None
+        if shared.get(self._version_key(entry[3]), 0) != entry[4]:
+            self.stale += 1
+            return None
+        # Succès dans le cache partagé : on alimente le cache local
+        self.shared_hits += 1
+        self.local.set(key, entry)
+        return entry
+
+    def set(self, key, token):
+        """
+        Met en cache un jeton et son utilisateur (chargé via select_related).
+        La version est lue juste après la ligne : une modification validée
+        entre les deux lectures peut être servie jusqu'à TOKEN_CACHE_TTL.
+        """
+        version = self.user_version(token.user_id)
+        entry = (
+            token._state.db, _snapshot(token), _snapshot(token.user),
+            token.user_id, version,
+        )
+        self.local.set(key, entry)
+        if self.shared is not None:
+            self.shared.set(self.key_prefix + key, entry, self.ttl)
+
+    def invalidate(self, keys):
+        """Supprime les jetons donnés des deux niveaux de cache."""
+        keys = list(keys)
+        for key in keys:
+            self.local.delete(key)
+        if self.shared is not None and keys:
+            self.shared.delete_many([self.key_prefix + key for key in keys])
+
+    def invalidate_user(self, user_id):
+        """
+        Invalide dans tous les processus les jetons en cache de l'utilisateur.
+        Retourne False sans cache partagé : l'appelant invalide alors les clés
+        une à une.
+        """
+        shared = self.shared
+        if shared is None:
+            return False
+        key = self._version_key(user_id)
+        shared.add(key, 0, None)
+        try:
+            shared.incr(key)
+        except ValueError:
+            # Clé expulsée entre add et incr : toute autre valeur invalide
+            # aussi les entrées
+            shared.set(key, 1, None)
+        return True
+
+    def clear(self):
+        """Vide le cache local et remet les compteurs à zéro."""
+        self.local.clear()
+        self.shared_hits = self.shared_misses = self.stale = 0
+
+    def stats(self):
+        """Retourne les compteurs de succès/échecs des deux niveaux."""
+        local = self.local.stats()
+        return {
+            'local_hits': local['hits'],
+            'local_misses': local['misses'],
+            'local_size': local['size'],
+            'local_evictions': local['evictions'],
+            'shared_hits': self.shared_hits,
+            'shared_misses': self.shared_misses,
+            'stale': self.stale,
+        }
+
+
+# Instance partagée par toutes les requêtes du processus
+token_cache = TokenCache()
+
+# Utilisateurs des jetons signés (identifiant -> capture, base, version),
+# rejetés dès que la version de l'utilisateur change dans le cache de
+# révocation partagé (voir user.signals)
+user_cache = LRUCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
+
+def fresh_user(user, lock=False):
+    """
+    Relit l'utilisateur authentifié sur la base d'écriture avant une
+    modification : la capture du cache de jetons peut être périmée et ne doit
+    pas être réenregistrée. Avec `lock`, la ligne est verrouillée (SELECT ...
+    FOR UPDATE) jusqu'à la fin de la transaction.
+    """
+    user_model = type(user)
+    manager = user_model._default_manager.db_manager(
+        router.db_for_write(user_model))
+    queryset = manager.filter(pk=user.pk)
+    if lock:
+        queryset = queryset.select_for_update()
+    fresh = queryset.first()
+    if fresh is None or not fresh.is_active:
+        raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+    return fresh
+
+
+def get_or_primary(queryset, **lookup):
+    """
+    QuerySet.get() sur la base de lecture puis, en cas d'absence, une seule
+    fois sur la base d'écriture : un jeton ou un utilisateur tout juste créé
+    peut manquer au réplica.
+    """
+    read_db = queryset.db
+    try:
+        return queryset.get(**lookup)
+    except queryset.model.DoesNotExist:
+        write_db = router.db_for_write(queryset.model)
+        if write_db == read_db:
+            raise
+        return queryset.using(write_db).get(**lookup)
+
+
+def issue_token(user, request=None):
+    """
+    Délivre un jeton selon AUTH_TOKEN_MODE et retourne (clé, date
+    d'expiration). Avec LAST_LOGIN_MODE = 'buffered', la connexion envoie
+    user_logged_in (date mise en tampon, sans requête) ; en mode 'sync', comme
+    ObtainAuthToken, elle ne l'envoie pas.
+    """
+    if settings.AUTH_TOKEN_MODE == 'signed':
+        payload = signed_tokens.issue(user)
+        key, expires = payload.key, payload.expires_at
+    else:
+        token = AuthToken.objects.create_for_user(user)
+        key, expires = token.key, token.expires
+    if settings.LAST_LOGIN_MODE == 'buffered':
+        user_logged_in.send(sender=user.__class__, request=request, user=user)
+    return key, expires
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    """
+    Authentification par jeton expirant (AuthToken) qui évite la requête SQL
+    pour les jetons en cache. L'expiration est vérifiée à chaque requête, en
+    mémoire ; la prolongation n'est écrite qu'au plus une fois par
+    AUTH_TOKEN_REFRESH_INTERVAL. Avec AUTH_TOKEN_MODE = 'signed', les jetons
+    signés sont aussi acceptés (signed_credentials).
+    """
+
+    model = AuthToken
+    cache = token_cache
+
+    def cached_credentials(self, key, local_only=False):
+        """
+        Retourne (utilisateur, jeton) depuis le cache ou None en cas d'échec.
+        Avec `local_only`, aucune entrée/sortie n'est faite (utilisable dans
+        une boucle asyncio).
+        """
+        entry = self.cache.get(key, local_only=local_only)
+        if entry is None:
+            return None
+        # Chaque requête reçoit ses propres instances reconstruites depuis le
+        # cache
+        using, token_values, user_values = entry[:3]
+        token = _restore(self.get_model(), token_values, using)
+        token.user = _restore(get_user_model(), user_values, using)
+        if local_only and token.needs_refresh():
+            # La prolongation écrit en base : pas dans la boucle asyncio
+            return None
+        return self._check_token(token)
+
+    def authenticate_credentials(self, key):
+        signed = settings.AUTH_TOKEN_MODE == 'signed'
+        if signed and signed_tokens.is_signed(key):
+            return self.signed_credentials(key)
+        result = self.cached_credentials(key)
+        if result is not None:
+            return result
+
+        model = self.get_model()
+        try:
+            token = get_or_primary(
+                model.objects.select_related('user'), key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        self.cache.set(key, token)
+        return self._check_token(token)
+
+    def signed_credentials(self, key):
+        """
+        Vérifie un jeton signé : signature et expiration en mémoire, liste de
+        révocation dans le cache, utilisateur lu en base seulement s'il n'est
+        pas dans user_cache à sa version courante.
+        """
+        try:
+            payload = signed_tokens.verify(key)
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed(_('Jeton expiré.'))
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        revoked, version = signed_tokens.revocation_state(payload)
+        if revoked:
+            raise exceptions.AuthenticationFailed(_('Jeton révoqué.'))
+
+        user_model = get_user_model()
+        entry = user_cache.get(payload.user_id)
+        # Capture d'une version dépassée : l'utilisateur a été modifié dans un
+        # autre processus
+        if entry is not None and entry[2] == version:
+            user = _restore(user_model, entry[0], entry[1])
+        else:
+            try:
+                user = get_or_primary(
+                    user_model._default_manager.all(), pk=payload.user_id)
+            except user_model.DoesNotExist:
+                user = None
+            if user is not None:
+                user_cache.set(
+                    payload.user_id,
+                    (_snapshot(user), user._state.db, version),
+                )
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+        return (user, payload)
+
+    def _check_token(self, token):
+        """
+        Refuse les jetons expirés et les utilisateurs désactivés, prolonge le
+        jeton si besoin.
+        """
+        now = timezone.now()
+        if token.is_expired(now):
+            raise exceptions.AuthenticationFailed(_('Jeton expiré.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+        if token.needs_refresh(now):
+            token.refresh(now)
+            self.cache.set(token.key, token)
+
+        return (token.user, token)
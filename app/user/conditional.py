@@ -0,0 +1,39 @@
+"""
+Requêtes conditionnelles (ETag / Last-Modified) pour le profil utilisateur.
+"""
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def user_etag(user):
+    """
+    ETag fort dérivé de l'identifiant et de la date de dernière modification.
+    """
+    version = user.last_modified.timestamp() * 1000000
+    return quote_etag('%s-%d' % (user.pk, version))
+
+
+def user_last_modified(user):
+    """
+    Date de dernière modification en secondes (précision de l'en-tête HTTP).
+    """
+    return int(user.last_modified.timestamp())
+
+
+def evaluate_preconditions(request, user):
+    """
+    Retourne une réponse 304 (If-None-Match / If-Modified-Since sur GET/HEAD)
+    ou 412 (If-Match sur PUT/PATCH), ou None si la requête doit être traitée.
+    """
+    return get_conditional_response(
+        request, etag=user_etag(user), last_modified=user_last_modified(user),
+    )
+
+
+def set_validators(response, user):
+    """Ajoute ETag et Last-Modified à la réponse."""
+    response['ETag'] = user_etag(user)
+    response['Last-Modified'] = http_date(user_last_modified(user))
+    # Réponse propre à l'utilisateur, toujours revalidée par les caches
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,291 @@
+"""
+Commande Django de test de charge de l'API utilisateur.
+
+Exemple avec docker-compose (serveur et PostgreSQL locaux) :
+
+    docker-compose up -d
+    docker-compose exec app python manage.py benchmark_api \
+        --output /tmp/avant.json
+    # ... modification ...
+    docker-compose exec app python manage.py benchmark_api \
+        --compare /tmp/avant.json
+
+Le serveur testé doit être lancé avec THROTTLE_ENABLED=0, sinon la limitation
+de débit de /api/user/token/ et /api/user/create/ compte comme des erreurs.
+"""
+import json
+import platform
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+# Scénarios disponibles : (méthode, chemin, statut attendu)
+SCENARIOS = {
+    'create': ('POST', '/api/user/create/', 201),
+    'token': ('POST', '/api/user/token/', 200),
+    'me': ('GET', '/api/user/me/', 200),
+}
+
+# Mot de passe de l'utilisateur de test
+BENCH_PASSWORD = 'benchpass123'
+
+
+def percentile(values, percent):
+    """Percentile par rang le plus proche d'une liste triée."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * percent // 100))  # Arrondi supérieur
+    return values[int(rank) - 1]
+
+
+def parse_server_timing(header):
+    """
+    Retourne (requêtes SQL, temps SQL en ms) depuis l'en-tête Server-Timing, ou
+    (None, None).
+    """
+    queries = db_time = None
+    for metric in (header or '').split(','):
+        name, *params = [part.strip() for part in metric.split(';')]
+        values = dict(param.split('=', 1) for param in params if '=' in param)
+        if name == 'db-queries':
+            queries = int(values.get('desc', '0').strip('"'))
+        elif name == 'db':
+            db_time = float(values.get('dur', 0))
+    return queries, db_time
+
+
+class Command(BaseCommand):
+    """Mesure débit, latences et requêtes SQL des vues create, token et me."""
+
+    help = (
+        "Test de charge de /api/user/create/, /api/user/token/ et "
+        "/api/user/me/ sur un serveur en cours d'exécution ; résultats "
+        "enregistrables en JSON et comparables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000',
+            help='URL du serveur à tester (défaut : http://127.0.0.1:8000).',
+        )
+        parser.add_argument(
+            '--scenarios', nargs='+', choices=sorted(SCENARIOS),
+            default=['create', 'token', 'me'],
+            help='Scénarios à exécuter (défaut : tous).',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=10,
+            help='Nombre de clients simultanés (défaut : 10).',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help='Nombre de requêtes mesurées par scénario (défaut : 500).',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=20,
+            help=(
+                'Requêtes de chauffe non mesurées par scénario '
+                '(défaut : 20).'
+            ),
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=30,
+            help='Délai maximal d\'une requête en secondes (défaut : 30).',
+        )
+        parser.add_argument(
+            '--output', help='Fichier JSON où enregistrer les résultats.')
+        parser.add_argument(
+            '--compare',
+            help='Fichier JSON d\'une exécution précédente à comparer.',
+        )
+        parser.add_argument(
+            '--cleanup', action='store_true',
+            help=(
+                'Supprime ensuite les utilisateurs créés (le serveur doit '
+                'utiliser la même base).'
+            ),
+        )
+
+    def _request(self, method, path, data=None, token=None):
+        """
+        Envoie une requête et retourne (statut, latence en s, en-têtes, corps).
+        """
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=body, method=method)
+        request.add_header('Content-Type', 'application/json')
+        if token:
+            request.add_header('Authorization', f'Token {token}')
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(
+                    request, timeout=self.timeout) as response:
+                content = response.read()
+                status, headers = response.status, response.headers
+        except urllib.error.HTTPError as exc:
+            content = exc.read()
+            status, headers = exc.code, exc.headers
+        except urllib.error.URLError as exc:
+            raise CommandError(
+                f'Serveur injoignable ({self.base_url}) : {exc.reason}')
+        return status, time.perf_counter() - start, headers, content
+
+    def _setup(self):
+        """
+        Crée l'utilisateur de test de cette exécution et retourne son jeton.
+        """
+        self.credentials = {
+            'email': f'bench-{self.run_id}@example.com',
+            'password': BENCH_PASSWORD,
+        }
+        status, _, _, content = self._request(
+            'POST', '/api/user/create/', {**self.credentials, 'name': 'Bench'})
+        if status != 201:
+            raise CommandError(
+                'Création de l\'utilisateur de test impossible '
+                f'({status}) : {content[:200]!r}'
+            )
+        status, _, _, content = self._request(
+            'POST', '/api/user/token/', self.credentials)
+        if status != 200:
+            raise CommandError(
+                'Obtention du jeton impossible '
+                f'({status}) : {content[:200]!r}'
+            )
+        return json.loads(content)['token']
+
+    def _payload(self, scenario, index):
+        """Retourne (données, jeton) de la requête numéro index du scénario."""
+        if scenario == 'create':
+            email = f'bench-{self.run_id}-{index}@example.com'
+            return {
+                'email': email, 'password': BENCH_PASSWORD, 'name': 'Bench',
+            }, None
+        if scenario == 'token':
+            return self.credentials, None
+        return None, self.token
+
+    def _run_scenario(self, scenario, requests, warmup, concurrency):
+        """Exécute un scénario et retourne ses statistiques."""
+        method, path, expected = SCENARIOS[scenario]
+
+        def call(index):
+            data, token = self._payload(scenario, index)
+            status, latency, headers, _ = self._request(
+                method, path, data, token)
+            queries, db_time = parse_server_timing(
+                headers.get('Server-Timing'))
+            return status == expected, latency, queries, db_time
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(call, range(-warmup, 0)))
+            start = time.perf_counter()
+            results = list(executor.map(call, range(requests)))
+            elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency * 1000 for _, latency, _, _ in results)
+        queries = [count for _, _, count, _ in results if count is not None]
+        db_times = [
+            db_time for _, _, _, db_time in results if db_time is not None
+        ]
+        return {
+            'requests': requests,
+            'errors': sum(1 for ok, _, _, _ in results if not ok),
+            'throughput': requests / elapsed if elapsed else 0.0,
+            'latency_ms': {
+                'mean': sum(latencies) / len(latencies),
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'max': latencies[-1],
+            },
+            # Nécessite PerformanceMiddleware côté serveur (Server-Timing)
+            'db_queries_mean': (
+                sum(queries) / len(queries) if queries else None),
+            'db_time_ms_mean': (
+                sum(db_times) / len(db_times) if db_times else None),
+        }
+
+    def _write_report(self, results, baseline):
+        """
+        Affiche le tableau des résultats et l'écart avec la référence
+        éventuelle.
+        """
+        self.stdout.write(
+            f"{'scénario':<10}{'req/s':>10}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+            f"{'SQL/req':>9}{'erreurs':>9}"
+        )
+        for scenario, stats in results['scenarios'].items():
+            latency = stats['latency_ms']
+            queries = stats['db_queries_mean']
+            sql = '-' if queries is None else f'{queries:.1f}'
+            self.stdout.write(
+                f"{scenario:<10}{stats['throughput']:>10.1f}"
+                f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}"
+                f"{latency['p99']:>10.2f}{sql:>9}{stats['errors']:>9}"
+            )
+            reference = (baseline or {}).get('scenarios', {}).get(scenario)
+            if reference:
+                changes = [
+                    ('req/s', stats['throughput'], reference['throughput']),
+                    ('p50', latency['p50'], reference['latency_ms']['p50']),
+                    ('p95', latency['p95'], reference['latency_ms']['p95']),
+                    ('p99', latency['p99'], reference['latency_ms']['p99']),
+                ]
+                self.stdout.write('  vs référence : ' + ', '.join(
+                    f'{label} {(value - ref) / ref * 100:+.1f} %'
+                    for label, value, ref in changes if ref
+                ))
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError(
+                '--concurrency et --requests doivent être supérieurs à 0.')
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as stream:
+                baseline = json.load(stream)
+
+        self.base_url = options['url'].rstrip('/')
+        self.timeout = options['timeout']
+        self.run_id = uuid.uuid4().hex[:12]
+        self.token = self._setup()
+
+        results = {
+            'meta': {
+                'url': self.base_url,
+                'date': datetime.now(timezone.utc).isoformat(),
+                'concurrency': options['concurrency'],
+                'requests': options['requests'],
+                'warmup': options['warmup'],
+                'python': platform.python_version(),
+            },
+            'scenarios': {},
+        }
+        for scenario in options['scenarios']:
+            results['scenarios'][scenario] = self._run_scenario(
+                scenario, options['requests'], max(0, options['warmup']),
+                options['concurrency'],
+            )
+
+        if options['cleanup']:
+            deleted, _ = get_user_model().objects.filter(
+                email__startswith=f'bench-{self.run_id}').delete()
+            self.stdout.write(f'{deleted} objet(s) de test supprimé(s).')
+
+        self._write_report(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                json.dump(results, stream, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f"Résultats enregistrés dans {options['output']}"))
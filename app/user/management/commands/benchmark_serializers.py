@@ -0,0 +1,75 @@
+"""
+Commande Django pour comparer UserSerializer et le sérialiseur rapide
+UserReadSerializer.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.renderers import JSONRenderer
+
+from user.serializers import UserReadSerializer, UserSerializer
+
+
+class Command(BaseCommand):
+    """
+    Mesure le coût de sérialisation + rendu JSON d'un utilisateur et d'une
+    liste.
+    """
+
+    help = (
+        "Compare UserSerializer et UserReadSerializer "
+        "(sortie identique exigée)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=2000,
+            help='Nombre de sérialisations par mesure (défaut : 2000).',
+        )
+        parser.add_argument(
+            '--list-size', type=int, default=100,
+            help=(
+                "Nombre d'utilisateurs pour la mesure en liste "
+                "(défaut : 100)."
+            ),
+        )
+
+    def _measure(self, serializer_class, instance, many, iterations):
+        """Retourne (octets rendus, microsecondes par opération)."""
+        renderer = JSONRenderer()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            serializer = serializer_class(instance, many=many)
+            content = renderer.render(serializer.data)
+        return content, (time.perf_counter() - start) / iterations * 1000000
+
+    def handle(self, *args, **options):
+        """
+        Point d'entrée de la commande.
+        """
+        iterations = max(1, options['iterations'])
+        model = get_user_model()
+        users = [
+            model(pk=i, email=f'user{i}@example.com', name=f'Utilisateur {i}')
+            for i in range(max(1, options['list_size']))
+        ]
+
+        self.stdout.write(
+            f"{'cas':<12}{'UserSerializer (µs)':>22}"
+            f"{'UserReadSerializer (µs)':>26}{'gain':>8}"
+        )
+        cases = (('instance', users[0], False), ('liste', users, True))
+        for label, instance, many in cases:
+            reference, slow = self._measure(
+                UserSerializer, instance, many, iterations)
+            content, fast = self._measure(
+                UserReadSerializer, instance, many, iterations)
+            if content != reference:
+                raise CommandError(
+                    f'Sortie différente pour le cas {label} : '
+                    f'{content!r} != {reference!r}'
+                )
+            self.stdout.write(
+                f'{label:<12}{slow:>22.1f}{fast:>26.1f}{slow / fast:>7.1f}x')
@@ -0,0 +1,19 @@
+"""
+Permissions de l'API utilisateur.
+"""
+from rest_framework import permissions
+
+
+class CanBulkCreateUsers(permissions.BasePermission):
+    """
+    Réservé au personnel et aux partenaires (permission edcp_apirest.add_user,
+    par exemple via un groupe) : chaque élément coûte un hachage de mot de
+    passe.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(
+            user and user.is_authenticated
+            and (user.is_staff or user.has_perm('edcp_apirest.add_user'))
+        )
@@ -2,34 +2,206 @@
 Sérialiseurs pour la vue API utilisateur.
 """
 # Importations des modules nécessaires
+import operator
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth import (
     get_user_model,
     authenticate,
 )
 
-from django.utils.translation import gettext as _
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext as _, gettext_lazy
 
 from rest_framework import serializers
 
+from edcp_apirest import hashing
+from edcp_apirest.metrics import TimedListSerializer, TimedSerializerMixin
+
+
+# Validateur d'unicité de l'email insensible à la casse
+class UniqueEmailValidator:
+    """
+    Refuse un email déjà utilisé, quelle que soit sa casse. Remplace le
+    UniqueValidator de DRF dont la recherche exacte laisserait passer
+    'Test@example.com' face à 'test@example.com' (puis échouerait sur l'index
+    unique).
+    """
+    requires_context = True
+    message = gettext_lazy('Un utilisateur avec cet email existe déjà.')
+
+    def __call__(self, value, serializer_field):
+        queryset = get_user_model().objects.filter_emails([value])
+        instance = getattr(serializer_field.parent, 'instance', None)
+        if instance is not None:
+            queryset = queryset.exclude(pk=instance.pk)
+        if queryset.exists():
+            raise serializers.ValidationError(self.message, code='unique')
+
+
+# Définition du sérialiseur en mode liste pour la création par lots
+class UserListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """
+    Sérialiseur en mode liste : valide chaque élément et insère les valides en
+    une transaction.
+    """
+
+    def to_internal_value(self, data):
+        """
+        Valide chaque élément et conserve ses erreurs sans rejeter tout le lot.
+        """
+        if not isinstance(data, list) or not data:
+            raise serializers.ValidationError(
+                {'non_field_errors': [_('Une liste non vide est attendue.')]},
+                code='not_a_list',
+            )
+        if len(data) > settings.BULK_CREATE_MAX_ITEMS:
+            msg = _('Au plus %d éléments par requête.') % (
+                settings.BULK_CREATE_MAX_ITEMS)
+            raise serializers.ValidationError(
+                {'non_field_errors': [msg]}, code='max_length')
+
+        # L'unicité des emails est vérifiée en une seule requête plus bas
+        email_field = self.child.fields['email']
+        email_field.validators = [
+            validator for validator in email_field.validators
+            if not isinstance(validator, UniqueEmailValidator)
+        ]
+
+        self.item_errors = {}  # Index -> erreurs de l'élément
+        valid = []
+        for index, item in enumerate(data):
+            try:
+                valid.append((index, self.child.run_validation(item)))
+            except serializers.ValidationError as exc:
+                self.item_errors[index] = exc.detail
+
+        model = self.child.Meta.model
+        for _index, attrs in valid:
+            attrs['email'] = model.objects.normalize_email(attrs['email'])
+        # Comparaison insensible à la casse, comme l'index unique sur
+        # LOWER(email)
+        found = model.objects.filter_emails(
+            [attrs['email'] for _index, attrs in valid]
+        ).values_list('email', flat=True)
+        existing = {email.lower() for email in found}
+
+        seen = set()
+        self.created_indexes = []  # Index des éléments qui seront créés
+        ret = []
+        for index, attrs in valid:
+            email = attrs['email'].lower()
+            if email in existing or email in seen:
+                self.item_errors[index] = {
+                    'email': [str(UniqueEmailValidator.message)],
+                }
+                continue
+            seen.add(email)
+            self.created_indexes.append(index)
+            ret.append(attrs)
+        return ret
+
+    def create(self, validated_data):
+        """Crée tous les utilisateurs valides avec des INSERT groupés."""
+        model = self.child.Meta.model
+        # Hachage du lot en parallèle dans le pool de hachage (un à un sans
+        # pool)
+        passwords = hashing.make_passwords(
+            [attrs.pop('password', None) for attrs in validated_data])
+        users = [
+            model(password=password, **attrs)
+            for attrs, password in zip(validated_data, passwords)
+        ]
+        try:
+            with transaction.atomic():
+                return model.objects.bulk_create(
+                    users, batch_size=settings.BULK_CREATE_BATCH_SIZE)
+        except IntegrityError:
+            # Un email a été créé entre-temps par une autre requête
+            msg = _('Conflit lors de la création, veuillez réessayer.')
+            raise serializers.ValidationError({'non_field_errors': [msg]})
+
+
 # Définition du sérialiseur pour l'utilisateur
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Sérialiseur pour l'utilisateur."""
     class Meta:
         # Spécification du modèle et des champs à sérialiser
         model = get_user_model()
         fields = ('email', 'password', 'name',)
         # Options supplémentaires pour le champ 'password'
-        extra_kwargs = {'password': {'write_only': True, 'min_length': 5}}
+        extra_kwargs = {
+            'password': {'write_only': True, 'min_length': 5},
+            'email': {'validators': [UniqueEmailValidator()]},
+        }
+        # Sérialiseur utilisé avec many=True (création par lots)
+        list_serializer_class = UserListSerializer
 
     def create(self, validated_data):
         """Créer et retourner un utilisateur avec un mot de passe chiffré."""
         # Création d'un nouvel utilisateur avec les données validées
         return get_user_model().objects.create_user(**validated_data)
 
+    def update(self, instance, validated_data):
+        """
+        Mettre à jour l'utilisateur en chiffrant le nouveau mot de passe
+        éventuel.
+        """
+        password = validated_data.pop('password', None)
+        fields = list(validated_data)
+        if password:
+            instance.set_password(password)
+            fields.append('password')
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+
+        # Un seul UPDATE, limité aux champs envoyés (et à last_modified,
+        # auto_now) : les autres colonnes ne sont jamais réécrites depuis
+        # l'instance
+        instance.save(update_fields=[*fields, 'last_modified'])
+        return instance
+
+
+# Champs lisibles de UserSerializer (sans les champs write_only), dans le même
+# ordre
+USER_READ_FIELDS = tuple(
+    name for name in UserSerializer.Meta.fields
+    if not UserSerializer.Meta.extra_kwargs.get(name, {}).get('write_only')
+)
+_get_user_fields = operator.attrgetter(*USER_READ_FIELDS)
+_get_row_fields = operator.itemgetter(*USER_READ_FIELDS)
+
+
+def _to_str(value):
+    """Même conversion que CharField/EmailField.to_representation."""
+    return None if value is None else str(value)
+
+
+# Définition du sérialiseur rapide en lecture seule pour l'utilisateur
+class UserReadSerializer(TimedSerializerMixin, serializers.BaseSerializer):
+    """
+    Sérialiseur en lecture seule pour l'utilisateur, sans introspection des
+    champs. Produit exactement la même sortie que UserSerializer, à partir
+    d'une instance ou d'une ligne `values()`.
+    """
+
+    class Meta:
+        # Liste chronométrée par le middleware de performance
+        list_serializer_class = TimedListSerializer
+
+    def to_representation(self, instance):
+        if isinstance(instance, dict):
+            values = _get_row_fields(instance)
+        else:
+            values = _get_user_fields(instance)
+        if len(USER_READ_FIELDS) == 1:
+            values = (values,)
+        return dict(zip(USER_READ_FIELDS, map(_to_str, values)))
+
 
 # Définition du sérialiseur pour le jeton d'authentification de l'utilisateur
-class AuthTokenSerializer(serializers.Serializer):
+class AuthTokenSerializer(TimedSerializerMixin, serializers.Serializer):
     """Sérialiseur pour le jeton d'authentification de l'utilisateur."""
     # Définition des champs 'email' et 'password'
     email = serializers.EmailField()
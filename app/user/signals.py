@@ -0,0 +1,53 @@
+"""
+Récepteurs de signaux de l'application utilisateur.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from edcp_apirest.models import AuthToken
+from edcp_apirest.signals import tokens_revoked
+from user import signed_tokens
+from user.authentication import token_cache, user_cache
+
+
+@receiver(post_delete, sender=AuthToken)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Retire du cache un jeton supprimé."""
+    token_cache.invalidate([instance.key])
+
+
+@receiver(tokens_revoked, sender=AuthToken)
+def invalidate_revoked_tokens(sender, keys, **kwargs):
+    """Retire du cache les jetons révoqués en groupe."""
+    token_cache.invalidate(keys)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created=False, **kwargs):
+    """Retire du cache les jetons d'un utilisateur modifié (API ou admin)."""
+    user_cache.delete(instance.pk)
+    if created:
+        return  # Un nouvel utilisateur n'a encore aucun jeton
+    if settings.AUTH_TOKEN_MODE == 'signed':
+        signed_tokens.bump_user_version(instance.pk)
+        # set_password() laisse le mot de passe en clair dans _password jusqu'à
+        # la fin de save()
+        if not instance.is_active or instance._password is not None:
+            signed_tokens.revoke_user(instance.pk)
+    # Cache partagé : la version de l'utilisateur invalide ses jetons dans tous
+    # les processus, sans relire leurs clés
+    if token_cache.invalidate_user(instance.pk):
+        return
+    keys = AuthToken.objects.filter(user=instance).values_list(
+        'key', flat=True)
+    token_cache.invalidate(keys)
+
+
+@receiver(post_delete, sender=get_user_model())
+def invalidate_deleted_user(sender, instance, **kwargs):
+    """Retire du cache un utilisateur supprimé (jetons signés)."""
+    user_cache.delete(instance.pk)
+    if settings.AUTH_TOKEN_MODE == 'signed':
+        signed_tokens.bump_user_version(instance.pk)
@@ -0,0 +1,154 @@
+"""
+Jetons signés autonomes (AUTH_TOKEN_MODE = 'signed').
+
+Le jeton porte l'identifiant de l'utilisateur, ses dates d'émission et
+d'expiration et un nonce, signés par HMAC (django.core.signing) : sa
+vérification ne demande aucune requête SQL. Format :
+`<user_id>.<émis>.<expire>.<nonce>:<signature>`, émission en microsecondes,
+expiration en secondes.
+
+Rotation des clés : SIGNED_TOKEN_KEYS[0] signe les nouveaux jetons, toutes les
+clés de la liste sont acceptées à la vérification.
+
+Révocation : par utilisateur (jetons émis avant une date, à la microseconde),
+au changement de mot de passe et à la désactivation (user.signals), dans le
+cache SIGNED_TOKEN_REVOCATION_CACHE dont les entrées expirent avec les jetons
+concernés. Ce cache porte aussi la version de chaque utilisateur, qui invalide
+sa capture dans user_cache : il doit être partagé entre processus
+(ImproperlyConfigured sinon).
+"""
+import secrets
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from edcp_apirest.cache import is_shared
+
+SALT = 'user.signed_tokens'
+# Séparateur de la signature (absent des jetons de la table AuthToken)
+SEPARATOR = ':'
+REVOCATION_PREFIX = 'signed-token-revoked:'
+
+
+class SignedTokenPayload:
+    """Contenu vérifié d'un jeton signé."""
+
+    __slots__ = ('key', 'user_id', 'issued', 'expires', 'nonce')
+
+    def __init__(self, key, user_id, issued, expires, nonce):
+        self.key = key
+        self.user_id = user_id
+        self.issued = issued  # Horodatage Unix à la microseconde
+        self.expires = expires  # Horodatage Unix en secondes
+        self.nonce = nonce
+
+    def __str__(self):
+        return self.key
+
+    @property
+    def expires_at(self):
+        return datetime.fromtimestamp(self.expires, tz=dt_timezone.utc)
+
+
+def is_signed(key):
+    """Indique si la clé a la forme d'un jeton signé."""
+    return SEPARATOR in key
+
+
+def _signer(key):
+    return signing.Signer(key, sep=SEPARATOR, salt=SALT)
+
+
+def issue(user, now=None):
+    """Signe un nouveau jeton pour l'utilisateur et retourne son contenu."""
+    # Émission à la microseconde : un jeton émis juste après une révocation
+    # reste valide
+    issued_us = int((now if now is not None else time.time()) * 1_000_000)
+    expires = issued_us // 1_000_000 + settings.AUTH_TOKEN_TTL
+    nonce = secrets.token_urlsafe(6)
+    key = _signer(settings.SIGNED_TOKEN_KEYS[0]).sign(
+        f'{user.pk}.{issued_us}.{expires}.{nonce}')
+    return SignedTokenPayload(
+        key, user.pk, issued_us / 1_000_000, expires, nonce)
+
+
+def verify(key, now=None):
+    """
+    Vérifie la signature (toutes les clés de SIGNED_TOKEN_KEYS) et l'expiration
+    du jeton. Lève signing.BadSignature, ou signing.SignatureExpired pour un
+    jeton expiré.
+    """
+    for secret in settings.SIGNED_TOKEN_KEYS:
+        try:
+            value = _signer(secret).unsign(key)
+            break
+        except signing.BadSignature:
+            continue
+    else:
+        raise signing.BadSignature('Signature invalide.')
+    try:
+        user_id, issued, expires, nonce = value.split('.')
+        payload = SignedTokenPayload(
+            key, int(user_id), int(issued) / 1_000_000, int(expires), nonce)
+    except ValueError:
+        raise signing.BadSignature('Contenu du jeton invalide.')
+    if payload.expires <= (now if now is not None else time.time()):
+        raise signing.SignatureExpired('Jeton expiré.')
+    return payload
+
+
+def check_revocation_cache():
+    """
+    Refuse un cache de révocation propre au processus : une révocation n'y
+    atteindrait pas les autres.
+    """
+    if not is_shared(settings.SIGNED_TOKEN_REVOCATION_CACHE):
+        raise ImproperlyConfigured(
+            "AUTH_TOKEN_MODE = 'signed' demande un cache partagé entre "
+            "processus pour SIGNED_TOKEN_REVOCATION_CACHE "
+            f"('{settings.SIGNED_TOKEN_REVOCATION_CACHE}')."
+        )
+
+
+def _revocations():
+    check_revocation_cache()
+    return caches[settings.SIGNED_TOKEN_REVOCATION_CACHE]
+
+
+def revoke_user(user_id, now=None):
+    """Révoque tous les jetons de l'utilisateur émis jusqu'à maintenant."""
+    now = now if now is not None else time.time()
+    # Au-delà de AUTH_TOKEN_TTL, les jetons concernés ont tous expiré
+    _revocations().set(
+        f'{REVOCATION_PREFIX}user:{user_id}', now, settings.AUTH_TOKEN_TTL)
+
+
+def bump_user_version(user_id):
+    """
+    Change la version de l'utilisateur : sa capture en cache est rejetée dans
+    tous les processus.
+    """
+    revocations = _revocations()
+    key = f'{REVOCATION_PREFIX}version:{user_id}'
+    revocations.add(key, 0, None)
+    try:
+        revocations.incr(key)
+    except ValueError:
+        # Entrée évincée entre add() et incr()
+        revocations.set(key, 1, None)
+
+
+def revocation_state(payload):
+    """
+    Retourne (jeton révoqué, version de l'utilisateur) en un seul aller-retour
+    vers le cache.
+    """
+    user_key = f'{REVOCATION_PREFIX}user:{payload.user_id}'
+    version_key = f'{REVOCATION_PREFIX}version:{payload.user_id}'
+    entries = _revocations().get_many([user_key, version_key])
+    revoked = user_key in entries and payload.issued <= entries[user_key]
+    return revoked, entries.get(version_key, 0)
@@ -0,0 +1,170 @@
+"""
+Tests des vues asynchrones de l'API utilisateur.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import async_to_sync
+
+from django.test import TransactionTestCase, RequestFactory
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+
+from edcp_apirest import metrics
+from edcp_apirest.models import AuthToken
+from user import async_views
+from user.authentication import token_cache
+
+
+def call(view, request):
+    """Exécute une vue asynchrone et retourne (réponse, données JSON)."""
+    response = async_to_sync(view)(request)
+    return response, json.loads(response.content)
+
+
+class AsyncUserApiTests(TransactionTestCase):
+    """
+    Tests des vues asynchrones. L'ORM s'exécute dans les threads du pool, avec
+    leurs propres connexions : les données du test doivent être validées
+    (TransactionTestCase).
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        self.factory = RequestFactory()
+        self.addCleanup(async_views.shutdown_executor)
+
+    def test_create_user_success(self):
+        """Création d'un utilisateur avec succès."""
+        payload = {
+            'email': 'test@example.com', 'password': 'testpass123',
+            'name': 'Test Name',
+        }
+        request = self.factory.post('/api/user/create/', payload)
+
+        res, data = call(async_views.create_user, request)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            data, {'email': 'test@example.com', 'name': 'Test Name'})
+        user = get_user_model().objects.get(email=payload['email'])
+        self.assertTrue(user.check_password(payload['password']))
+
+    def test_create_user_invalid(self):
+        """Les erreurs de validation sont retournées comme avec DRF."""
+        request = self.factory.post(
+            '/api/user/create/', {'email': 'invalid_email'})
+
+        res, data = call(async_views.create_user, request)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', data)
+
+    def test_create_token(self):
+        """Un jeton est retourné pour des identifiants valides."""
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123')
+        request = self.factory.post(
+            '/api/user/token/',
+            {'email': 'test@example.com', 'password': 'testpass123'},
+            content_type='application/json',
+        )
+
+        res, data = call(async_views.create_token, request)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(data['token'], AuthToken.objects.get(user=user).key)
+
+    def test_pool_queries_counted_by_performance_timings(self):
+        """
+        Les requêtes SQL des threads du pool sont comptées pour la requête.
+        """
+        timings = metrics.RequestTimings()
+        reset = metrics.current_timings.set(timings)
+        self.addCleanup(metrics.current_timings.reset, reset)
+        payload = {'email': 'test@example.com', 'password': 'testpass123'}
+
+        call(async_views.create_user,
+             self.factory.post('/api/user/create/', payload))
+
+        self.assertGreater(timings.db_queries, 0)
+
+    def test_me_requires_authentication(self):
+        """L'accès à /me/ sans jeton est refusé."""
+        res, data = call(
+            async_views.manage_user, self.factory.get('/api/user/me/'))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+    def test_me_retrieve_and_update(self):
+        """L'utilisateur authentifié peut lire puis modifier son profil."""
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123', name='Test Name',
+        )
+        key = AuthToken.objects.create_for_user(user).key
+        auth = {'HTTP_AUTHORIZATION': 'Token ' + key}
+
+        res, data = call(
+            async_views.manage_user, self.factory.get('/api/user/me/', **auth))
+        self.assertEqual(
+            data, {'email': 'test@example.com', 'name': 'Test Name'})
+
+        # Le jeton est désormais dans le cache local : aucune requête SQL
+        with self.assertNumQueries(0):
+            call(async_views.manage_user,
+                 self.factory.get('/api/user/me/', **auth))
+
+        request = self.factory.patch(
+            '/api/user/me/', 'name=Updated',
+            content_type='application/x-www-form-urlencoded', **auth,
+        )
+        res, data = call(async_views.manage_user, request)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertEqual(user.name, 'Updated')
+
+    def test_me_post_not_allowed(self):
+        """POST n'est pas autorisé sur /me/."""
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123')
+        key = AuthToken.objects.create_for_user(user).key
+        auth = {'HTTP_AUTHORIZATION': 'Token ' + key}
+
+        res, data = call(
+            async_views.manage_user,
+            self.factory.post('/api/user/me/', {}, **auth),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_options_like_drf(self):
+        """
+        OPTIONS retourne les métadonnées de la vue DRF équivalente, pas 405.
+        """
+        request = self.factory.options('/api/user/create/')
+
+        res = async_to_sync(async_views.create_user)(request)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(res.content)['name'], 'Create User')
+        self.assertIn('POST', res['Allow'])
+
+    def test_sync_calls_run_in_parallel(self):
+        """
+        Les appels synchrones de requêtes simultanées ne sont pas exécutés un à
+        un.
+        """
+        async def two_requests():
+            await asyncio.gather(
+                async_views._run(time.sleep, 0.3),
+                async_views._run(time.sleep, 0.3),
+            )
+
+        start = time.monotonic()
+        async_to_sync(two_requests)()
+
+        self.assertLess(time.monotonic() - start, 0.55)
@@ -0,0 +1,323 @@
+"""
+Tests de l'authentification par jeton avec cache.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db.models.query import QuerySet
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from edcp_apirest.cache import LRUCache
+from edcp_apirest.db import routers
+from edcp_apirest.models import AuthToken
+from user.authentication import TokenCache, token_cache
+
+
+ME_URL = reverse('user:me')
+
+
+def lagging_replica(test):
+    """
+    Route les lectures vers un réplica 'replica_0' qui n'a encore aucune
+    ligne : les lectures qui ne visent pas explicitement la base principale
+    échouent par DoesNotExist.
+    """
+    real_get = QuerySet.get
+
+    def replica_get(queryset, *args, **kwargs):
+        if queryset.db != 'default':
+            raise queryset.model.DoesNotExist
+        return real_get(queryset, *args, **kwargs)
+
+    replicas = override_settings(DATABASE_REPLICAS=['replica_0'])
+    replicas.enable()
+    test.addCleanup(replicas.disable)
+    for patcher in (
+        # Hors transaction du test, les lectures ne sont pas épinglées sur la
+        # base principale
+        patch.object(routers, 'is_pinned', return_value=False),
+        patch.object(QuerySet, 'get', replica_get),
+    ):
+        patcher.start()
+        test.addCleanup(patcher.stop)
+    test.addCleanup(routers.reset)
+
+
+class LRUCacheTests(TestCase):
+    """Tests du cache LRU en mémoire."""
+
+    def test_evicts_least_recently_used(self):
+        """
+        La plus ancienne entrée est évincée quand la taille maximale est
+        atteinte.
+        """
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_expired_entry_is_a_miss(self):
+        """Une entrée expirée n'est plus retournée."""
+        cache = LRUCache(max_size=2, ttl=0)
+        cache.set('a', 1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Tests de l'authentification par jeton avec cache sur /api/user/me/."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Test Name',
+        )
+        self.token = AuthToken.objects.create_for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def test_second_request_skips_token_query(self):
+        """La seconde requête est servie depuis le cache sans requête SQL."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+        self.assertEqual(token_cache.stats()['local_hits'], 1)
+
+    def test_deleted_token_is_invalidated(self):
+        """Un jeton supprimé n'est plus accepté même s'il était en cache."""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_update_is_invalidated(self):
+        """
+        Une modification de l'utilisateur est visible à la requête suivante.
+        """
+        self.client.get(ME_URL)
+        self.user.name = 'Nouveau nom'
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'Nouveau nom')
+
+    def test_inactive_user_rejected(self):
+        """Un utilisateur désactivé est refusé."""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stale_snapshot_not_written_back(self):
+        """
+        Une modification part de la ligne en base, pas de la capture périmée du
+        cache.
+        """
+        self.client.get(ME_URL)
+        # Modification sans signal (autre processus, UPDATE direct) : le cache
+        # n'en sait rien
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            name='Nom en base')
+
+        res = self.client.patch(ME_URL, {'password': 'newpassword123'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Nom en base')
+        self.assertTrue(self.user.check_password('newpassword123'))
+
+    def test_stale_snapshot_of_inactive_user_cannot_write(self):
+        """Un compte désactivé hors signal ne peut plus modifier son profil."""
+        self.client.get(ME_URL)
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False)
+
+        res = self.client.patch(ME_URL, {'name': 'Autre nom'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.user.name, 'Test Name')
+
+    def test_new_token_read_from_primary_on_replica_miss(self):
+        """
+        Un jeton absent du réplica (retard de réplication) est relu sur la base
+        principale.
+        """
+        token_cache.clear()
+        lagging_replica(self)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class SharedTokenCacheTests(TestCase):
+    """
+    Tests de l'invalidation entre processus par la version de l'utilisateur.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123')
+        self.token = AuthToken.objects.select_related('user').get(
+            key=AuthToken.objects.create_for_user(self.user).key,
+        )
+
+    def test_invalidation_reaches_other_processes(self):
+        """
+        Une invalidation dans un processus rejette l'entrée locale des autres.
+        """
+        worker = TokenCache(alias='default')
+        other_worker = TokenCache(alias='default')
+        worker.set(self.token.key, self.token)
+        self.assertIsNotNone(other_worker.get(self.token.key))
+
+        self.assertTrue(worker.invalidate_user(self.user.pk))
+
+        self.assertIsNone(other_worker.get(self.token.key))
+        self.assertIsNone(worker.get(self.token.key))
+        # Entrée locale puis entrée partagée, toutes deux d'une version
+        # dépassée
+        self.assertEqual(other_worker.stats()['stale'], 2)
+
+    def test_local_only_requires_version_check(self):
+        """
+        Avec un cache partagé, une lecture sans entrée/sortie ne peut pas
+        valider l'entrée.
+        """
+        worker = TokenCache(alias='default')
+        worker.set(self.token.key, self.token)
+
+        self.assertIsNone(worker.get(self.token.key, local_only=True))
+        self.assertIsNotNone(worker.get(self.token.key))
+
+
+class ExpiringTokenTests(TestCase):
+    """Tests de l'expiration glissante et de la révocation des jetons."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Test Name',
+        )
+        self.token = AuthToken.objects.create_for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def _set_expires(self, expires):
+        AuthToken.objects.filter(key=self.token.key).update(expires=expires)
+
+    def test_each_login_creates_a_token(self):
+        """
+        Chaque connexion reçoit son propre jeton, avec sa date d'expiration.
+        """
+        res = self.client.post(
+            reverse('user:token'),
+            {'email': 'test@example.com', 'password': 'testpass123'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['token'], self.token.key)
+        self.assertIn('expires', res.data)
+        self.assertEqual(self.user.auth_tokens.count(), 2)
+
+    def test_expired_token_rejected(self):
+        """Un jeton expiré est refusé, même s'il est en cache."""
+        self.client.get(ME_URL)
+        self._set_expires(timezone.now() - timedelta(seconds=1))
+        token_cache.clear()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_TTL=3600, AUTH_TOKEN_REFRESH_INTERVAL=600)
+    def test_refresh_written_once_per_interval(self):
+        """
+        La prolongation n'est écrite qu'une fois par intervalle, puis servie
+        depuis le cache.
+        """
+        self._set_expires(timezone.now() + timedelta(seconds=1800))
+
+        # Lecture du jeton, UPDATE de l'expiration
+        with self.assertNumQueries(2):
+            self.client.get(ME_URL)
+        with self.assertNumQueries(0):
+            self.client.get(ME_URL)
+
+        self.token.refresh_from_db()
+        self.assertGreater(
+            self.token.expires, timezone.now() + timedelta(seconds=3500))
+
+    @override_settings(AUTH_TOKEN_TTL=3600)
+    def test_refresh_written_to_primary(self):
+        """Un jeton lu sur un réplica est prolongé sur la base principale."""
+        self.token._state.db = 'replica_0'
+
+        self.token.refresh()
+
+        self.assertEqual(
+            AuthToken.objects.get(key=self.token.key).expires,
+            self.token.expires,
+        )
+
+    def test_revoke_invalidates_cache(self):
+        """
+        La révocation en groupe supprime les jetons et les retire du cache.
+        """
+        other = AuthToken.objects.create_for_user(self.user)
+        self.client.get(ME_URL)
+
+        deleted = AuthToken.objects.filter(user=self.user).revoke(chunk_size=1)
+
+        self.assertEqual(deleted, 2)
+        self.assertFalse(AuthToken.objects.filter(key=other.key).exists())
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(DATABASE_REPLICAS=['replica_0'])
+    def test_revoke_uses_write_database(self):
+        """
+        Avec des réplicas, la révocation lit et supprime sur la base
+        d'écriture.
+        """
+        # Lectures routées vers le réplica (non configuré ici), hors
+        # transaction du test
+        unpinned = patch.object(routers, 'is_pinned', return_value=False)
+        unpinned.start()
+        self.addCleanup(unpinned.stop)
+
+        deleted = AuthToken.objects.filter(user=self.user).revoke()
+
+        self.assertEqual(deleted, 1)
+        self.assertFalse(AuthToken.objects.using('default').exists())
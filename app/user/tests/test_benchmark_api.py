@@ -0,0 +1,114 @@
+"""
+Tests de la commande benchmark_api.
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer
+from django.db import connections
+from django.test import LiveServerTestCase, SimpleTestCase
+from django.test.testcases import LiveServerThread, QuietWSGIRequestHandler
+
+from user.management.commands.benchmark_api import (
+    parse_server_timing, percentile,
+)
+
+
+class BenchmarkHelpersTests(SimpleTestCase):
+    """Tests des fonctions de calcul du benchmark."""
+
+    def test_percentile_nearest_rank(self):
+        """Le percentile est calculé par rang le plus proche."""
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_parse_server_timing(self):
+        """
+        Le nombre et la durée des requêtes SQL sont lus dans Server-Timing.
+        """
+        header = (
+            'total;dur=12.50, db;dur=3.25, db-queries;desc="2", '
+            'serializer;dur=0.10'
+        )
+
+        self.assertEqual(parse_server_timing(header), (2, 3.25))
+        self.assertEqual(parse_server_timing(None), (None, None))
+
+    def test_unreachable_server(self):
+        """Un serveur injoignable produit une erreur explicite."""
+        with self.assertRaisesMessage(CommandError, 'Serveur injoignable'):
+            call_command(
+                'benchmark_api', url='http://127.0.0.1:9', requests=1,
+                stdout=StringIO(),
+            )
+
+
+class ClosingThreadedWSGIServer(ThreadedWSGIServer):
+    """
+    Ferme les connexions à la base de chaque thread de requête (CONN_MAX_AGE
+    les garderait ouvertes).
+    """
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            connections.close_all()
+
+
+class ClosingLiveServerThread(LiveServerThread):
+    """Serveur de test dont les threads de requête ferment leurs connexions."""
+
+    def _create_server(self):
+        return ClosingThreadedWSGIServer(
+            (self.host, self.port), QuietWSGIRequestHandler,
+            allow_reuse_address=False,
+        )
+
+
+class BenchmarkApiTests(LiveServerTestCase):
+    """Tests de la commande contre un serveur de test."""
+
+    server_thread_class = ClosingLiveServerThread
+
+    def test_benchmark_writes_and_compares_results(self):
+        """
+        Les résultats sont enregistrés en JSON puis comparés à une exécution
+        précédente.
+        """
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        output = os.path.join(tmpdir.name, 'bench.json')
+        options = {
+            'url': self.live_server_url, 'requests': 3, 'concurrency': 2,
+            'warmup': 0,
+        }
+
+        call_command(
+            'benchmark_api', output=output, stdout=StringIO(), **options)
+        out = StringIO()
+        call_command(
+            'benchmark_api', compare=output, scenarios=['me'], cleanup=True,
+            stdout=out, **options,
+        )
+
+        with open(output, encoding='utf-8') as stream:
+            results = json.load(stream)
+        self.assertEqual(set(results['scenarios']), {'create', 'token', 'me'})
+        for stats in results['scenarios'].values():
+            self.assertEqual(stats['errors'], 0)
+            latency = stats['latency_ms']
+            self.assertLessEqual(latency['p50'], latency['p99'])
+        self.assertEqual(results['scenarios']['create']['db_queries_mean'], 2)
+        self.assertIn('vs référence', out.getvalue())
+        # --cleanup supprime les utilisateurs de la seconde exécution
+        bench_users = get_user_model().objects.filter(name='Bench')
+        self.assertEqual(bench_users.count(), 1 + 3)
@@ -0,0 +1,224 @@
+"""
+Tests de la création d'utilisateurs par lots.
+"""
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+
+from edcp_apirest import hashing, ratelimit
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+
+BULK_CREATE_URL = reverse('user:bulk-create')
+
+
+class BulkCreateUserApiTests(TestCase):
+    """Tests de l'API de création par lots."""
+
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user(
+            email='staff@example.com', password='testpass123', is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+
+    def test_bulk_create_success(self):
+        """Tous les utilisateurs valides sont créés avec peu de requêtes."""
+        payload = [
+            {
+                'email': f'user{i}@example.com', 'password': 'testpass123',
+                'name': f'User {i}',
+            }
+            for i in range(20)
+        ]
+
+        # Vérification d'unicité + insertion groupée, indépendamment du nombre
+        # d'éléments
+        with self.assertNumQueries(4):
+            res = self.client.post(BULK_CREATE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 20)
+        self.assertEqual(res.data[0], {
+            'status': status.HTTP_201_CREATED,
+            'data': {'email': 'user0@example.com', 'name': 'User 0'},
+        })
+        user = get_user_model().objects.get(email='user5@example.com')
+        self.assertTrue(user.check_password('testpass123'))
+
+    def test_bulk_create_partial_errors(self):
+        """
+        Les éléments invalides ou en double sont signalés individuellement.
+        """
+        get_user_model().objects.create_user(
+            email='existing@example.com', password='testpass123')
+        payload = [
+            {'email': email, 'password': 'testpass123', 'name': name}
+            for email, name in [
+                ('new@example.com', 'New'),
+                ('Existing@example.com', 'Existing'),
+                ('invalid_email', 'Invalid'),
+                ('NEW@EXAMPLE.com', 'Duplicate'),
+            ]
+        ]
+
+        res = self.client.post(BULK_CREATE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(
+            [item['status'] for item in res.data],
+            [status.HTTP_201_CREATED] + [status.HTTP_400_BAD_REQUEST] * 3,
+        )
+        self.assertIn('email', res.data[1]['errors'])
+        self.assertEqual(get_user_model().objects.count(), 3)
+
+    def test_bulk_create_requires_list(self):
+        """Une requête qui n'est pas une liste est rejetée."""
+        res = self.client.post(
+            BULK_CREATE_URL, {'email': 'test@example.com'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BULK_CREATE_MAX_ITEMS=2)
+    def test_bulk_create_limit(self):
+        """Un lot trop grand est rejeté sans rien créer."""
+        payload = [
+            {
+                'email': f'user{i}@example.com', 'password': 'testpass123',
+                'name': 'User',
+            }
+            for i in range(3)
+        ]
+
+        res = self.client.post(BULK_CREATE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(
+            get_user_model().objects.exclude(pk=self.staff.pk).exists())
+
+    def test_bulk_create_hashes_batch_in_one_call(self):
+        """
+        Les mots de passe du lot sont hachés en un seul appel (réparti sur le
+        pool s'il existe).
+        """
+        payload = [
+            {
+                'email': f'user{i}@example.com', 'password': f'testpass{i}',
+                'name': 'User',
+            }
+            for i in range(3)
+        ]
+
+        with patch(
+            'user.serializers.hashing.make_passwords',
+            wraps=hashing.make_passwords,
+        ) as patched:
+            self.client.post(BULK_CREATE_URL, payload, format='json')
+
+        patched.assert_called_once_with(
+            ['testpass0', 'testpass1', 'testpass2'])
+
+
+class BulkCreatePermissionTests(TestCase):
+    """Tests de l'accès à la création par lots."""
+
+    payload = [
+        {'email': 'new@example.com', 'password': 'testpass123', 'name': 'New'},
+    ]
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123')
+        self.client = APIClient()
+
+    def _staff(self):
+        """Crée un membre du personnel."""
+        return get_user_model().objects.create_user(
+            email='staff@example.com', password='testpass123', is_staff=True,
+        )
+
+    def test_anonymous_rejected(self):
+        """Sans authentification, la requête est refusée sans rien créer."""
+        res = self.client.post(BULK_CREATE_URL, self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(
+            get_user_model().objects.filter(email='new@example.com').exists())
+
+    def test_regular_user_forbidden(self):
+        """Un utilisateur sans la permission add_user est refusé."""
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.post(BULK_CREATE_URL, self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_partner_with_permission_allowed(self):
+        """
+        Un partenaire qui a la permission add_user peut créer des utilisateurs.
+        """
+        self.user.user_permissions.add(
+            Permission.objects.get(codename='add_user'))
+        self.client.force_authenticate(
+            user=get_user_model().objects.get(pk=self.user.pk))
+
+        res = self.client.post(BULK_CREATE_URL, self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(
+        THROTTLE_ENABLED=True,
+        REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': {'bulk_create': '1/hour'}},
+    )
+    def test_throttled_per_user(self):
+        """
+        Au-delà du débit par utilisateur, la requête est refusée avant tout
+        hachage.
+        """
+        ratelimit.clear()
+        self.addCleanup(ratelimit.clear)
+        self.client.force_authenticate(user=self._staff())
+        self.client.post(BULK_CREATE_URL, self.payload, format='json')
+
+        with patch('user.serializers.hashing.make_passwords') as patched:
+            res = self.client.post(
+                BULK_CREATE_URL, [{'email': 'other@example.com'}],
+                format='json',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        patched.assert_not_called()
+
+    @override_settings(
+        THROTTLE_ENABLED=True, THROTTLE_CACHE_ALIAS='throttle',
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'throttle': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'bulk-create-throttle',
+            },
+        },
+        REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': {'bulk_create': '1/hour'}},
+    )
+    def test_throttled_with_shared_counters(self):
+        """
+        Avec des compteurs partagés, la limite par utilisateur s'applique.
+        """
+        ratelimit.clear()
+        self.addCleanup(ratelimit.clear)
+        self.client.force_authenticate(user=self._staff())
+
+        res = self.client.post(BULK_CREATE_URL, self.payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = self.client.post(
+            BULK_CREATE_URL, [{'email': 'other@example.com'}], format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,129 @@
+"""
+Tests des requêtes conditionnelles sur /api/user/me/.
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from edcp_apirest.models import AuthToken
+from user.authentication import token_cache
+
+
+ME_URL = reverse('user:me')
+
+
+class ConditionalManageUserTests(TestCase):
+    """Tests ETag / Last-Modified / If-Match sur le profil."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Test Name',
+        )
+        # Authentification réelle par jeton : l'utilisateur vient du cache de
+        # jetons
+        token_cache.clear()
+        self.client = APIClient()
+        token = AuthToken.objects.create_for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def test_get_returns_validators(self):
+        """La réponse GET contient ETag et Last-Modified."""
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', res)
+        self.assertIn('private', res['Cache-Control'])
+
+    def test_unchanged_profile_returns_304(self):
+        """Un profil inchangé retourne 304 sans corps."""
+        etag = self.client.get(ME_URL)['ETag']
+
+        res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+        self.assertEqual(res['ETag'], etag)
+
+    def test_changed_profile_returns_200(self):
+        """Après une modification, l'ancien ETag ne correspond plus."""
+        etag = self.client.get(ME_URL)['ETag']
+        self.client.patch(ME_URL, {'name': 'Updated name'})
+
+        res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'Updated name')
+
+    def test_patch_with_matching_if_match(self):
+        """
+        PATCH avec le bon If-Match est appliqué et retourne le nouvel ETag.
+        """
+        etag = self.client.get(ME_URL)['ETag']
+
+        res = self.client.patch(
+            ME_URL, {'name': 'Updated name'}, HTTP_IF_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_patch_with_stale_if_match_returns_412(self):
+        """PATCH avec un If-Match périmé est refusé (concurrence optimiste)."""
+        res = self.client.patch(
+            ME_URL, {'name': 'Updated name'}, HTTP_IF_MATCH='"stale"')
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Test Name')
+
+    def test_if_match_compared_with_database_row(self):
+        """
+        If-Match est comparé à la ligne en base, pas à l'utilisateur en cache.
+        """
+        etag = self.client.get(ME_URL)['ETag']
+        # Modification concurrente sans signal : le cache de jetons garde
+        # l'ancienne version
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            name='Concurrent',
+            last_modified=self.user.last_modified + timedelta(seconds=1),
+        )
+
+        res = self.client.patch(
+            ME_URL, {'name': 'Updated name'}, HTTP_IF_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Concurrent')
+
+    def test_if_match_checked_on_locked_row(self):
+        """
+        La ligne est verrouillée de la comparaison à l'écriture (deux PATCH
+        simultanés).
+        """
+        etag = self.client.get(ME_URL)['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.patch(
+                ME_URL, {'name': 'Updated name'}, HTTP_IF_MATCH=etag)
+
+        locked = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].endswith('FOR UPDATE')
+        ]
+        self.assertEqual(len(locked), 1)
+
+    def test_patch_password_is_hashed(self):
+        """Le mot de passe modifié via PATCH est chiffré."""
+        self.client.patch(ME_URL, {'password': 'newpassword123'})
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpassword123'))
@@ -0,0 +1,57 @@
+"""
+Tests des sérialiseurs de l'API utilisateur.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from rest_framework.renderers import JSONRenderer
+
+from user.serializers import (
+    UserReadSerializer, UserSerializer, USER_READ_FIELDS,
+)
+
+
+class UserReadSerializerTests(TestCase):
+    """Tests du sérialiseur rapide en lecture seule."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Élodie Test',
+        )
+
+    def test_same_bytes_as_user_serializer(self):
+        """
+        La sortie JSON est identique octet par octet à celle de UserSerializer.
+        """
+        renderer = JSONRenderer()
+
+        self.assertEqual(
+            renderer.render(UserReadSerializer(self.user).data),
+            renderer.render(UserSerializer(self.user).data),
+        )
+
+    def test_values_rows(self):
+        """Les lignes values() donnent la même sortie que les instances."""
+        rows = get_user_model().objects.values(*USER_READ_FIELDS)
+
+        self.assertEqual(
+            UserReadSerializer(rows, many=True).data,
+            [UserSerializer(self.user).data],
+        )
+
+    def test_benchmark_command(self):
+        """
+        La commande de benchmark vérifie l'égalité des sorties et affiche les
+        mesures.
+        """
+        out = StringIO()
+
+        call_command(
+            'benchmark_serializers', iterations=5, list_size=3, stdout=out)
+
+        self.assertIn('liste', out.getvalue())
@@ -0,0 +1,239 @@
+"""
+Tests des jetons signés autonomes (AUTH_TOKEN_MODE = 'signed').
+"""
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from edcp_apirest.models import AuthToken
+from user import signed_tokens
+from user.authentication import token_cache, user_cache
+from user.tests.test_authentication import lagging_replica
+
+
+TOKEN_URL = reverse('user:token')
+ME_URL = reverse('user:me')
+
+# Cache de révocation partagé entre processus (fichiers), exigé en mode signé
+SHARED_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'revocations': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(
+            tempfile.gettempdir(), 'edcp-test-revocations'),
+    },
+}
+
+
+@override_settings(
+    AUTH_TOKEN_MODE='signed', SIGNED_TOKEN_KEYS=['cle-courante'],
+    CACHES=SHARED_CACHES, SIGNED_TOKEN_REVOCATION_CACHE='revocations',
+)
+class SignedTokenTests(TestCase):
+    """Tests de l'émission et de la vérification des jetons signés."""
+
+    def setUp(self):
+        token_cache.clear()
+        user_cache.clear()
+        caches['revocations'].clear()
+        self.addCleanup(caches['revocations'].clear)
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Test Name',
+        )
+        self.client = APIClient()
+
+    def _authenticate(self, key):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + key)
+
+    def test_create_token_issues_signed_token(self):
+        """La connexion délivre un jeton signé sans l'enregistrer en base."""
+        payload = {'email': 'test@example.com', 'password': 'testpass123'}
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(signed_tokens.is_signed(res.data['token']))
+        self.assertFalse(AuthToken.objects.exists())
+
+    def test_me_without_query(self):
+        """Une fois l'utilisateur en cache, /me/ ne fait aucune requête SQL."""
+        self._authenticate(signed_tokens.issue(self.user).key)
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_user_update_is_visible(self):
+        """Une modification de l'utilisateur invalide sa capture en cache."""
+        self._authenticate(signed_tokens.issue(self.user).key)
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_new_user_read_from_primary_on_replica_miss(self):
+        """
+        Un utilisateur absent du réplica (retard de réplication) est relu sur
+        la base principale.
+        """
+        self._authenticate(signed_tokens.issue(self.user).key)
+        lagging_replica(self)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_tampered_token_rejected(self):
+        """Un jeton dont le contenu a été modifié est refusé."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com', password='testpass123')
+        payload = signed_tokens.issue(self.user)
+        value, signature = payload.key.split(':')
+        self._authenticate(f'{other.pk}{value[value.index("."):]}:{signature}')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_expired_token_rejected(self):
+        """Un jeton expiré est refusé."""
+        with self.settings(AUTH_TOKEN_TTL=60):
+            expired = signed_tokens.issue(self.user, now=time.time() - 61)
+            self._authenticate(expired.key)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(str(res.data['detail']), 'Jeton expiré.')
+
+    def test_key_rotation(self):
+        """
+        Les jetons signés avec une ancienne clé restent valides tant qu'elle
+        est listée.
+        """
+        key = signed_tokens.issue(self.user).key
+        self._authenticate(key)
+
+        with self.settings(SIGNED_TOKEN_KEYS=['nouvelle-cle', 'cle-courante']):
+            res = self.client.get(ME_URL)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            new_key = signed_tokens.issue(self.user).key
+        with self.settings(SIGNED_TOKEN_KEYS=['nouvelle-cle']):
+            res = self.client.get(ME_URL)
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+            # Les nouveaux jetons sont signés avec la première clé
+            self.assertEqual(
+                signed_tokens.verify(new_key).user_id, self.user.pk)
+
+    def test_revoke_user(self):
+        """La révocation par utilisateur refuse les jetons émis auparavant."""
+        self._authenticate(signed_tokens.issue(self.user).key)
+        signed_tokens.revoke_user(self.user.pk)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_database_tokens_still_accepted(self):
+        """Les jetons de la table AuthToken restent acceptés en mode signé."""
+        self._authenticate(AuthToken.objects.create_for_user(self.user).key)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_token_issued_after_revocation_accepted(self):
+        """
+        Un jeton émis dans la même seconde, après la révocation, reste valide.
+        """
+        now = time.time()
+        signed_tokens.revoke_user(self.user.pk, now=now)
+        revoked = signed_tokens.issue(self.user, now=now - 0.001)
+        kept = signed_tokens.issue(self.user, now=now + 0.001)
+
+        revoked_state = signed_tokens.revocation_state(
+            signed_tokens.verify(revoked.key))
+        kept_state = signed_tokens.revocation_state(
+            signed_tokens.verify(kept.key))
+        self.assertTrue(revoked_state[0])
+        self.assertFalse(kept_state[0])
+
+    def test_password_change_revokes_tokens(self):
+        """Un changement de mot de passe révoque les jetons déjà émis."""
+        self._authenticate(signed_tokens.issue(self.user).key)
+        self.user.set_password('nouveau-pass123')
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(str(res.data['detail']), 'Jeton révoqué.')
+
+    def test_deactivation_revokes_tokens(self):
+        """
+        La désactivation révoque les jetons, même si l'utilisateur est réactivé
+        ensuite.
+        """
+        self._authenticate(signed_tokens.issue(self.user).key)
+        self.user.is_active = False
+        self.user.save()
+        self.user.is_active = True
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_change_keeps_tokens(self):
+        """
+        Une autre modification de l'utilisateur ne révoque pas ses jetons.
+        """
+        self._authenticate(signed_tokens.issue(self.user).key)
+        self.user.name = 'Autre nom'
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'Autre nom')
+
+    def test_update_in_other_process_rejects_cached_user(self):
+        """
+        Une modification faite dans un autre processus rejette la capture en
+        cache.
+        """
+        self._authenticate(signed_tokens.issue(self.user).key)
+        self.client.get(ME_URL)
+        # L'autre processus n'atteint que le cache partagé, pas user_cache
+        with mock.patch('user.signals.user_cache'):
+            get_user_model().objects.filter(pk=self.user.pk).update(
+                name='Autre nom')
+            self.user.refresh_from_db()
+            self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'Autre nom')
+
+    @override_settings(SIGNED_TOKEN_REVOCATION_CACHE='default')
+    def test_process_local_revocation_cache_refused(self):
+        """Un cache de révocation propre au processus est refusé."""
+        with self.assertRaises(ImproperlyConfigured):
+            signed_tokens.revoke_user(self.user.pk)
@@ -0,0 +1,128 @@
+"""
+Tests de la limitation de débit de la connexion et de l'inscription.
+"""
+import time
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.test import TestCase, RequestFactory, override_settings
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from edcp_apirest import ratelimit
+from user import async_views
+from user.tests.test_async_views import call
+
+
+TOKEN_URL = reverse('user:token')
+CREATE_USER_URL = reverse('user:create')
+
+# Identifiants de l'utilisateur créé par setUp
+LOGIN = {'email': 'test@example.com', 'password': 'testpass123'}
+
+RATES = {
+    'login_ip': '5/min',
+    'login_email': '2/min',
+    'signup_ip': '3/min',
+    'signup_email': '1/min',
+}
+
+
+@override_settings(
+    THROTTLE_ENABLED=True,
+    REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': RATES, 'NUM_PROXIES': 0},
+)
+class ThrottlingTests(TestCase):
+    """Tests des throttles par IP et par email."""
+
+    def setUp(self):
+        ratelimit.clear()
+        # Horloge figée en début de fenêtre : un test à cheval sur deux minutes
+        # verrait ses hits pondérés par la fenêtre glissante
+        clock = patch.object(ratelimit, 'time')
+        clock.start().time.return_value = time.time() // 3600 * 3600 + 1
+        self.addCleanup(clock.stop)
+        get_user_model().objects.create_user(**LOGIN)
+        self.client = APIClient()
+
+    def test_login_throttled_per_email_before_hashing(self):
+        """
+        Au-delà du débit par email, la requête est refusée sans authenticate().
+        """
+        payload = {'email': 'Test@example.com', 'password': 'wrong'}
+        for _ in range(2):
+            self.client.post(TOKEN_URL, payload)
+
+        with patch('user.serializers.authenticate') as patched_authenticate, \
+                self.assertNumQueries(0):
+            res = self.client.post(
+                TOKEN_URL, {**payload, 'email': 'test@EXAMPLE.com'})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+        patched_authenticate.assert_not_called()
+
+    def test_login_throttled_per_ip(self):
+        """Au-delà du débit par IP, toutes les adresses email sont refusées."""
+        for index in range(5):
+            self.client.post(
+                TOKEN_URL,
+                {'email': f'user{index}@example.com', 'password': 'wrong'},
+            )
+
+        res = self.client.post(TOKEN_URL, LOGIN)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for_header_ignored(self):
+        """
+        Sans proxy de confiance, un X-Forwarded-For falsifié ne contourne pas
+        la limite par IP.
+        """
+        for index in range(5):
+            self.client.post(
+                TOKEN_URL,
+                {'email': f'user{index}@example.com', 'password': 'wrong'},
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{index}',
+            )
+
+        res = self.client.post(
+            TOKEN_URL, LOGIN, HTTP_X_FORWARDED_FOR='10.0.0.9')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_signup_throttled(self):
+        """L'inscription est limitée par email et par IP."""
+        payload = {
+            'email': 'new@example.com', 'password': 'testpass123',
+            'name': 'New',
+        }
+        self.client.post(CREATE_USER_URL, payload)
+
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_async_login_throttled(self):
+        """Les vues asynchrones appliquent les mêmes débits."""
+        self.addCleanup(async_views.shutdown_executor)
+        factory = RequestFactory()
+        for _ in range(3):
+            request = factory.post(
+                TOKEN_URL, {'email': 'test@example.com', 'password': 'wrong'},
+                content_type='application/json',
+            )
+            res, data = call(async_views.create_token, request)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_disabled(self):
+        """THROTTLE_ENABLED=False désactive la limitation."""
+        for _ in range(3):
+            res = self.client.post(TOKEN_URL, LOGIN)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -11,6 +11,9 @@ from rest_framework import status  # Importe les constantes de statut HTTP
 
 from rest_framework.authtoken.models import Token  # Assurez-vous d'importer Token correctement
 
+# Budgets de requêtes SQL
+from edcp_apirest.testing import QueryBudgetTestMixin
+
 
 # URL pour créer un utilisateur
 CREATE_USER_URL = reverse('user:create')
@@ -26,7 +29,7 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class PublicUserApiTests(TestCase):
+class PublicUserApiTests(QueryBudgetTestMixin, TestCase):
     """ Tests publics de l'API utilisateur. """
 
     def setUp(self):
@@ -50,7 +53,9 @@ class PublicUserApiTests(TestCase):
             'is_staff': False,  # Valeur pour le champ 'is_staff'
         }
 
-        res = self.client.post(CREATE_USER_URL, payload)  # Envoie une requête POST pour créer un utilisateur
+        with self.assertQueryBudget(2):
+            # Envoie une requête POST pour créer un utilisateur
+            res = self.client.post(CREATE_USER_URL, payload)
 
         # Vérifie si la création de l'utilisateur a renvoyé le statut HTTP 201 (Créé)
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
@@ -72,11 +77,28 @@ class PublicUserApiTests(TestCase):
             'name': 'Test Name',  # Nom de test
         }
         create_user(**payload)  # Crée un utilisateur avec l'email de test
-        res = self.client.post(CREATE_USER_URL, payload)  # Envoie une requête POST pour créer un utilisateur
+        with self.assertQueryBudget(1):
+            # Envoie une requête POST pour créer un utilisateur
+            res = self.client.post(CREATE_USER_URL, payload)
 
         # Vérifie si la création de l'utilisateur a renvoyé le statut HTTP 400 (Mauvaise requête)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_user_with_email_exists_other_case_error(self):
+        """
+        Un email qui ne diffère que par la casse est considéré comme existant.
+        """
+        create_user(email='test@example.com', password='testpass123')
+        payload = {
+            'email': 'TEST@example.com', 'password': 'testpass123',
+            'name': 'Test Name',
+        }
+
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', res.data)
+
     def test_password_too_short_error(self):
         """ Test la création d'un utilisateur avec un e-mail invalide """
         payload = {
@@ -84,7 +106,9 @@ class PublicUserApiTests(TestCase):
             'password': 'testpass123',  # Mot de passe de test
             'name': 'Test Name',  # Nom de test
         }
-        res = self.client.post(CREATE_USER_URL, payload)  # Envoie une requête POST pour créer un utilisateur
+        with self.assertQueryBudget(1):
+            # Envoie une requête POST pour créer un utilisateur
+            res = self.client.post(CREATE_USER_URL, payload)
 
         # Vérifie si la création de l'utilisateur a renvoyé le statut HTTP 400 (Mauvaise requête)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -115,13 +139,24 @@ class PublicUserApiTests(TestCase):
             'password': user_details['password'],  # Mot de passe de l'utilisateur
         }
         # Envoie une requête POST pour créer le TOKEN
-        res = self.client.post(TOKEN_URL, payload)
+        # (utilisateur, jeton ; last_login est mis en tampon)
+        with self.assertQueryBudget(2):
+            res = self.client.post(TOKEN_URL, payload)
 
         # Vérifie la présence du token dans les données de réponse
         self.assertIn('token', res.data)
         # Vérifie le code de statut de la réponse
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_create_token_email_other_case(self):
+        """Le token est délivré quelle que soit la casse de l'email."""
+        create_user(email='Test@example.com', password='testpass123')
+
+        payload = {'email': 'test@EXAMPLE.com', 'password': 'testpass123'}
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', res.data)
 
     def test_create_token_bad_credentials(self):
         """Teste le retour d'erreur si les identifiants sont invalides."""
@@ -130,7 +165,8 @@ class PublicUserApiTests(TestCase):
 
         # Prépare les données avec des identifiants incorrects
         payload = {'email': 'test@example.com', 'password': 'badpass'}
-        res = self.client.post(TOKEN_URL, payload)
+        with self.assertQueryBudget(1):
+            res = self.client.post(TOKEN_URL, payload)
 
         # Vérifie que le token n'est pas dans la réponse et que le statut de la requête est HTTP 400 (Bad Request)
         self.assertNotIn('token', res.data)
@@ -140,7 +176,8 @@ class PublicUserApiTests(TestCase):
         """Teste le retour d'erreur si aucun utilisateur n'est trouvé pour l'e-mail donné."""
         # Prépare les données avec un e-mail qui n'est pas associé à un utilisateur existant
         payload = {'email': 'test@example.com', 'password': 'pass123'}
-        res = self.client.post(TOKEN_URL, payload)
+        with self.assertQueryBudget(1):
+            res = self.client.post(TOKEN_URL, payload)
 
         # Vérifie que le token n'est pas dans la réponse et que le statut de la requête est HTTP 400 (Bad Request)
         self.assertNotIn('token', res.data)
@@ -150,7 +187,8 @@ class PublicUserApiTests(TestCase):
         """Teste le retour d'erreur si un mot de passe vide est fourni."""
         # Prépare les données avec un mot de passe vide
         payload = {'email': 'test@example.com', 'password': ''}
-        res = self.client.post(TOKEN_URL, payload)
+        with self.assertQueryBudget(0):
+            res = self.client.post(TOKEN_URL, payload)
 
         # Vérifie que le token n'est pas dans la réponse et que le statut de la requête est HTTP 400 (Bad Request)
         self.assertNotIn('token', res.data)#
@@ -160,14 +198,15 @@ class PublicUserApiTests(TestCase):
     def test_retrieve_user_unauthorized(self):
         """ Tester l'authorisation requi pour l'utilisateur  """
 
-        res = self.client.get(ME_URL)
+        with self.assertQueryBudget(0):
+            res = self.client.get(ME_URL)
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class  PrivateUserApiTests():
+class PrivateUserApiTests(QueryBudgetTestMixin, TestCase):
     """ Tester le systeme d'hautentification pour chaque requete """
 
-    def seuUp(self):
+    def setUp(self):
         """ les parametres initial des tests """
 
         self.user = create_user(
@@ -180,7 +219,8 @@ class  PrivateUserApiTests():
 
     def test_retrieve_profile_success(self):
         """Test retrieving profile for logged in user."""
-        res = self.client.get(ME_URL)
+        with self.assertQueryBudget(0):
+            res = self.client.get(ME_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, {
@@ -190,7 +230,8 @@ class  PrivateUserApiTests():
 
     def test_post_me_not_allowed(self):
         """Test POST is not allowed for the me endpoint."""
-        res = self.client.post(ME_URL, {})
+        with self.assertQueryBudget(0):
+            res = self.client.post(ME_URL, {})
 
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -198,7 +239,10 @@ class  PrivateUserApiTests():
         """Test updating the user profile for the authenticated user."""
         payload = {'name': 'Updated name', 'password': 'newpassword123'}
 
-        res = self.client.patch(ME_URL, payload)
+        # Relecture de l'utilisateur sur la base d'écriture, UPDATE,
+        # invalidation des jetons
+        with self.assertQueryBudget(3):
+            res = self.client.patch(ME_URL, payload)
 
         self.user.refresh_from_db()
         self.assertEqual(self.user.name, payload['name'])
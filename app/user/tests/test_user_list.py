@@ -0,0 +1,121 @@
+"""
+Tests de la liste paginée des utilisateurs.
+"""
+from django.urls import reverse
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+
+LIST_URL = reverse('user:list')
+
+
+def create_user(**params):
+    """Crée et retourne un nouvel utilisateur."""
+    return get_user_model().objects.create_user(**params)
+
+
+class PublicUserListTests(TestCase):
+    """Tests de la liste sans authentification."""
+
+    def test_auth_required(self):
+        """L'authentification est requise."""
+        res = APIClient().get(LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class UserListTests(TestCase):
+    """Tests de la liste pour le personnel."""
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            'admin@example.com', 'testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def emails(self, res):
+        return [item['email'] for item in res.data['results']]
+
+    def test_non_staff_forbidden(self):
+        """Un utilisateur ordinaire ne peut pas lister les utilisateurs."""
+        user = create_user(email='user@example.com', password='testpass123')
+        self.client.force_authenticate(user=user)
+
+        res = self.client.get(LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cursor_pagination_walks_all_users(self):
+        """
+        Le curseur parcourt tous les utilisateurs dans l'ordre des id, sans
+        doublon.
+        """
+        for i in range(5):
+            create_user(
+                email=f'user{i}@example.com', password='testpass123',
+                name=f'User {i}',
+            )
+
+        seen = []
+        url = f'{LIST_URL}?page_size=2'
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', res.data)
+            seen.extend(self.emails(res))
+            url = res.data['next']
+
+        self.assertEqual(
+            seen,
+            ['admin@example.com'] + [f'user{i}@example.com' for i in range(5)],
+        )
+
+    def test_page_query_count_is_constant(self):
+        """Une page ne coûte qu'une requête SQL, sans COUNT(*)."""
+        for i in range(3):
+            create_user(email=f'user{i}@example.com', password='testpass123')
+
+        with self.assertNumQueries(1):
+            res = self.client.get(f'{LIST_URL}?page_size=2')
+
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertEqual(set(res.data['results'][0]), {'email', 'name'})
+
+    def test_filter_booleans(self):
+        """Les filtres is_active et is_staff sont appliqués."""
+        create_user(email='active@example.com', password='testpass123')
+        inactive = create_user(
+            email='inactive@example.com', password='testpass123')
+        inactive.is_active = False
+        inactive.save()
+
+        res = self.client.get(LIST_URL, {'is_active': 'false'})
+        self.assertEqual(self.emails(res), ['inactive@example.com'])
+
+        res = self.client.get(LIST_URL, {'is_staff': 'true'})
+        self.assertEqual(self.emails(res), ['admin@example.com'])
+
+    def test_invalid_boolean_rejected(self):
+        """Une valeur booléenne invalide retourne 400."""
+        res = self.client.get(LIST_URL, {'is_active': 'maybe'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('is_active', res.data)
+
+    def test_filter_prefixes_case_insensitive(self):
+        """Les préfixes email et name ignorent la casse."""
+        create_user(
+            email='Alice@example.com', password='testpass123',
+            name='Alice Martin',
+        )
+        create_user(
+            email='bob@example.com', password='testpass123', name='Bob Alain')
+
+        res = self.client.get(LIST_URL, {'email': 'ALI'})
+        self.assertEqual(self.emails(res), ['Alice@example.com'])
+
+        res = self.client.get(LIST_URL, {'name': 'bob'})
+        self.assertEqual(self.emails(res), ['bob@example.com'])
@@ -0,0 +1,124 @@
+"""
+Limitation de débit des vues de connexion et d'inscription.
+
+Les throttles DRF sont vérifiés dans `APIView.initial()`, avant le
+sérialiseur : une requête refusée ne déclenche aucun hachage de mot de passe.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from edcp_apirest.ratelimit import get_counter
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Throttle à fenêtre glissante (edcp_apirest.ratelimit) dont le débit est lu
+    dans REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope]. Désactivé si
+    THROTTLE_ENABLED est faux.
+    """
+
+    def get_rate(self):
+        # Débits relus à chaque instanciation (THROTTLE_RATES est figé à
+        # l'import de SimpleRateThrottle)
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f"No default throttle rate set for '{self.scope}' scope")
+
+    def get_key(self, request, data):
+        """
+        Retourne la clé limitée (IP, email...) ou None pour ne pas limiter la
+        requête.
+        """
+        raise NotImplementedError('.get_key() must be overridden')
+
+    def check(self, request, data):
+        """
+        Compte la requête ; retourne None si elle est permise, sinon le délai
+        d'attente en secondes.
+        """
+        self._wait = None
+        if not settings.THROTTLE_ENABLED or self.rate is None:
+            return None
+        key = self.get_key(request, data)
+        if key is None:
+            return None
+        counter = get_counter(self.scope, self.num_requests, self.duration)
+        self._wait = counter.hit(key)
+        return self._wait
+
+    def allow_request(self, request, view):
+        return self.check(request, request.data) is None
+
+    def wait(self):
+        return self._wait
+
+
+class IPRateThrottle(SlidingWindowThrottle):
+    """
+    Limite par adresse IP du client : REMOTE_ADDR, ou X-Forwarded-For selon
+    REST_FRAMEWORK['NUM_PROXIES'] (0 par défaut, l'en-tête du client est alors
+    ignoré).
+    """
+
+    def get_key(self, request, data):
+        return self.get_ident(request)
+
+
+class EmailRateThrottle(SlidingWindowThrottle):
+    """
+    Limite par email soumis (insensible à la casse), quelle que soit l'IP.
+    """
+
+    def get_key(self, request, data):
+        email = data.get('email') if hasattr(data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            # Requête invalide : rejetée par le sérialiseur sans hachage
+            return None
+        return email.strip().lower()[:254]
+
+
+class LoginIPThrottle(IPRateThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailRateThrottle):
+    scope = 'login_email'
+
+
+class SignupIPThrottle(IPRateThrottle):
+    scope = 'signup_ip'
+
+
+class SignupEmailThrottle(EmailRateThrottle):
+    scope = 'signup_email'
+
+
+class BulkCreateThrottle(SlidingWindowThrottle):
+    """Limite la création par lots par utilisateur authentifié."""
+
+    scope = 'bulk_create'
+
+    def get_key(self, request, data):
+        # Clé textuelle : le compteur partagé la hache (ratelimit._hit_shared)
+        if request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return self.get_ident(request)
+
+
+def check_throttles(throttle_classes, request, data):
+    """
+    Vérifie les throttles hors DRF (vues asynchrones) ; retourne None ou le
+    plus long délai.
+    """
+    waits = [
+        wait for wait in (
+            throttle().check(request, data) for throttle in throttle_classes
+        )
+        if wait is not None
+    ]
+    return max(waits) if waits else None
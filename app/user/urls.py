@@ -1,18 +1,36 @@
 # Importation des modules nécessaires
+from django.conf import settings
 from django.urls import path
 
 # Importation des vues de l'utilisateur
-from user import views
+from user import async_views, views
 
 
 # Nom de l'application
 app_name = 'user'
 
+# Vues asynchrones (ASGI) ou vues DRF synchrones selon les settings
+if settings.USER_API_ASYNC:
+    create_view = async_views.create_user
+    token_view = async_views.create_token
+    me_view = async_views.manage_user
+else:
+    create_view = views.CreateUserView.as_view()
+    token_view = views.CreateTokenView.as_view()
+    me_view = views.ManageUserView.as_view()
+
 # Définition des URL
 urlpatterns = [
+    # URL pour lister les utilisateurs (personnel uniquement)
+    path('', views.UserListView.as_view(), name='list'),
     # URL pour créer un nouvel utilisateur
-    path('create/', views.CreateUserView.as_view(), name='create'),
-    path('token/', views.CreateTokenView.as_view(), name='token'),
-    path('me/', views.ManageUserView.as_view(), name='me'),
+    path('create/', create_view, name='create'),
+    # URL pour créer des utilisateurs par lots
+    path(
+        'bulk-create/', views.BulkCreateUserView.as_view(),
+        name='bulk-create',
+    ),
+    path('token/', token_view, name='token'),
+    path('me/', me_view, name='me'),
 
 ]
@@ -1,16 +1,38 @@
 """
 Vue pour l'utilisateur API.
 """
+# Importations nécessaires depuis Django
+from django.contrib.auth import get_user_model
+from django.db import router, transaction
+from django.db.models.functions import Lower
+from django.utils.translation import gettext as _
 # Importations nécessaires depuis le framework Django REST
-from rest_framework import generics, authentication, permissions
-# Importation du sérialiseur d'utilisateur
-from user.serializers import UserSerializer
+from rest_framework import generics, permissions, serializers, status
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+# Importation des sérialiseurs d'utilisateur
+from user.serializers import (
+    USER_READ_FIELDS, UserSerializer, UserReadSerializer,
+)
 # Importation de la vue pour obtenir le jeton d'authentification
-from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 # Importation du sérialiseur de jeton d'authentification
 from user.serializers import AuthTokenSerializer
 # Importation des paramètres par défaut du framework REST
 from rest_framework.settings import api_settings
+# Importation de l'authentification par jeton avec cache
+from user.authentication import (
+    CachedTokenAuthentication, fresh_user, issue_token,
+)
+# Importation de la limitation de débit des connexions et inscriptions
+from user.throttling import (
+    BulkCreateThrottle, LoginEmailThrottle, LoginIPThrottle,
+    SignupEmailThrottle, SignupIPThrottle,
+)
+# Importation de la permission de création par lots
+from user.permissions import CanBulkCreateUsers
+# Importation des requêtes conditionnelles (ETag / Last-Modified)
+from user import conditional
 
 # Utilisation du sérialiseur de jeton d'authentification
 serializer_class = AuthTokenSerializer
@@ -21,21 +43,223 @@ renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 class CreateUserView(generics.CreateAPIView):
     """Crée un nouvel utilisateur dans le système."""
     serializer_class = UserSerializer
+    # Limitation de débit avant la validation (et donc avant le hachage du mot
+    # de passe)
+    throttle_classes = [SignupIPThrottle, SignupEmailThrottle]
+    # Budget de requêtes SQL vérifié par les tests (unicité de l'email, INSERT)
+    query_budget = {'POST': 2}
+
+
+# Vue pour créer des utilisateurs par lots
+class BulkCreateUserView(generics.GenericAPIView):
+    """
+    Crée plusieurs utilisateurs en une requête et retourne un statut par
+    élément.
+    """
+    serializer_class = UserSerializer
+    # Jusqu'à BULK_CREATE_MAX_ITEMS hachages par requête : personnel et
+    # partenaires seulement, avec un débit limité par utilisateur
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [CanBulkCreateUsers]
+    throttle_classes = [BulkCreateThrottle]
+    # Budget de requêtes SQL vérifié par les tests : jeton, prolongation du
+    # jeton, permissions d'un partenaire (hors cache des permissions), unicité
+    # des emails et INSERT groupé, quelle que soit la taille du lot (jusqu'à
+    # BULK_CREATE_BATCH_SIZE éléments)
+    query_budget = {'POST': 6}
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        users = serializer.save()
+
+        # Un statut par élément, dans l'ordre de la requête
+        results = [None] * (
+            len(serializer.created_indexes) + len(serializer.item_errors))
+        for index, user in zip(serializer.created_indexes, users):
+            results[index] = {
+                'status': status.HTTP_201_CREATED,
+                'data': serializer.child.to_representation(user),
+            }
+        for index, errors in serializer.item_errors.items():
+            results[index] = {
+                'status': status.HTTP_400_BAD_REQUEST, 'errors': errors,
+            }
+
+        if not serializer.item_errors:
+            response_status = status.HTTP_201_CREATED
+        elif not users:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response(results, status=response_status)
+
+
+# Pagination par curseur (keyset) sur l'id des utilisateurs
+class UserCursorPagination(CursorPagination):
+    """
+    Pagination par curseur : chaque page est lue par WHERE id > <dernier id>
+    LIMIT n, sans OFFSET ni COUNT(*), donc en temps constant quelle que soit la
+    page.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+# Valeurs acceptées pour les filtres booléens
+BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+
+# Vue pour lister les utilisateurs (personnel uniquement)
+class UserListView(generics.ListAPIView):
+    """
+    Liste paginée des utilisateurs, réservée au personnel. Filtres : is_active,
+    is_staff (true/false) et préfixes email / name (insensibles à la casse).
+    """
+    serializer_class = UserReadSerializer
+    pagination_class = UserCursorPagination
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+    # Budget de requêtes SQL vérifié par les tests (jeton, prolongation du
+    # jeton, page) : pas de COUNT(*)
+    query_budget = {'GET': 3}
+
+    def get_serializer_class(self):
+        # La génération du schéma OpenAPI a besoin des champs du
+        # ModelSerializer
+        if getattr(self, 'swagger_fake_view', False):
+            return UserSerializer
+        return self.serializer_class
+
+    def get_queryset(self):
+        """
+        Applique les filtres sur des colonnes indexées et ne lit que les champs
+        exposés.
+        """
+        queryset = get_user_model().objects.all()
+        params = self.request.query_params
+
+        for field in ('is_active', 'is_staff'):
+            value = params.get(field)
+            if value is None:
+                continue
+            if value.lower() not in BOOLEAN_VALUES:
+                msg = _('Valeur attendue : true ou false.')
+                raise serializers.ValidationError({field: [msg]})
+            queryset = queryset.filter(
+                **{field: BOOLEAN_VALUES[value.lower()]})
+
+        # LOWER(<champ>) LIKE 'préfixe%' : index text_pattern_ops du modèle
+        for field in ('email', 'name'):
+            prefix = params.get(field)
+            if prefix:
+                queryset = queryset.annotate(
+                    **{f'{field}_lower': Lower(field)}
+                ).filter(**{f'{field}_lower__startswith': prefix.lower()})
+
+        # Des dictionnaires plutôt que des instances : pas d'hydratation
+        return queryset.values('id', *USER_READ_FIELDS)
+
 
 # Vue pour créer un jeton d'authentification
-class CreateTokenView(ObtainAuthToken):
+# Vue générique plutôt que rest_framework.authtoken.views.ObtainAuthToken : son
+# corps de classe charge DEFAULT_SCHEMA_CLASS, donc drf_spectacular.openapi,
+# dès l'import des URL
+class CreateTokenView(generics.GenericAPIView):
     """ serialiser les champs pour la creation du token """
     serializer_class = AuthTokenSerializer
+    permission_classes = ()
+    parser_classes = (FormParser, MultiPartParser, JSONParser)
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    # Limitation de débit avant authenticate() (et donc avant le hachage du mot
+    # de passe)
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+    # Budget de requêtes SQL vérifié par les tests : utilisateur, création du
+    # jeton (last_login est mis en tampon, sans requête)
+    query_budget = {'POST': 2}
+
+    def post(self, request, *args, **kwargs):
+        """
+        Authentifie l'utilisateur et lui délivre un nouveau jeton expirant
+        (selon AUTH_TOKEN_MODE).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        key, expires = issue_token(serializer.validated_data['user'], request)
+        return Response({'token': key, 'expires': expires})
 
 # Vue pour gérer l'utilisateur authentifié
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """ Gestion de l'authentification de l'utilisateur."""
 
     serializer_class = UserSerializer  # Définit le sérialiseur pour la vue
-    authentication_classes = [authentication.TokenAuthentication]  # Définit les classes d'authentification utilisées
+    # Définit les classes d'authentification utilisées
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]  # Définit les permissions requises pour accéder à la vue
+    # Budget de requêtes SQL vérifié par les tests : jeton (hors cache),
+    # prolongation du jeton (au plus une fois par AUTH_TOKEN_REFRESH_INTERVAL),
+    # relecture de l'utilisateur (PUT/PATCH), unicité de l'email (PUT), UPDATE,
+    # puis invalidation des jetons en cache (signal post_save)
+    query_budget = {'GET': 2, 'HEAD': 2, 'PATCH': 4, 'PUT': 5}
 
     def get_object(self):
-        """Retrieve and return the authenticated user."""
-        return self.request.user
+        """
+        Retourne l'utilisateur authentifié, relu sur la base d'écriture pour
+        une modification.
+        """
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        # Une seule relecture par requête (update() et UpdateModelMixin
+        # l'appellent tous deux), verrouillée jusqu'à la fin de la transaction
+        # ouverte par update()
+        if not hasattr(self, '_fresh_user'):
+            self._fresh_user = fresh_user(self.request.user, lock=True)
+        return self._fresh_user
+
+    def get_serializer_class(self):
+        """Utilise le sérialiseur rapide en lecture seule pour GET/HEAD."""
+        # La génération du schéma OpenAPI a besoin des champs du
+        # ModelSerializer
+        fake_view = getattr(self, 'swagger_fake_view', False)
+        if self.request.method in ('GET', 'HEAD') and not fake_view:
+            return UserReadSerializer
+        return self.serializer_class
+
+    def _precondition_response(self, request, user):
+        """
+        Retourne la réponse 304/412 si les en-têtes conditionnels l'imposent.
+        """
+        response = conditional.evaluate_preconditions(request, user)
+        not_modified = status.HTTP_304_NOT_MODIFIED
+        if response is not None and response.status_code == not_modified:
+            conditional.set_validators(response, user)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retourne le profil, ou 304 sans corps s'il n'a pas changé
+        (If-None-Match).
+        """
+        user = self.get_object()
+        response = self._precondition_response(request, user)
+        if response is not None:
+            return response
+        response = super().retrieve(request, *args, **kwargs)
+        return conditional.set_validators(response, user)
+
+    def update(self, request, *args, **kwargs):
+        """
+        Met à jour le profil si If-Match correspond à la version courante
+        (sinon 412). La ligne reste verrouillée entre la comparaison et
+        l'écriture : deux modifications simultanées avec le même ETag ne
+        peuvent pas réussir toutes les deux.
+        """
+        with transaction.atomic(using=router.db_for_write(get_user_model())):
+            user = self.get_object()
+            response = self._precondition_response(request, user)
+            if response is not None:
+                return response
+            response = super().update(request, *args, **kwargs)
+        return conditional.set_validators(response, user)